@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+# Get the absolute path of the current file's directory
+current_dir = Path(__file__).resolve().parent
+
+# Add the src directory to Python path
+src_path = current_dir / 'src'
+sys.path.append(str(src_path))
+
+from src.asgi_app import create_asgi_app
+
+app = create_asgi_app()
@@ -6,11 +6,20 @@ from routes.auth_routes import auth_bp
 from routes.order import order
 from routes.webhook import webhook
 from services.notification_service import socketio
+from services.dispatch_service import start_dispatch_scheduler
+from services.order_event_service import start_order_event_dispatcher
 from config.database import db, init_db
 from config.paypal import configure_paypal, validate_paypal_config
 from config.environment import validate_environment
 from routes.restaurant_settings import restaurant_settings
+from routes.search import search
+from services.autocomplete_service import start_autocomplete_refresher
+from services.change_watcher import start_change_watcher
 from controllers.grocery_controller import grocery
+from controllers.restaurant_controller import restaurant
+from models.restaurant import Restaurant
+from services.restaurant_card_service import RestaurantCardService, start_schedule_refresher
+from utils.json_provider import OrjsonProvider
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +30,7 @@ def create_app():
     validate_environment()
     
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Enable CORS
     CORS(app)
@@ -32,6 +42,13 @@ def create_app():
     # Initialize database
     if not init_db():
         raise RuntimeError("Failed to initialize database connection")
+
+    # Compile opening-hour schedules that are missing or out of date (DST)
+    Restaurant.refresh_schedules()
+
+    # Rebuild the restaurant listing read model from the compiled schedules
+    # (once across workers booting together)
+    RestaurantCardService.rebuild()
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -39,13 +56,33 @@ def create_app():
     app.register_blueprint(webhook)
     app.register_blueprint(restaurant_settings, url_prefix='/api')
     app.register_blueprint(grocery, url_prefix='/api/grocery')
+    app.register_blueprint(restaurant, url_prefix='/api/restaurants')
+    app.register_blueprint(search, url_prefix='/api')
 
     # Configure PayPal
     configure_paypal()
     validate_paypal_config()
 
     # Initialize SocketIO
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio.init_app(app, cors_allowed_origins="*", message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE'))
+
+    # Start the driver dispatch loop (enable on a single worker only)
+    if os.getenv('DISPATCH_ENABLED', 'false').lower() == 'true':
+        start_dispatch_scheduler()
+
+    # Deliver order events to sockets and analytics (one lease holder at a time)
+    if os.getenv('ORDER_EVENTS_ENABLED', 'true').lower() == 'true':
+        start_order_event_dispatcher()
+
+    # Recompile schedules when a timezone's UTC offset changes (DST)
+    start_schedule_refresher()
+
+    # Build the autocomplete index and keep it fresh
+    start_autocomplete_refresher()
+
+    # Evict cached tax rules, menus, likes and restaurant cards on writes from anywhere
+    if os.getenv('CHANGE_WATCHER_ENABLED', 'true').lower() == 'true':
+        start_change_watcher()
     
     # Register error handlers
     @app.errorhandler(404)
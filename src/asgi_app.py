@@ -0,0 +1,59 @@
+from quart import Quart
+from dotenv import load_dotenv
+import os
+from config.async_database import async_db, init_async_db
+from controllers.async_grocery_controller import async_grocery
+from controllers.async_restaurant_controller import async_restaurant
+from routes.async_order import async_order
+from utils.json_provider import OrjsonProvider
+
+# Load environment variables
+load_dotenv()
+
+def create_asgi_app():
+    """Create the Quart application serving the async read endpoints.
+
+    Only latency-bound reads live here; writes, websockets and background
+    jobs stay on the Flask app (``app.create_app``), so both can be deployed
+    side by side behind the same router.
+    """
+    app = Quart(__name__)
+    # Quart's provider interface matches Flask's, so responses encode the same way
+    app.json = OrjsonProvider(app)
+
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
+
+    @app.before_serving
+    async def connect_database():
+        if not await init_async_db():
+            raise RuntimeError("Failed to initialize database connection")
+
+    @app.after_serving
+    async def close_database():
+        async_db.close()
+
+    # Register blueprints
+    app.register_blueprint(async_order, url_prefix='/api')
+    app.register_blueprint(async_grocery, url_prefix='/api/grocery')
+    app.register_blueprint(async_restaurant, url_prefix='/api/restaurants')
+
+    @app.errorhandler(404)
+    async def not_found(error):
+        return {'error': 'Resource not found'}, 404
+
+    @app.errorhandler(500)
+    async def internal_error(error):
+        return {'error': 'Internal server error'}, 500
+
+    @app.route('/health')
+    async def health_check():
+        return {'status': 'healthy'}, 200
+
+    # Match the Flask app's CORS and CSP headers
+    @app.after_request
+    async def add_security_headers(response):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; connect-src 'self' https:;"
+        return response
+
+    return app
@@ -0,0 +1,81 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.server_api import ServerApi
+from dotenv import load_dotenv
+import os
+import certifi
+
+# Load environment variables
+load_dotenv()
+
+class AsyncDatabase:
+    """asyncio counterpart of ``config.database.Database`` backed by Motor.
+
+    Motor clients are bound to the event loop they first run on, so the
+    client is created when the ASGI app starts serving rather than at import.
+    Indexes are owned by the synchronous app and are not created here.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.db = None
+
+    async def connect(self):
+        mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/ubereats')
+        try:
+            if 'mongodb+srv' in mongo_uri:
+                # Atlas connection with explicit SSL configuration
+                self.client = AsyncIOMotorClient(
+                    mongo_uri,
+                    server_api=ServerApi('1'),
+                    tls=True,
+                    tlsCAFile=certifi.where(),
+                    connectTimeoutMS=30000,
+                    socketTimeoutMS=30000,
+                    serverSelectionTimeoutMS=30000,
+                    retryWrites=True,
+                    w='majority',
+                    minPoolSize=0
+                )
+            else:
+                # Local connection
+                self.client = AsyncIOMotorClient(mongo_uri)
+
+            db_name = os.getenv('MONGODB_NAME', 'ubereats')
+            self.db = self.client.get_database(db_name)
+
+            # Test connection with a simple operation
+            await self.db.command('ping')
+            print(f"Connected to database (async): {db_name}")
+        except Exception as e:
+            print(f"Error connecting to MongoDB (async): {str(e)}")
+            raise e
+
+    def __getattr__(self, name):
+        # Allow async_db.<collection> as a shortcut for async_db.get_db().<collection>
+        if name.startswith('_') or name in ('client', 'db'):
+            raise AttributeError(name)
+        return self.get_db()[name]
+
+    def get_db(self):
+        if self.db is None:
+            raise RuntimeError("Async database is not connected; await init_async_db() first")
+        return self.db
+
+    def close(self):
+        if self.client:
+            self.client.close()
+            self.client = None
+            self.db = None
+            print("MongoDB async connection closed")
+
+# Create a singleton instance
+async_db = AsyncDatabase()
+
+async def init_async_db():
+    """Initialize the async database connection"""
+    try:
+        await async_db.connect()
+        return True
+    except Exception as e:
+        print(f"Failed to initialize async database: {str(e)}")
+        return False
@@ -81,8 +81,14 @@ class Database:
             print(f"Error creating indexes: {str(e)}")
             raise e
     
+    def __getattr__(self, name):
+        # Allow db.<collection> as a shortcut for db.get_db().<collection>
+        if name.startswith('_') or name in ('client', 'db'):
+            raise AttributeError(name)
+        return self.get_db()[name]
+
     def get_db(self):
-        if not self.db:
+        if self.db is None:
             self.connect()
         return self.db
     
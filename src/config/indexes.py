@@ -1,7 +1,22 @@
+import logging
+
 from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+
+# Flask's app.logger (create_app builds Flask(__name__) from the "app" module);
+# indexes are set up at connect time, before any app context exists
+logger = logging.getLogger('app')
+
+NAMESPACE_EXISTS = 48
 
 def setup_indexes(db):
     """Set up all necessary indexes for the application"""
+
+    # Change stream pre-images go first: on a fresh database the collections
+    # don't exist yet and are created with pre-images enabled
+    # (grocery_products: exact facet deltas; restaurant_likes: whose liked ids
+    # a deleted like drops; restaurants: which owner lost a restaurant)
+    _enable_pre_images(db, 'grocery_products', 'restaurant_likes', 'restaurants')
     
     # Restaurant indexes
     db.restaurants.create_index([("name", TEXT), ("cuisine_types", TEXT), ("description", TEXT)])
@@ -11,6 +26,10 @@ def setup_indexes(db):
     db.restaurants.create_index([("is_active", ASCENDING)])
     db.restaurants.create_index([("rating", DESCENDING)])
 
+    # Restaurant card (listing read model) indexes
+    db.restaurant_cards.create_index([("location", GEOSPHERE)])
+    db.restaurant_cards.create_index([("updated_at", ASCENDING)])
+
     # Menu item indexes
     db.menu_items.create_index([("restaurant_id", ASCENDING)])
     db.menu_items.create_index([("name", TEXT), ("description", TEXT)])
@@ -37,6 +56,18 @@ def setup_indexes(db):
         ("status", ASCENDING),
         ("created_at", DESCENDING)
     ])
+    db.orders.create_index([
+        ("status", ASCENDING),
+        ("delivery_info.driver_id", ASCENDING)
+    ])
+    # Order event outbox; drained orders have no pending entries and stay out of range scans
+    db.orders.create_index([("pending_events.created_at", ASCENDING)])
+
+    # Per-restaurant daily counters folded from order events
+    db.restaurant_analytics.create_index(
+        [("restaurant_id", ASCENDING), ("date", DESCENDING)],
+        unique=True
+    )
 
     # Review indexes
     db.reviews.create_index([("restaurant_id", ASCENDING)])
@@ -49,9 +80,64 @@ def setup_indexes(db):
     ])
     db.reviews.create_index([("comment", TEXT)])
 
+    # Grocery indexes
+    db.grocery_stores.create_index(
+        [("name", TEXT), ("description", TEXT)],
+        weights={"name": 10, "description": 2},
+        name="grocery_stores_text"
+    )
+    db.grocery_stores.create_index([("categories", ASCENDING)])
+    db.grocery_products.create_index(
+        [("store_id", ASCENDING), ("name", TEXT), ("description", TEXT)],
+        weights={"name": 10, "description": 2},
+        name="grocery_products_store_text"
+    )
+    db.grocery_products.create_index([("store_id", ASCENDING), ("_id", ASCENDING)])
+    db.grocery_products.create_index([
+        ("store_id", ASCENDING),
+        ("category", ASCENDING),
+        ("_id", ASCENDING)
+    ])
+
+    # Restaurant like indexes; the unique pair makes toggling a single upsert or delete
+    try:
+        db.restaurant_likes.create_index(
+            [("user_id", ASCENDING), ("restaurant_id", ASCENDING)],
+            unique=True
+        )
+    except DuplicateKeyError:
+        print("restaurant_likes holds duplicate likes, run: PYTHONPATH=src python -m migrations.dedupe_restaurant_likes")
+    # Liked list keyset pagination: (created_at, _id) descending per user
+    db.restaurant_likes.create_index([
+        ("user_id", ASCENDING),
+        ("created_at", DESCENDING),
+        ("_id", DESCENDING)
+    ])
+
     # User indexes
     db.users.create_index([("email", ASCENDING)], unique=True)
     db.users.create_index([("phone_number", ASCENDING)], sparse=True)
     db.users.create_index([("role", ASCENDING)])
+    db.users.create_index([("role", ASCENDING), ("is_available", ASCENDING)])
     
-    print("All database indexes have been created successfully") 
\ No newline at end of file
+    print("All database indexes have been created successfully") 
+
+
+def _enable_pre_images(db, *collections):
+    """Record change stream pre-images for ``collections`` (MongoDB 6.0+)
+
+    Missing collections are created with pre-images on (``collMod`` fails on
+    a collection that doesn't exist yet); existing ones are modified.
+    """
+    for name in collections:
+        try:
+            try:
+                db.create_collection(name, changeStreamPreAndPostImages={'enabled': True})
+            except CollectionInvalid:
+                db.command('collMod', name, changeStreamPreAndPostImages={'enabled': True})
+        except OperationFailure as e:
+            if e.code != NAMESPACE_EXISTS:
+                logger.warning("Change stream pre-images unavailable for %s: %s", name, e)
+                continue
+            # Another worker created it between the existence check and create
+            _enable_pre_images(db, name)
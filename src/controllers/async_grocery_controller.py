@@ -0,0 +1,59 @@
+from quart import Blueprint, request, jsonify
+from bson import ObjectId
+
+from config.async_database import async_db
+from controllers.grocery_controller import (
+    ID_AS_FIELD, _search_limit, stores_query, products_pipeline, next_products_cursor
+)
+
+async_grocery = Blueprint('async_grocery', __name__)
+
+@async_grocery.route('/categories', methods=['GET'])
+async def get_categories():
+    try:
+        cursor = async_db.grocery_categories.aggregate([{'$sort': {'order': 1}}, *ID_AS_FIELD])
+        return jsonify(await cursor.to_list(length=None)), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@async_grocery.route('/stores', methods=['GET'])
+async def get_stores():
+    try:
+        query, projection, search = stores_query(request.args)
+        limit = _search_limit(request.args) if search else None
+
+        # Get stores; searches return the most relevant ones first, up to the search limit
+        cursor = async_db.grocery_stores.find(query, projection)
+        if search:
+            cursor = cursor.sort([('score', {'$meta': 'textScore'})]).limit(limit)
+
+        return jsonify(await cursor.to_list(length=limit)), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@async_grocery.route('/stores/<store_id>', methods=['GET'])
+async def get_store(store_id):
+    try:
+        store = await async_db.grocery_stores.find_one({'_id': ObjectId(store_id)})
+        if not store:
+            return jsonify({'message': 'Store not found'}), 404
+
+        store['id'] = store.pop('_id')
+
+        return jsonify(store), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@async_grocery.route('/stores/<store_id>/products', methods=['GET'])
+async def get_store_products(store_id):
+    try:
+        pipeline = products_pipeline(store_id, request.args)
+        products = await async_db.grocery_products.aggregate(pipeline).to_list(length=None)
+
+        response = jsonify(products)
+        next_cursor = next_products_cursor(request.args, products)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
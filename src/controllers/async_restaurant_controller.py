@@ -0,0 +1,43 @@
+from quart import Blueprint, request, jsonify
+
+from config.async_database import async_db
+from controllers.restaurant_controller import (
+    nearby_cache, nearby_request, nearby_page, nearby_results, ratings_pipeline, ratings_summary
+)
+from middleware.auth import user_id_from_authorization
+from services.async_like_service import AsyncLikeService
+
+async_restaurant = Blueprint('async_restaurant', __name__)
+
+@async_restaurant.route('/<restaurant_id>/ratings', methods=['GET'])
+async def get_restaurant_ratings(restaurant_id):
+    try:
+        cursor = async_db.restaurant_ratings.aggregate(ratings_pipeline(restaurant_id))
+        ratings = await cursor.to_list(length=None)
+        return jsonify(ratings_summary(ratings)), 200
+
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@async_restaurant.route('/nearby', methods=['GET'])
+async def get_nearby_restaurants():
+    try:
+        cache_key, pipeline, limit, origin = nearby_request(request.args)
+        cached = nearby_cache.get(cache_key)
+        if cached is None:
+            restaurants = await async_db.restaurant_cards.aggregate(pipeline).to_list(length=limit + 1)
+            cached = nearby_page(restaurants, limit)
+            nearby_cache.set(cache_key, cached)
+        cards, next_cursor = nearby_results(cached, origin)
+
+        # Cached cards are shared across users; isLiked is added per request
+        user_id = user_id_from_authorization(request.headers.get('Authorization'))
+        return jsonify({
+            'restaurants': await AsyncLikeService.decorate(cards, user_id),
+            'next_cursor': next_cursor
+        }), 200
+
+    except (KeyError, ValueError) as e:
+        return jsonify({'message': f'Invalid parameters: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
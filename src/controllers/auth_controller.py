@@ -31,7 +31,7 @@ def register():
         )
         
         # Insert user into database
-        result = db.users.insert_one(user.dict(exclude={'id'}))
+        result = db.users.insert_one(user.model_dump(exclude={'id', 'password_hash'}))
         user.id = str(result.inserted_id)
         
         # Generate token
@@ -2,95 +2,173 @@ from flask import Blueprint, request, jsonify
 from bson import ObjectId
 from datetime import datetime
 
-from src.config.database import db
-from src.middleware.auth import token_required
-from src.models.grocery_store import GroceryStore, GroceryProduct, GroceryCategory
+from config.database import db
+from middleware.auth import token_required
+from models.grocery_store import GroceryStore, GroceryProduct, GroceryCategory
+from services.catalog_facet_service import CatalogFacetService
+from utils.http_cache import cached_response, bump_version
+from utils.bson_stream import MIMETYPES, RAW_BATCH_SIZE, raw_response
 
 grocery = Blueprint('grocery', __name__)
 
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 100
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+STORE_LIST_PROJECTION = {
+    '_id': 0,
+    'id': '$_id',
+    'name': 1,
+    'description': 1,
+    'image_url': 1,
+    'delivery_time': 1,
+    'delivery_fee': 1,
+    'minimum_order': 1,
+    'rating': 1,
+    'total_ratings': 1,
+    'categories': 1,
+    'offers': 1,
+    'is_featured': 1
+}
+
+# Pipeline stages exposing the document _id as ``id``
+ID_AS_FIELD = [{'$set': {'id': '$_id'}}, {'$unset': '_id'}]
+
+def _search_limit(args):
+    return max(1, min(int(args.get('limit', DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT))
+
+def _page_limit(args):
+    return max(1, min(int(args.get('limit', DEFAULT_PAGE_LIMIT)), MAX_PAGE_LIMIT))
+
+def stores_query(args):
+    """Filter, projection and text-search flag of a store listing request"""
+    category = args.get('category')
+    featured = args.get('featured', '').lower() == 'true'
+    search = args.get('search')
+
+    query = {}
+    if category:
+        query['categories'] = category
+    if featured:
+        query['is_featured'] = True
+    projection = dict(STORE_LIST_PROJECTION)
+    if search:
+        query['$text'] = {'$search': search}
+        projection['score'] = {'$meta': 'textScore'}
+    return query, projection, bool(search)
+
+def products_pipeline(store_id, args, stream=False):
+    """Aggregation pipeline of a store product listing request"""
+    category = args.get('category')
+    search = args.get('search')
+    cursor = args.get('cursor')
+
+    query = {'store_id': store_id}
+    if category:
+        query['category'] = category
+    if search:
+        # Served by the (store_id, text) index; ranked by relevance
+        query['$text'] = {'$search': search}
+        pipeline = [
+            {'$match': query},
+            {'$sort': {'score': {'$meta': 'textScore'}}},
+            {'$limit': _search_limit(args)},
+            {'$set': {'score': {'$meta': 'textScore'}}}
+        ]
+    else:
+        # Keyset pagination on _id, served by (store_id[, category], _id)
+        if cursor:
+            query['_id'] = {'$gt': ObjectId(cursor)}
+        pipeline = [{'$match': query}, {'$sort': {'_id': 1}}]
+        if not stream or 'limit' in args:
+            pipeline.append({'$limit': _page_limit(args)})
+    return pipeline + ID_AS_FIELD
+
+def next_products_cursor(args, products):
+    """Cursor of the next product page, None on the last page or for searches"""
+    if not args.get('search') and len(products) == _page_limit(args):
+        return str(products[-1]['id'])
+    return None
+
 @grocery.route('/categories', methods=['GET'])
+@cached_response(['grocery_categories'])
 def get_categories():
     try:
-        categories = list(db.grocery_categories.find().sort('order', 1))
-        for category in categories:
-            category['id'] = str(category['_id'])
-            del category['_id']
+        categories = list(db.grocery_categories.aggregate([{'$sort': {'order': 1}}, *ID_AS_FIELD]))
         return jsonify(categories), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
 @grocery.route('/stores', methods=['GET'])
+@cached_response(['grocery_stores'])
 def get_stores():
     try:
-        # Get query parameters
-        category = request.args.get('category')
-        featured = request.args.get('featured', '').lower() == 'true'
-        search = request.args.get('search')
-        
-        # Build query
-        query = {}
-        if category:
-            query['categories'] = category
-        if featured:
-            query['is_featured'] = True
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'description': {'$regex': search, '$options': 'i'}}
-            ]
+        query, projection, search = stores_query(request.args)
             
-        # Get stores
-        stores = list(db.grocery_stores.find(query))
-        
-        # Format response
-        for store in stores:
-            store['id'] = str(store['_id'])
-            del store['_id']
+        # Get stores; searches return the most relevant ones first, up to the search limit
+        cursor = db.grocery_stores.find(query, projection)
+        if search:
+            cursor = cursor.sort([('score', {'$meta': 'textScore'})]).limit(_search_limit(request.args))
+        stores = list(cursor)
             
         return jsonify(stores), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
 @grocery.route('/stores/<store_id>', methods=['GET'])
+@cached_response(['grocery_stores'])
 def get_store(store_id):
     try:
         store = db.grocery_stores.find_one({'_id': ObjectId(store_id)})
         if not store:
             return jsonify({'message': 'Store not found'}), 404
             
-        store['id'] = str(store['_id'])
-        del store['_id']
+        store['id'] = store.pop('_id')
         
         return jsonify(store), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
 @grocery.route('/stores/<store_id>/products', methods=['GET'])
-def get_store_products():
+def get_store_products(store_id):
     try:
-        # Get query parameters
-        category = request.args.get('category')
-        search = request.args.get('search')
-        
-        # Build query
-        query = {'store_id': store_id}
-        if category:
-            query['category'] = category
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'description': {'$regex': search, '$options': 'i'}}
-            ]
-            
-        # Get products
-        products = list(db.grocery_products.find(query))
-        
-        # Format response
-        for product in products:
-            product['id'] = str(product['_id'])
-            del product['_id']
-            
-        return jsonify(products), 200
+        fmt = request.args.get('format', 'json')
+        stream = fmt in MIMETYPES
+        pipeline = products_pipeline(store_id, request.args, stream)
+
+        if stream:
+            # Whole server batches are transcoded at once, or passed through as BSON
+            return raw_response(
+                db.grocery_products.aggregate_raw_batches(pipeline, batchSize=RAW_BATCH_SIZE), fmt
+            )
+
+        products = list(db.grocery_products.aggregate(pipeline))
+        response = jsonify(products)
+        next_cursor = next_products_cursor(request.args, products)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@grocery.route('/stores/<store_id>/catalog', methods=['GET'])
+@cached_response(['grocery_products'])
+def get_store_catalog(store_id):
+    try:
+        facets = CatalogFacetService.get(store_id)
+        return jsonify({
+            'store_id': store_id,
+            'total': facets['total'],
+            'in_stock': facets['in_stock'],
+            'categories': [
+                {'id': category, **counts}
+                for category, counts in facets['categories'].items() if counts['count'] > 0
+            ],
+            'price_buckets': {
+                bucket: count for bucket, count in facets['price_buckets'].items() if count > 0
+            }
+        }), 200
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
@@ -132,6 +210,7 @@ def rate_store(current_user, store_id):
                 }
             }
         )
+        bump_version('grocery_stores')
         
         return jsonify({'message': 'Rating submitted successfully'}), 200
     except Exception as e:
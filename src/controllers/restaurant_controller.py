@@ -1,39 +1,327 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from bson import ObjectId
-from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+import base64
+import json
 
-from ..config.database import db
-from ..middleware.auth import token_required
-from ..models.restaurant import Restaurant
+from config.database import db
+from middleware.auth import token_required, token_optional, optional_user_id
+from models.restaurant import Restaurant, open_at_query
+from models.read_models import RestaurantCard
+from models.menu_item import MenuItem
+from services.like_service import LikeService
+from services.menu_service import MenuService
+from services.order_service import OrderService
+from services.restaurant_card_service import RestaurantCardService
+from utils.cache import TTLCache
+from utils.fanout import fan_out
+from utils.geo import distance_m, geohash_center, geohash_encode, geohash_radius_m
+from utils.http_cache import cached_response, bump_version
 
 restaurant = Blueprint('restaurant', __name__)
 
+NEARBY_GEOHASH_PRECISION = 6  # ~1.2km x 0.6km cells
+NEARBY_DEFAULT_RADIUS = 5000  # meters
+NEARBY_MAX_RADIUS = 50000
+NEARBY_MAX_LIMIT = 50
+PAGE_RECENT_RATINGS = 5
+LIKED_MAX_LIMIT = 50
+EPOCH = datetime(1970, 1, 1)
+
+# Schedule internals are only used to answer open_now queries
+RESTAURANT_PAGE_PROJECTION = {'open_intervals': 0, 'schedule_utc_offset': 0}
+
+# Nearby results are shared by every client in the same geohash cell and
+# held as compact RestaurantCard tuples with their coordinates
+nearby_cache = TTLCache(max_size=4096, ttl=30)
+
+CARD_PROJECTION = {
+    '_id': 0,
+    'id': {'$toString': '$_id'},
+    'name': 1,
+    'cuisine_types': 1,
+    'price_range': 1,
+    'rating': 1,
+    'total_ratings': 1,
+    'delivery_fee': 1,
+    'estimated_delivery_time': 1,
+    'image_url': 1,
+    'distance': {'$round': ['$distance', 0]}
+}
+
+# Card fields of a joined restaurant card, converted by RestaurantCard
+LIKED_CARD_PROJECTION = {
+    'created_at': 1,
+    **{f'restaurant.{field}': 1 for field in (
+        '_id', 'name', 'cuisine_types', 'price_range', 'rating', 'total_ratings',
+        'delivery_fee', 'estimated_delivery_time', 'image_url'
+    )}
+}
+
+def _encode_cursor(distance, restaurant_id):
+    payload = json.dumps({'d': distance, 'id': restaurant_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def _decode_cursor(cursor):
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(payload['d']), ObjectId(payload['id'])
+
+def _can_manage(current_user, restaurant_id):
+    if current_user.get('role') == 'admin':
+        return True
+    return db.restaurants.find_one(
+        {'_id': ObjectId(restaurant_id), 'owner_id': str(current_user['_id'])}, {'_id': 1}
+    ) is not None
+
+# Shape a rating with the rater's name
+RATING_WITH_USER = [
+    {'$lookup': {
+        'from': 'users',
+        'localField': 'user_id',
+        'foreignField': '_id',
+        'as': 'user'
+    }},
+    {'$unwind': '$user'},
+    {'$project': {
+        'rating': 1,
+        'comment': 1,
+        'created_at': 1,
+        'user': {
+            'firstName': '$user.first_name',
+            'lastName': '$user.last_name'
+        }
+    }}
+]
+
+def ratings_pipeline(restaurant_id):
+    """Ratings of a restaurant with the rater's name"""
+    return [{'$match': {'restaurant_id': ObjectId(restaurant_id)}}, *RATING_WITH_USER]
+
+def ratings_summary(ratings):
+    if ratings:
+        average = sum(r['rating'] for r in ratings) / len(ratings)
+    else:
+        average = 0
+    return {
+        'average': round(average, 1),
+        'total': len(ratings),
+        'ratings': ratings
+    }
+
+def nearby_request(args):
+    """Cache key, pipeline, page size and (lat, lng, radius) origin of a nearby search request"""
+    lat = float(args['lat'])
+    lng = float(args['lng'])
+    radius = min(int(args.get('radius', NEARBY_DEFAULT_RADIUS)), NEARBY_MAX_RADIUS)
+    limit = min(int(args.get('limit', 20)), NEARBY_MAX_LIMIT)
+    cuisines = sorted(args.getlist('cuisine'))
+    price_ranges = sorted(args.getlist('price_range'))
+    open_now = args.get('open_now', '').lower() == 'true'
+    cursor = args.get('cursor')
+
+    # Snap the search point to its geohash cell so nearby clients share results
+    cell = geohash_encode(lat, lng, NEARBY_GEOHASH_PRECISION)
+    now = datetime.utcnow()
+    cache_key = (
+        cell, radius, limit, tuple(cuisines), tuple(price_ranges),
+        now.strftime('%H:%M') if open_now else None, cursor
+    )
+    center_lat, center_lng = geohash_center(cell)
+    # Searched from the cell centre: widen the radius so it covers the
+    # caller's radius from anywhere in the cell (see nearby_results)
+    max_distance = radius + geohash_radius_m(cell)
+
+    # Build query
+    query = {'is_active': True}
+    if cuisines:
+        query['cuisine_types'] = {'$in': cuisines}
+    if price_ranges:
+        query['price_range'] = {'$in': price_ranges}
+    if open_now:
+        query.update(open_at_query(now))
+
+    geo_near = {
+        'near': {'type': 'Point', 'coordinates': [center_lng, center_lat]},
+        'distanceField': 'distance',
+        'maxDistance': max_distance,
+        'query': query,
+        'spherical': True,
+        'key': 'location'
+    }
+    pipeline = [{'$geoNear': geo_near}]
+
+    # Resume after the last restaurant of the previous page
+    if cursor:
+        last_distance, last_id = _decode_cursor(cursor)
+        geo_near['minDistance'] = last_distance
+        pipeline.append({'$match': {'$or': [
+            {'distance': {'$gt': last_distance}},
+            {'_id': {'$gt': last_id}}
+        ]}})
+
+    pipeline += [
+        {'$sort': {'distance': 1, '_id': 1}},
+        {'$limit': limit + 1},
+        {'$set': {'cursor_distance': '$distance'}},
+        {'$project': {**CARD_PROJECTION, 'cursor_distance': 1, 'coordinates': '$location.coordinates'}}
+    ]
+    return cache_key, pipeline, limit, (lat, lng, radius)
+
+def nearby_page(restaurants, limit):
+    """Cards, next-page cursor and card coordinates from the ``limit + 1``
+    documents of a nearby search"""
+    next_cursor = None
+    if len(restaurants) > limit:
+        restaurants = restaurants[:limit]
+        last = restaurants[-1]
+        next_cursor = _encode_cursor(last['cursor_distance'], last['id'])
+    cards = tuple(RestaurantCard.convert(item) for item in restaurants)
+    return cards, next_cursor, tuple(tuple(item['coordinates']) for item in restaurants)
+
+def nearby_results(page, origin):
+    """Cards of a cached nearby page measured from the caller's own point.
+
+    Pages are searched from the geohash cell centre, so distances are
+    recomputed from the caller and cards beyond their radius dropped.
+    Paging still follows the centre distance the cursor was built from.
+    """
+    cards, next_cursor, coordinates = page
+    lat, lng, radius = origin
+    measured = []
+    for card, (card_lng, card_lat) in zip(cards, coordinates):
+        distance = distance_m(lat, lng, card_lat, card_lng)
+        if distance <= radius:
+            measured.append(card._replace(distance=float(round(distance))))
+    measured.sort(key=lambda card: card.distance)
+    return measured, next_cursor
+
+def liked_request(user_id, args):
+    """Pipeline and page size of a liked restaurants request"""
+    limit = max(1, min(int(args.get('limit', 20)), LIKED_MAX_LIMIT))
+    cursor = args.get('cursor')
+
+    # Served by the (user_id, created_at, _id) index
+    match = {'user_id': user_id}
+    if cursor:
+        liked_at, last_id = _decode_cursor(cursor)
+        liked_at = EPOCH + timedelta(milliseconds=liked_at)
+        match['$or'] = [
+            {'created_at': {'$lt': liked_at}},
+            {'created_at': liked_at, '_id': {'$lt': last_id}}
+        ]
+
+    pipeline = [
+        {'$match': match},
+        {'$sort': {'created_at': -1, '_id': -1}},
+        {'$limit': limit + 1},
+        {'$lookup': {
+            'from': 'restaurant_cards',
+            'localField': 'restaurant_id',
+            'foreignField': '_id',
+            'as': 'restaurant'
+        }},
+        {'$project': {'created_at': 1, 'restaurant': {'$first': '$restaurant'}}},
+        {'$project': LIKED_CARD_PROJECTION}
+    ]
+    return pipeline, limit
+
+def liked_page(likes, limit):
+    """Liked cards and next-page cursor from the ``limit + 1`` likes of a liked request"""
+    next_cursor = None
+    if len(likes) > limit:
+        likes = likes[:limit]
+        last = likes[-1]
+        next_cursor = _encode_cursor((last['created_at'] - EPOCH) // timedelta(milliseconds=1), str(last['_id']))
+
+    # Likes of deleted restaurants have no card
+    cards = [
+        dict(RestaurantCard.convert(like['restaurant'])._asdict(), isLiked=True)
+        for like in likes if like.get('restaurant')
+    ]
+    return cards, next_cursor
+
+def _page_restaurant(restaurant_id):
+    restaurant = db.restaurants.find_one({'_id': ObjectId(restaurant_id)}, RESTAURANT_PAGE_PROJECTION)
+    if restaurant:
+        restaurant['id'] = restaurant.pop('_id')
+    return restaurant
+
+def _page_menu(restaurant_id):
+    try:
+        return MenuService.get_snapshot(restaurant_id).to_dict()
+    except ValueError:
+        # Restaurant not found, reported from the restaurant read
+        return None
+
+def _page_ratings(restaurant_id):
+    """Rating average and count with the most recent ratings, in one round trip"""
+    result = next(db.restaurant_ratings.aggregate([
+        {'$match': {'restaurant_id': ObjectId(restaurant_id)}},
+        {'$facet': {
+            'summary': [{'$group': {'_id': None, 'average': {'$avg': '$rating'}, 'total': {'$sum': 1}}}],
+            'recent': [
+                {'$sort': {'created_at': -1}},
+                {'$limit': PAGE_RECENT_RATINGS},
+                *RATING_WITH_USER
+            ]
+        }}
+    ]))
+    summary = result['summary'][0] if result['summary'] else {}
+    return {
+        'average': round(summary.get('average') or 0, 1),
+        'total': summary.get('total', 0),
+        'ratings': result['recent']
+    }
+
+@restaurant.route('/<restaurant_id>/page', methods=['GET'])
+@token_optional
+def get_restaurant_page(current_user, restaurant_id):
+    """Everything the restaurant screen shows, read concurrently"""
+    try:
+        ObjectId(restaurant_id)
+        reads = {
+            'restaurant': lambda: _page_restaurant(restaurant_id),
+            'menu': lambda: _page_menu(restaurant_id),
+            'ratings': lambda: _page_ratings(restaurant_id),
+            'taxRules': lambda: OrderService.get_tax_rules(restaurant_id)
+        }
+        if current_user:
+            reads['isLiked'] = lambda: LikeService.is_liked(current_user['_id'], restaurant_id)
+
+        page = fan_out(reads)
+        if page['restaurant'] is None:
+            return jsonify({'message': 'Restaurant not found'}), 404
+        page.setdefault('isLiked', False)
+
+        return jsonify(page), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
 @restaurant.route('/<restaurant_id>/like', methods=['POST'])
 @token_required
 def toggle_like(current_user, restaurant_id):
+    """Toggle a like, or set it with ``{"liked": true|false}``"""
     try:
-        user_id = current_user['_id']
-        
-        # Check if user has already liked the restaurant
-        like = db.restaurant_likes.find_one({
-            'user_id': user_id,
-            'restaurant_id': ObjectId(restaurant_id)
-        })
-        
-        if like:
-            # Unlike
-            db.restaurant_likes.delete_one({'_id': like['_id']})
-            is_liked = False
-        else:
-            # Like
-            db.restaurant_likes.insert_one({
-                'user_id': user_id,
-                'restaurant_id': ObjectId(restaurant_id),
-                'created_at': datetime.utcnow()
-            })
-            is_liked = True
-            
-        return jsonify({'isLiked': is_liked}), 200
+        like = {'user_id': current_user['_id'], 'restaurant_id': ObjectId(restaurant_id)}
+        liked = (request.get_json(silent=True) or {}).get('liked')
+
+        # Toggling unlikes first; each write is atomic on the unique (user_id, restaurant_id) index
+        if liked is None:
+            liked = db.restaurant_likes.delete_one(like).deleted_count == 0
+        elif not liked:
+            db.restaurant_likes.delete_one(like)
+
+        if liked:
+            try:
+                db.restaurant_likes.update_one(
+                    like, {'$setOnInsert': {'created_at': datetime.utcnow()}}, upsert=True
+                )
+            except DuplicateKeyError:
+                pass  # A concurrent request inserted the same like
+
+        LikeService.invalidate(current_user['_id'])
+        return jsonify({'isLiked': bool(liked)}), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 400
@@ -85,8 +373,10 @@ def rate_restaurant(current_user, restaurant_id):
         
         db.restaurants.update_one(
             {'_id': ObjectId(restaurant_id)},
-            {'$set': {'rating': round(avg_rating, 1)}}
+            {'$set': {'rating': round(avg_rating, 1), 'total_ratings': len(ratings)}}
         )
+        RestaurantCardService.sync(restaurant_id)
+        bump_version('restaurant_ratings')
         
         return jsonify({'message': 'Rating submitted successfully'}), 200
         
@@ -96,62 +386,22 @@ def rate_restaurant(current_user, restaurant_id):
 @restaurant.route('/liked', methods=['GET'])
 @token_required
 def get_liked_restaurants(current_user):
+    """The caller's liked restaurants as cards, most recently liked first"""
     try:
-        # Get user's liked restaurant IDs
-        likes = db.restaurant_likes.find({'user_id': current_user['_id']})
-        restaurant_ids = [like['restaurant_id'] for like in likes]
-        
-        # Get restaurant details
-        restaurants = list(db.restaurants.find({'_id': {'$in': restaurant_ids}}))
-        
-        # Format response
-        response = []
-        for restaurant in restaurants:
-            restaurant['id'] = str(restaurant['_id'])
-            del restaurant['_id']
-            restaurant['isLiked'] = True
-            response.append(restaurant)
-            
-        return jsonify(response), 200
+        pipeline, limit = liked_request(current_user['_id'], request.args)
+        cards, next_cursor = liked_page(list(db.restaurant_likes.aggregate(pipeline)), limit)
+        return jsonify({'restaurants': cards, 'next_cursor': next_cursor}), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 400
 
 @restaurant.route('/<restaurant_id>/ratings', methods=['GET'])
+@cached_response(['restaurant_ratings'])
 def get_restaurant_ratings(restaurant_id):
     try:
         # Get all ratings for the restaurant
-        ratings = list(db.restaurant_ratings.aggregate([
-            {'$match': {'restaurant_id': ObjectId(restaurant_id)}},
-            {'$lookup': {
-                'from': 'users',
-                'localField': 'user_id',
-                'foreignField': '_id',
-                'as': 'user'
-            }},
-            {'$unwind': '$user'},
-            {'$project': {
-                'rating': 1,
-                'comment': 1,
-                'created_at': 1,
-                'user': {
-                    'firstName': '$user.first_name',
-                    'lastName': '$user.last_name'
-                }
-            }}
-        ]))
-        
-        # Calculate average rating
-        if ratings:
-            average = sum(r['rating'] for r in ratings) / len(ratings)
-        else:
-            average = 0
-            
-        return jsonify({
-            'average': round(average, 1),
-            'total': len(ratings),
-            'ratings': ratings
-        }), 200
+        ratings = list(db.restaurant_ratings.aggregate(ratings_pipeline(restaurant_id)))
+        return jsonify(ratings_summary(ratings)), 200
         
     except Exception as e:
         return jsonify({'message': str(e)}), 400
@@ -164,7 +414,7 @@ def get_user_ratings(current_user):
         ratings = list(db.restaurant_ratings.aggregate([
             {'$match': {'user_id': current_user['_id']}},
             {'$lookup': {
-                'from': 'restaurants',
+                'from': 'restaurant_cards',
                 'localField': 'restaurant_id',
                 'foreignField': '_id',
                 'as': 'restaurant'
@@ -184,4 +434,97 @@ def get_user_ratings(current_user):
         return jsonify(ratings), 200
         
     except Exception as e:
-        return jsonify({'message': str(e)}), 400
\ No newline at end of file
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/nearby', methods=['GET'])
+def get_nearby_restaurants():
+    try:
+        cache_key, pipeline, limit, origin = nearby_request(request.args)
+        cached = nearby_cache.get(cache_key)
+        if cached is None:
+            restaurants = list(db.restaurant_cards.aggregate(pipeline))
+            cached = nearby_page(restaurants, limit)
+            nearby_cache.set(cache_key, cached)
+        cards, next_cursor = nearby_results(cached, origin)
+
+        # Cached cards are shared across users; isLiked is added per request
+        return jsonify({
+            'restaurants': LikeService.decorate(cards, optional_user_id()),
+            'next_cursor': next_cursor
+        }), 200
+
+    except (KeyError, ValueError) as e:
+        return jsonify({'message': f'Invalid parameters: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/<restaurant_id>/menu', methods=['GET'])
+def get_menu(restaurant_id):
+    try:
+        version = MenuService.get_version(restaurant_id)
+        if version is None:
+            return jsonify({'message': 'Restaurant not found'}), 404
+
+        # The menu only changes when menu_version is bumped
+        etag = f"menu-{restaurant_id}-{version}"
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = jsonify(MenuService.get_snapshot(restaurant_id, version).to_dict())
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/<restaurant_id>/menu/items', methods=['POST'])
+@token_required
+def create_menu_item(current_user, restaurant_id):
+    try:
+        if not _can_manage(current_user, restaurant_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        data = {key: value for key, value in request.get_json().items() if key not in ('_id', 'id')}
+        item = MenuItem.model_validate({**data, 'restaurant_id': restaurant_id})
+        return jsonify({'id': MenuService.create_item(item)}), 201
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/<restaurant_id>/menu/items/<item_id>', methods=['PUT'])
+@token_required
+def update_menu_item(current_user, restaurant_id, item_id):
+    try:
+        if not _can_manage(current_user, restaurant_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        item = MenuItem.model_validate({
+            **request.get_json(), '_id': item_id, 'restaurant_id': restaurant_id
+        })
+        if not MenuService.update_item(item):
+            return jsonify({'message': 'Menu item not found'}), 404
+        return jsonify({'id': item.id}), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/<restaurant_id>/menu/items/<item_id>/availability', methods=['PUT'])
+@token_required
+def set_menu_item_availability(current_user, restaurant_id, item_id):
+    try:
+        if not _can_manage(current_user, restaurant_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        is_available = bool(request.get_json()['is_available'])
+        if not MenuService.set_availability(restaurant_id, item_id, is_available):
+            return jsonify({'message': 'Menu item not found'}), 404
+        return jsonify({'is_available': is_available}), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
+
+@restaurant.route('/<restaurant_id>/menu/items/<item_id>', methods=['DELETE'])
+@token_required
+def delete_menu_item(current_user, restaurant_id, item_id):
+    try:
+        if not _can_manage(current_user, restaurant_id):
+            return jsonify({'message': 'Unauthorized'}), 403
+        if not MenuService.delete_item(restaurant_id, item_id):
+            return jsonify({'message': 'Menu item not found'}), 404
+        return jsonify({'message': 'Menu item deleted'}), 200
+    except Exception as e:
+        return jsonify({'message': str(e)}), 400
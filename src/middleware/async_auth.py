@@ -0,0 +1,38 @@
+from functools import wraps
+from quart import request, jsonify
+from bson import ObjectId
+
+from config.async_database import async_db
+from services.auth_service import auth_service
+
+def async_token_required(f):
+    """``token_required`` for Quart views: verifies the token issued by
+    ``AuthService`` and passes the user document to the view"""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token = None
+
+        # Check if token is in headers
+        if 'Authorization' in request.headers:
+            auth_header = request.headers['Authorization']
+            try:
+                token = auth_header.split(" ")[1]  # Bearer <token>
+            except IndexError:
+                return jsonify({'message': 'Invalid token format'}), 401
+
+        if not token:
+            return jsonify({'message': 'Token is missing'}), 401
+
+        try:
+            data = auth_service.decode_token(token)
+            current_user = await async_db.users.find_one({'_id': ObjectId(data['user_id'])})
+
+            if not current_user or not current_user.get('is_active', True):
+                return jsonify({'message': 'Invalid token'}), 401
+
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 401
+
+        return await f(current_user, *args, **kwargs)
+
+    return decorated
@@ -2,11 +2,10 @@ from functools import wraps
 from flask import request, current_app, g, jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from .error_handlers import BusinessError
-import jwt
-import os
 from bson import ObjectId
 
-from ..config.database import db
+from config.database import db
+from services.auth_service import auth_service
 
 def auth_required(roles=None):
     """
@@ -107,17 +106,44 @@ def token_required(f):
             
         try:
             # Decode token
-            data = jwt.decode(token, os.getenv('JWT_SECRET'), algorithms=["HS256"])
+            data = auth_service.decode_token(token)
             current_user = db.users.find_one({'_id': ObjectId(data['user_id'])})
             
             if not current_user:
                 return jsonify({'message': 'Invalid token'}), 401
                 
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Invalid token'}), 401
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 401
             
         return f(current_user, *args, **kwargs)
         
-    return decorated 
\ No newline at end of file
+    return decorated 
+
+def token_optional(f):
+    """Like ``token_required`` but anonymous requests reach the view with
+    ``current_user=None``; a token that is present must still be valid"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if 'Authorization' not in request.headers:
+            return f(None, *args, **kwargs)
+        return token_required(f)(*args, **kwargs)
+
+    return decorated
+
+def optional_user_id():
+    """User id of a valid bearer token, None when anonymous or invalid.
+
+    Only the signature is checked (no user lookup), so use it to personalise
+    public responses, never to authorize.
+    """
+    return user_id_from_authorization(request.headers.get('Authorization'))
+
+def user_id_from_authorization(header):
+    """``optional_user_id`` for an Authorization header value, usable outside Flask requests"""
+    parts = (header or '').split()
+    if len(parts) != 2:
+        return None
+    try:
+        return auth_service.decode_token(parts[1])['user_id']
+    except (ValueError, KeyError):
+        return None
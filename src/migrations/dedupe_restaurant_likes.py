@@ -0,0 +1,51 @@
+"""
+One-off migration for restaurant_likes.
+
+Removes repeated likes left by the old find-then-insert toggle (keeping
+the first), creates the unique (user_id, restaurant_id) index that makes
+toggling a single write, and drops the (user_id, created_at) index that
+the (user_id, created_at, _id) one replaces.
+
+Run once with:
+    PYTHONPATH=src python -m migrations.dedupe_restaurant_likes
+"""
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from config.database import db
+
+OLD_LIKED_INDEX = 'user_id_1_created_at_-1'
+
+
+def drop_duplicate_likes(database) -> int:
+    """Delete all but the first like of each (user, restaurant) pair, returning how many were deleted"""
+    duplicates = database.restaurant_likes.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", "restaurant_id": "$restaurant_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    deleted = 0
+    for duplicate in duplicates:
+        result = database.restaurant_likes.delete_many({"_id": {"$in": sorted(duplicate["ids"])[1:]}})
+        deleted += result.deleted_count
+    return deleted
+
+
+def migrate(database) -> None:
+    deleted = drop_duplicate_likes(database)
+    print(f"Deleted {deleted} duplicate likes")
+    database.restaurant_likes.create_index(
+        [("user_id", ASCENDING), ("restaurant_id", ASCENDING)],
+        unique=True
+    )
+    try:
+        database.restaurant_likes.drop_index(OLD_LIKED_INDEX)
+    except OperationFailure:
+        pass  # already dropped or never created
+
+
+if __name__ == '__main__':
+    migrate(db.get_db())
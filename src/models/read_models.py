@@ -0,0 +1,178 @@
+"""
+Compact, immutable projections of models for in-process caches.
+
+Pydantic instances keep a ``__dict__``, a fields-set and validator state per
+object, and raw documents keep every stored field. These read models are
+NamedTuples (no per-instance dict) holding only what readers need, with
+repeated short strings such as categories and option names interned.
+"""
+from sys import intern
+from typing import NamedTuple, Optional, Tuple, Union
+
+from models.menu_item import MenuItem
+from models.restaurant import Restaurant
+from models.tax_rule import TaxRule
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return intern(value) if isinstance(value, str) else value
+
+
+def _get(source, name, default=None):
+    """Read a field from a pydantic model or a raw document"""
+    if isinstance(source, dict):
+        return source.get(name, default)
+    return getattr(source, name, default)
+
+
+class CustomizationOptionView(NamedTuple):
+    name: str
+    price: float
+    is_available: bool
+
+
+class CustomizationView(NamedTuple):
+    name: str
+    required: bool
+    multiple_select: bool
+    min_selections: int
+    max_selections: Optional[int]
+    options: Tuple[CustomizationOptionView, ...]
+
+    @classmethod
+    def convert(cls, source) -> 'CustomizationView':
+        return cls(
+            _intern(_get(source, 'name')),
+            _get(source, 'required', False),
+            _get(source, 'multiple_select', False),
+            _get(source, 'min_selections', 0),
+            _get(source, 'max_selections'),
+            tuple(
+                CustomizationOptionView(
+                    _intern(_get(option, 'name')),
+                    float(_get(option, 'price', 0.0)),
+                    _get(option, 'is_available', True)
+                )
+                for option in _get(source, 'options', [])
+            )
+        )
+
+
+class MenuItemView(NamedTuple):
+    id: str
+    restaurant_id: str
+    name: str
+    description: str
+    price: float
+    category: str
+    image_url: Optional[str]
+    is_available: bool
+    is_featured: bool
+    is_vegetarian: bool
+    is_vegan: bool
+    is_gluten_free: bool
+    spiciness_level: int
+    preparation_time: int
+    allergens: Tuple[str, ...]
+    customizations: Tuple[CustomizationView, ...]
+
+    @classmethod
+    def convert(cls, source: Union[MenuItem, dict]) -> 'MenuItemView':
+        """Build from a ``MenuItem`` or a ``menu_items`` document"""
+        item_id = _get(source, 'id') or _get(source, '_id')
+        nutrition = _get(source, 'nutritional_info')
+        return cls(
+            str(item_id),
+            _intern(str(_get(source, 'restaurant_id'))),
+            _get(source, 'name'),
+            _get(source, 'description', ''),
+            float(_get(source, 'price')),
+            _intern(_get(source, 'category')),
+            _get(source, 'image_url'),
+            _get(source, 'is_available', True),
+            _get(source, 'is_featured', False),
+            _get(source, 'is_vegetarian', False),
+            _get(source, 'is_vegan', False),
+            _get(source, 'is_gluten_free', False),
+            _get(source, 'spiciness_level', 0),
+            _get(source, 'preparation_time', 0),
+            tuple(_intern(a) for a in _get(nutrition, 'allergens', [])) if nutrition else (),
+            tuple(CustomizationView.convert(c) for c in _get(source, 'customizations', []))
+        )
+
+    def option_price(self, customization_name: str, option_name: str) -> float:
+        """Price of one customization option, 0 if it does not exist"""
+        for customization in self.customizations:
+            if customization.name == customization_name:
+                for option in customization.options:
+                    if option.name == option_name:
+                        return option.price
+        return 0.0
+
+
+class RestaurantCard(NamedTuple):
+    id: str
+    name: str
+    cuisine_types: Tuple[str, ...]
+    price_range: str
+    rating: float
+    total_ratings: int
+    delivery_fee: float
+    estimated_delivery_time: int
+    image_url: Optional[str]
+    distance: Optional[float] = None
+
+    @classmethod
+    def convert(cls, source: Union[Restaurant, dict], distance: Optional[float] = None) -> 'RestaurantCard':
+        """Build from a ``Restaurant``, a ``restaurants`` document or a card projection"""
+        image_url = _get(source, 'image_url')
+        if image_url is None:
+            images = _get(source, 'images', [])
+            primary = next((img for img in images if _get(img, 'is_primary')), images[0] if images else None)
+            image_url = _get(primary, 'url') if primary is not None else None
+        return cls(
+            str(_get(source, 'id') or _get(source, '_id')),
+            _get(source, 'name'),
+            tuple(_intern(c) for c in _get(source, 'cuisine_types', [])),
+            _intern(_get(source, 'price_range')),
+            _get(source, 'rating', 0.0),
+            _get(source, 'total_ratings', 0),
+            _get(source, 'delivery_fee', 0.0),
+            _get(source, 'estimated_delivery_time'),
+            image_url,
+            _get(source, 'distance', distance)
+        )
+
+
+class TaxRuleView(NamedTuple):
+    id: str
+    restaurant_id: str
+    name: str
+    rate: float
+    is_active: bool
+    applies_to_delivery: bool
+    applies_to_pickup: bool
+    minimum_order_amount: float
+
+    @classmethod
+    def convert(cls, source: Union[TaxRule, dict]) -> 'TaxRuleView':
+        """Build from a ``TaxRule`` or a ``tax_rules`` document"""
+        return cls(
+            str(_get(source, 'id') or _get(source, '_id')),
+            _intern(str(_get(source, 'restaurant_id'))),
+            _intern(_get(source, 'name')),
+            float(str(_get(source, 'rate'))),
+            _get(source, 'is_active', True),
+            _get(source, 'applies_to_delivery', True),
+            _get(source, 'applies_to_pickup', True),
+            float(_get(source, 'minimum_order_amount', 0.0))
+        )
+
+    def applies(self, is_delivery: bool) -> bool:
+        return self.applies_to_delivery if is_delivery else self.applies_to_pickup
+
+    def calculate_tax(self, subtotal: float) -> float:
+        """Same result as ``TaxRule.calculate_tax``"""
+        if subtotal < self.minimum_order_amount or not self.is_active:
+            return 0.0
+        return round(subtotal * (self.rate / 100), 2)
@@ -1,13 +1,76 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel, Field, model_validator
 from bson import ObjectId
+from config.database import db
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
 
 class OpeningHours(BaseModel):
     day: int = Field(..., ge=0, le=6)  # 0 = Sunday, 6 = Saturday
     open: str
     close: str
 
+def _parse_minutes(value: str) -> int:
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def utc_offset_minutes(timezone: str, at: Optional[datetime] = None) -> int:
+    """UTC offset of ``timezone`` in minutes at the given UTC time"""
+    at = at or datetime.utcnow()
+    local = at.replace(tzinfo=ZoneInfo('UTC')).astimezone(ZoneInfo(timezone))
+    return int(local.utcoffset().total_seconds() // 60)
+
+def minute_of_week(at: datetime) -> int:
+    """Minutes since Sunday 00:00 for a naive UTC datetime"""
+    day = (at.weekday() + 1) % 7  # 0 = Sunday
+    return day * MINUTES_PER_DAY + at.hour * 60 + at.minute
+
+def compile_opening_hours(opening_hours: list, timezone: str = 'UTC', at: Optional[datetime] = None) -> List[dict]:
+    """Compile day/open/close entries into sorted, merged UTC minute-of-week intervals.
+
+    A close time at or before the open time runs past midnight into the next
+    day, and intervals crossing the end of the week wrap to Sunday. The
+    offset of ``timezone`` at ``at`` is used, so schedules in zones with
+    daylight saving must be recompiled when the offset changes (see
+    Restaurant.refresh_schedules).
+    """
+    offset = utc_offset_minutes(timezone, at)
+    raw = []
+    for entry in opening_hours:
+        if isinstance(entry, BaseModel):
+            entry = entry.model_dump()
+        start = _parse_minutes(entry['open'])
+        end = _parse_minutes(entry['close'])
+        if end <= start:
+            end += MINUTES_PER_DAY
+        start = entry['day'] * MINUTES_PER_DAY + start - offset
+        end = entry['day'] * MINUTES_PER_DAY + end - offset
+
+        # Normalise into [0, MINUTES_PER_WEEK), splitting at the week boundary
+        shift = (start // MINUTES_PER_WEEK) * MINUTES_PER_WEEK
+        start, end = start - shift, end - shift
+        if end > MINUTES_PER_WEEK:
+            raw.append([start, MINUTES_PER_WEEK])
+            raw.append([0, end - MINUTES_PER_WEEK])
+        else:
+            raw.append([start, end])
+
+    merged = []
+    for start, end in sorted(raw):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [{'start': start, 'end': end} for start, end in merged]
+
+def open_at_query(at: Optional[datetime] = None) -> dict:
+    """Mongo filter matching restaurants whose compiled schedule is open at ``at`` (UTC)"""
+    minute = minute_of_week(at or datetime.utcnow())
+    return {'open_intervals': {'$elemMatch': {'start': {'$lte': minute}, 'end': {'$gt': minute}}}}
+
 class Location(BaseModel):
     type: str = "Point"
     coordinates: List[float]  # [longitude, latitude]
@@ -36,6 +99,9 @@ class Restaurant(BaseModel):
     total_ratings: int = 0
     price_range: str = Field(..., pattern="^[$]{1,4}$")  # $, $$, $$$, $$$$
     opening_hours: List[OpeningHours]
+    timezone: str = "UTC"  # IANA zone the opening hours are expressed in
+    open_intervals: List[dict] = []  # compiled from opening_hours, UTC minutes of week
+    schedule_utc_offset: int = 0  # offset in minutes used to compile open_intervals
     is_active: bool = True
     features: List[str] = []  # ["delivery", "takeout", "dine-in", etc.]
     delivery_fee: float = 0.0
@@ -66,6 +132,7 @@ class Restaurant(BaseModel):
                     }
                 },
                 "price_range": "$$",
+                "timezone": "America/New_York",
                 "opening_hours": [
                     {
                         "day": 0,
@@ -81,9 +148,42 @@ class Restaurant(BaseModel):
             }
         }
 
+    @model_validator(mode='after')
+    def compile_schedule(self):
+        """Precompute open_intervals whenever opening hours are set"""
+        self.open_intervals = compile_opening_hours(self.opening_hours, self.timezone)
+        self.schedule_utc_offset = utc_offset_minutes(self.timezone)
+        return self
+
     def update_timestamps(self):
         self.updated_at = datetime.utcnow()
 
+    @staticmethod
+    def refresh_schedules() -> List[ObjectId]:
+        """Compile missing schedules and recompile those whose timezone offset
+        changed (e.g. DST), returning the ids of the restaurants updated"""
+        offsets = {
+            timezone: utc_offset_minutes(timezone)
+            for timezone in db.get_db().restaurants.distinct('timezone') if timezone
+        }
+        stale = [{'open_intervals': {'$exists': False}}]
+        for timezone, offset in offsets.items():
+            stale.append({'timezone': timezone, 'schedule_utc_offset': {'$ne': offset}})
+
+        refreshed = []
+        for doc in db.get_db().restaurants.find({'$or': stale}, {'opening_hours': 1, 'timezone': 1}):
+            timezone = doc.get('timezone') or 'UTC'
+            db.get_db().restaurants.update_one(
+                {'_id': doc['_id']},
+                {'$set': {
+                    'open_intervals': compile_opening_hours(doc.get('opening_hours', []), timezone),
+                    'schedule_utc_offset': utc_offset_minutes(timezone),
+                    'updated_at': datetime.utcnow()
+                }}
+            )
+            refreshed.append(doc['_id'])
+        return refreshed
+
     def calculate_rating(self, new_rating: float):
         """Update restaurant rating when a new review is added"""
         self.rating = ((self.rating * self.total_ratings) + new_rating) / (self.total_ratings + 1)
@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from bson import ObjectId
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+M = TypeVar('M', bound=BaseModel)
+
+_MISSING = object()
+_new = object.__new__
+_setattr = object.__setattr__
+
+
+def _id_to_str(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+def _nested_builder(annotation) -> Optional[Callable]:
+    """Return a converter for nested models inside ``annotation``, if any.
+
+    Nested trees go through a compiled TypeAdapter first: pydantic-core
+    builds many small models faster than any Python loop can. Documents it
+    rejects (e.g. legacy values) fall back to unvalidated construction.
+    """
+    construct = _builder(annotation)
+    if construct is None:
+        return None
+    validate = TypeAdapter(annotation).validate_python
+
+    def build(value):
+        try:
+            return validate(value)
+        except ValidationError:
+            return construct(value)
+    return build
+
+
+def _builder(annotation) -> Optional[Callable]:
+    """Return an unvalidated converter for nested models inside ``annotation``, if any"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _builder(args[0]) if len(args) == 1 else None
+    if origin is list:
+        args = get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            model_cls = args[0]
+            return lambda value: [from_db(model_cls, v) if isinstance(v, dict) else v for v in value]
+        item = _builder(args[0]) if args else None
+        if item is None:
+            return None
+        return lambda value: [item(v) for v in value]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: from_db(annotation, value) if isinstance(value, dict) else value
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plan(model_cls: Type[BaseModel]) -> Tuple[tuple, ...]:
+    """(field name, document key, converter, field or None if required) per field"""
+    plan = []
+    for name, field in model_cls.model_fields.items():
+        key = field.alias or name
+        if key == '_id' and field.annotation is str:
+            build = _id_to_str
+        else:
+            build = _nested_builder(field.annotation)
+        plan.append((name, key, build, None if field.is_required() else field))
+    return tuple(plan)
+
+
+def from_db(model_cls: Type[M], doc: dict) -> M:
+    """Build ``model_cls`` from a document we wrote ourselves without validating it.
+
+    Top-level values are taken as stored (so Python-side validators such as
+    ``EmailStr`` are skipped and enum fields may hold their raw string),
+    ``_id`` ObjectIds become strings for ``str`` id fields and missing fields
+    get their defaults. Nested models are built as in ``_nested_builder``.
+    Never use this for request data.
+
+    This is ``model_construct`` without its per-call bookkeeping: the field
+    plan is computed once per class and the instance state is set directly.
+    It only pays off for flat models with Python-side validators such as
+    ``User``; nested models like ``Order`` and ``MenuItem`` cost about the
+    same as ``model_validate``, which is why their read paths serve raw
+    documents or ``models.read_models`` views rather than models.
+    """
+    values = {}
+    fields_set = set()
+    get = doc.get
+    for name, key, build, optional in _plan(model_cls):
+        value = get(key, _MISSING)
+        if value is _MISSING:
+            if key != name:
+                value = get(name, _MISSING)
+            if value is _MISSING:
+                if optional is not None:
+                    values[name] = optional.get_default(call_default_factory=True)
+                continue
+        if build is not None and value is not None:
+            value = build(value)
+        values[name] = value
+        fields_set.add(name)
+
+    model = _new(model_cls)
+    _setattr(model, '__dict__', values)
+    _setattr(model, '__pydantic_fields_set__', fields_set)
+    _setattr(model, '__pydantic_extra__', None)
+    _setattr(model, '__pydantic_private__', None)
+    return model
@@ -4,11 +4,13 @@ from pydantic import BaseModel, EmailStr, Field
 from bson import ObjectId
 from werkzeug.security import generate_password_hash, check_password_hash
 from config.database import db
+from models.trusted import from_db
 
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(ObjectId()), alias="_id")
     email: EmailStr
     password: str
+    password_hash: Optional[str] = None
     first_name: str
     last_name: str
     phone_number: Optional[str] = None
@@ -127,21 +129,12 @@ class User(BaseModel):
 
     @staticmethod
     def from_dict(data):
-        user = User(
-            email=data['email'],
-            password="",  # Password hash is already stored
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            phone_number=data.get('phone_number')
-        )
+        """Load a user document without re-validating it"""
+        # Password hash is already stored (as 'password' by the register endpoint)
+        user = from_db(User, {
+            **data,
+            'password': '',
+            'password_hash': data.get('password_hash', data.get('password'))
+        })
         user._id = data['_id']
-        user.password_hash = data['password_hash']
-        user.created_at = data['created_at']
-        user.updated_at = data['updated_at']
-        user.is_active = data['is_active']
-        user.is_verified = data['is_verified']
-        user.role = data['role']
-        user.preferences = data['preferences']
-        user.saved_addresses = data['saved_addresses']
-        user.payment_methods = data['payment_methods']
-        return user 
\ No newline at end of file
+        return user
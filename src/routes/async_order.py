@@ -0,0 +1,41 @@
+from quart import Blueprint, request, jsonify
+from middleware.async_auth import async_token_required
+from services.async_order_service import AsyncOrderService
+from routes.order import order_history_query
+
+async_order = Blueprint('async_order', __name__)
+
+@async_order.route('/orders/<order_id>', methods=['GET'])
+@async_token_required
+async def get_order(current_user, order_id):
+    """Get order details"""
+    try:
+        try:
+            order_data = await AsyncOrderService.get_order(order_id)
+        except ValueError:
+            return jsonify({'error': 'Order not found'}), 404
+
+        # Check if user has permission to view this order
+        if str(order_data['user_id']) != str(current_user['_id']) and \
+           current_user['role'] not in ['admin', 'restaurant_owner']:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        return jsonify(order_data), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@async_order.route('/orders', methods=['GET'])
+@async_token_required
+async def list_orders(current_user):
+    """List orders with filtering options"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        skip = int(request.args.get('skip', 0))
+        user_id, role = str(current_user['_id']), current_user['role']
+        owned = await AsyncOrderService.owned_restaurants(user_id) if role == 'restaurant_owner' else ()
+        query = order_history_query(user_id, role, request.args, owned)
+
+        orders = await AsyncOrderService.find_orders(query, skip, limit)
+        return jsonify(orders), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from models.order import Order, OrderStatus, PaymentStatus
 from middleware.auth_middleware import token_required
 from config.database import db
+from services.order_event_hub import order_event_hub
+from services.order_event_service import WITHOUT_EVENTS, OrderEventService
+from services.notification_service import NotificationService
 from bson import ObjectId
 from datetime import datetime
+from utils.bson_stream import MIMETYPES, RAW_BATCH_SIZE, raw_response
 
 order = Blueprint('order', __name__)
 
@@ -16,7 +20,7 @@ def create_order(current_user):
         
         # Create order instance
         order = Order(
-            user_id=str(current_user['_id']),
+            user_id=str(current_user._id),
             restaurant_id=data['restaurant_id'],
             items=data['items'],
             delivery_info=data['delivery_info'],
@@ -27,8 +31,14 @@ def create_order(current_user):
             special_instructions=data.get('special_instructions')
         )
         
-        # Insert into database
-        result = db.get_db().orders.insert_one(order.dict(by_alias=True))
+        # Insert into database together with its new_order event
+        document = order.model_dump(by_alias=True)
+        document.update(OrderEventService.initial(OrderEventService.event(
+            'new_order',
+            total=order.payment_info.total,
+            item_count=sum(item.quantity for item in order.items)
+        )))
+        result = db.get_db().orders.insert_one(document)
         order.id = str(result.inserted_id)
         
         # Update restaurant's active orders
@@ -37,7 +47,7 @@ def create_order(current_user):
             {'$inc': {'active_orders': 1}}
         )
         
-        return jsonify(order.dict(by_alias=True)), 201
+        return jsonify(order.model_dump(by_alias=True)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -46,19 +56,49 @@ def create_order(current_user):
 def get_order(current_user, order_id):
     """Get order details"""
     try:
-        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)})
+        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)}, WITHOUT_EVENTS)
         if not order_data:
             return jsonify({'error': 'Order not found'}), 404
             
         # Check if user has permission to view this order
-        if str(order_data['user_id']) != str(current_user['_id']) and \
-           current_user['role'] not in ['admin', 'restaurant_owner']:
+        if str(order_data['user_id']) != str(current_user._id) and \
+           current_user.role not in ['admin', 'restaurant_owner']:
             return jsonify({'error': 'Unauthorized'}), 403
             
-        return jsonify({**order_data, '_id': str(order_data['_id'])}), 200
+        return jsonify(order_data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@order.route('/api/orders/<order_id>/events', methods=['GET'])
+@token_required
+def stream_order_events(current_user, order_id):
+    """Stream order status and delivery events as server-sent events"""
+    stream = order_event_hub.connect(order_id)
+    if stream is None:
+        return jsonify({'error': 'Too many event streams, retry later'}), 503, {'Retry-After': '5'}
+    try:
+        # Read the history only after subscribing so no event is missed in between
+        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)}, {'user_id': 1, 'events': 1})
+        if not order_data:
+            order_event_hub.disconnect(order_id, stream)
+            return jsonify({'error': 'Order not found'}), 404
+
+        if str(order_data['user_id']) != str(current_user._id) and \
+           current_user.role not in ['admin', 'restaurant_owner']:
+            order_event_hub.disconnect(order_id, stream)
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        events = order_event_hub.stream(order_id, stream, order_data.get('events', []), last_event_id)
+        return Response(
+            stream_with_context(events),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        order_event_hub.disconnect(order_id, stream)
+        return jsonify({'error': str(e)}), 400
+
 @order.route('/api/orders/<order_id>/status', methods=['PUT'])
 @token_required
 def update_order_status(current_user, order_id):
@@ -72,12 +112,12 @@ def update_order_status(current_user, order_id):
             return jsonify({'error': 'Invalid status'}), 400
             
         # Get order
-        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)})
+        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)}, WITHOUT_EVENTS)
         if not order_data:
             return jsonify({'error': 'Order not found'}), 404
             
         # Check permissions
-        if current_user['role'] not in ['admin', 'restaurant_owner']:
+        if current_user.role not in ['admin', 'restaurant_owner']:
             return jsonify({'error': 'Unauthorized'}), 403
             
         # Update status
@@ -87,7 +127,8 @@ def update_order_status(current_user, order_id):
                 '$set': {
                     'status': new_status,
                     'updated_at': datetime.utcnow()
-                }
+                },
+                '$push': OrderEventService.push(OrderEventService.status_event(new_status))
             }
         )
         
@@ -115,13 +156,13 @@ def update_payment_status(current_user, order_id):
             return jsonify({'error': 'Invalid payment status'}), 400
             
         # Get order
-        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)})
+        order_data = db.get_db().orders.find_one({'_id': ObjectId(order_id)}, WITHOUT_EVENTS)
         if not order_data:
             return jsonify({'error': 'Order not found'}), 404
             
         # Check permissions
-        if str(order_data['user_id']) != str(current_user['_id']) and \
-           current_user['role'] not in ['admin']:
+        if str(order_data['user_id']) != str(current_user._id) and \
+           current_user.role not in ['admin']:
             return jsonify({'error': 'Unauthorized'}), 403
             
         # Update payment status
@@ -132,7 +173,8 @@ def update_payment_status(current_user, order_id):
                     'payment_info.status': new_status,
                     'payment_info.transaction_id': data.get('transaction_id'),
                     'updated_at': datetime.utcnow()
-                }
+                },
+                '$push': OrderEventService.push(OrderEventService.payment_event(new_status))
             }
         )
         
@@ -140,50 +182,76 @@ def update_payment_status(current_user, order_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def order_history_query(user_id, role, args, owned_restaurants=()) -> dict:
+    """Build the order listing filter from query parameters and the caller's
+    role; ``owned_restaurants`` are the ids of a restaurant owner's restaurants"""
+    status = args.get('status')
+    restaurant_id = args.get('restaurant_id')
+    from_date = args.get('from_date')
+    to_date = args.get('to_date')
+
+    # Build query
+    query = {}
+    if status:
+        query['status'] = status
+    if restaurant_id:
+        query['restaurant_id'] = restaurant_id
+        
+    # Add date range if provided
+    if from_date or to_date:
+        query['created_at'] = {}
+        if from_date:
+            query['created_at']['$gte'] = datetime.fromisoformat(from_date)
+        if to_date:
+            query['created_at']['$lte'] = datetime.fromisoformat(to_date)
+            
+    # Add user filter based on role
+    if role == 'customer':
+        query['user_id'] = str(user_id)
+    elif role == 'restaurant_owner':
+        query['restaurant_id'] = {'$in': sorted(r for r in owned_restaurants if not restaurant_id or r == restaurant_id)}
+    return query
+
+def caller_history_query(current_user, args) -> dict:
+    """``order_history_query`` for the user passed to a view by ``token_required``"""
+    user_id = str(current_user._id)
+    owned = NotificationService.owned_restaurants(user_id) if current_user.role == 'restaurant_owner' else ()
+    return order_history_query(user_id, current_user.role, args, owned)
+
 @order.route('/api/orders', methods=['GET'])
 @token_required
 def list_orders(current_user):
     """List orders with filtering options"""
     try:
-        # Parse query parameters
-        status = request.args.get('status')
-        restaurant_id = request.args.get('restaurant_id')
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
         limit = int(request.args.get('limit', 50))
         skip = int(request.args.get('skip', 0))
-        
-        # Build query
-        query = {}
-        if status:
-            query['status'] = status
-        if restaurant_id:
-            query['restaurant_id'] = restaurant_id
-            
-        # Add date range if provided
-        if from_date or to_date:
-            query['created_at'] = {}
-            if from_date:
-                query['created_at']['$gte'] = datetime.fromisoformat(from_date)
-            if to_date:
-                query['created_at']['$lte'] = datetime.fromisoformat(to_date)
-                
-        # Add user filter based on role
-        if current_user['role'] == 'customer':
-            query['user_id'] = str(current_user['_id'])
-        elif current_user['role'] == 'restaurant_owner':
-            query['restaurant_id'] = {'$in': current_user['restaurant_ids']}
+        query = caller_history_query(current_user, request.args)
             
         # Execute query
-        orders = list(db.get_db().orders.find(query)
+        orders = list(db.get_db().orders.find(query, WITHOUT_EVENTS)
                      .sort('created_at', -1)
                      .skip(skip)
                      .limit(limit))
-                     
-        # Convert ObjectId to string
-        for order in orders:
-            order['_id'] = str(order['_id'])
             
         return jsonify(orders), 200
     except Exception as e:
-        return jsonify({'error': str(e)}), 400 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
+
+@order.route('/api/orders/export', methods=['GET'])
+@token_required
+def export_orders(current_user):
+    """Stream the full order history as NDJSON (default) or raw BSON"""
+    try:
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in MIMETYPES:
+            return jsonify({'error': f"Unsupported format: {fmt}"}), 400
+
+        batches = db.get_db().orders.find_raw_batches(
+            caller_history_query(current_user, request.args),
+            WITHOUT_EVENTS,
+            sort=[('created_at', -1)],
+            batch_size=RAW_BATCH_SIZE
+        )
+        return raw_response(batches, fmt)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
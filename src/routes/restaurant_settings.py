@@ -4,6 +4,7 @@ from models.tax_rule import TaxRule
 from config.database import db
 from bson import ObjectId
 from datetime import datetime
+from services.order_service import OrderService
 
 restaurant_settings = Blueprint('restaurant_settings', __name__)
 
@@ -17,7 +18,7 @@ def get_tax_rules(current_user):
             return jsonify({'error': 'Restaurant ID is required'}), 400
 
         tax_rules = list(db.get_db().tax_rules.find({'restaurant_id': restaurant_id}))
-        return jsonify([{**rule, '_id': str(rule['_id'])} for rule in tax_rules])
+        return jsonify(tax_rules)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -42,10 +43,11 @@ def create_tax_rule(current_user):
             minimum_order_amount=data.get('minimumOrderAmount', 0.0)
         )
 
-        result = db.get_db().tax_rules.insert_one(tax_rule.dict(by_alias=True))
+        result = db.get_db().tax_rules.insert_one(tax_rule.model_dump(by_alias=True))
         tax_rule.id = str(result.inserted_id)
+        OrderService.get_tax_rules.invalidate(restaurant_id)
         
-        return jsonify(tax_rule.dict(by_alias=True)), 201
+        return jsonify(tax_rule.model_dump(by_alias=True)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -83,8 +85,10 @@ def update_tax_rule(current_user, rule_id):
             {'$set': update_data}
         )
 
+        OrderService.get_tax_rules.invalidate(restaurant_id)
+
         updated_rule = db.get_db().tax_rules.find_one({'_id': ObjectId(rule_id)})
-        return jsonify({**updated_rule, '_id': str(updated_rule['_id'])})
+        return jsonify(updated_rule)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -106,6 +110,7 @@ def delete_tax_rule(current_user, rule_id):
             return jsonify({'error': 'Tax rule not found'}), 404
 
         db.get_db().tax_rules.delete_one({'_id': ObjectId(rule_id)})
+        OrderService.get_tax_rules.invalidate(restaurant_id)
         return jsonify({'message': 'Tax rule deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from middleware.auth import optional_user_id
+from services.autocomplete_service import autocomplete_service, KIND_IDS
+from services.like_service import LikeService
+
+search = Blueprint('search', __name__)
+
+MAX_SUGGESTIONS = 20
+
+@search.route('/search/suggest', methods=['GET'])
+def suggest():
+    """Typeahead suggestions for restaurants, menu items and grocery products"""
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(int(request.args.get('limit', 8)), MAX_SUGGESTIONS))
+        types = [t for t in request.args.get('types', '').split(',') if t]
+
+        unknown = [t for t in types if t not in KIND_IDS]
+        if unknown:
+            return jsonify({'error': f"Unknown types: {', '.join(unknown)}"}), 400
+
+        suggestions = autocomplete_service.suggest(query, limit, types or None)
+        user_id = optional_user_id()
+        for suggestion in suggestions:
+            if suggestion['type'] == 'restaurant':
+                suggestion['isLiked'] = LikeService.is_liked(user_id, suggestion['id'])
+        return jsonify({'suggestions': suggestions}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
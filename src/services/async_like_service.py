@@ -0,0 +1,26 @@
+from typing import FrozenSet, Iterable, List, Optional
+
+from config.async_database import async_db
+from services.like_service import LikeService, liked_query, liked_set, mark_liked
+
+
+class AsyncLikeService:
+    """Non-blocking versions of the ``LikeService`` reads for the ASGI app.
+
+    Liked ids share ``LikeService``'s cache, so a set loaded by either app
+    serves both and their invalidations reach each other.
+    """
+
+    @staticmethod
+    async def liked_ids(user_id: str) -> FrozenSet[bytes]:
+        """Binary ids of every restaurant the user likes"""
+        async def load():
+            likes = await async_db.get_db().restaurant_likes.find(*liked_query(user_id)).to_list(length=None)
+            return liked_set(likes)
+        return await LikeService.liked_ids.cache().get_or_load_async(str(user_id), load)
+
+    @staticmethod
+    async def decorate(cards: Iterable, user_id: Optional[str] = None) -> List[dict]:
+        """Cards (read models or dicts with an ``id``) as dicts with ``isLiked``"""
+        liked = await AsyncLikeService.liked_ids(str(user_id)) if user_id else frozenset()
+        return mark_liked(cards, liked)
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import FrozenSet, List, Optional
+
+from bson import ObjectId
+
+from config.async_database import async_db
+from services.notification_service import NotificationService
+from services.order_event_service import WITHOUT_EVENTS
+
+
+class AsyncOrderService:
+    """Non-blocking versions of the ``OrderService`` reads for the ASGI app"""
+
+    @staticmethod
+    async def get_order(order_id: str) -> dict:
+        """Get order details"""
+        order = await async_db.get_db().orders.find_one({'_id': ObjectId(order_id)}, WITHOUT_EVENTS)
+        if not order:
+            raise ValueError("Order not found")
+        return order
+
+    @staticmethod
+    async def list_orders(
+        user_id: Optional[str] = None,
+        restaurant_id: Optional[str] = None,
+        status: Optional[str] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[dict]:
+        """List orders with filtering"""
+        query = {}
+
+        if user_id:
+            query['user_id'] = user_id
+        if restaurant_id:
+            query['restaurant_id'] = restaurant_id
+        if status:
+            query['status'] = status
+
+        if from_date or to_date:
+            query['created_at'] = {}
+            if from_date:
+                query['created_at']['$gte'] = from_date
+            if to_date:
+                query['created_at']['$lte'] = to_date
+
+        return await AsyncOrderService.find_orders(query, skip, limit)
+
+    @staticmethod
+    async def owned_restaurants(user_id: str) -> FrozenSet[str]:
+        """Ids of the restaurants a user owns, sharing ``NotificationService``'s cache"""
+        async def load():
+            restaurants = await async_db.get_db().restaurants.find({'owner_id': user_id}, {'_id': 1}).to_list(length=None)
+            return frozenset(str(restaurant['_id']) for restaurant in restaurants)
+        return await NotificationService.owned_restaurants.cache().get_or_load_async(user_id, load)
+
+    @staticmethod
+    async def find_orders(query: dict, skip: int = 0, limit: int = 50) -> List[dict]:
+        """Orders matching a prepared filter, newest first"""
+        cursor = (async_db.get_db().orders.find(query, WITHOUT_EVENTS)
+                  .sort('created_at', -1)
+                  .skip(skip)
+                  .limit(limit))
+        return await cursor.to_list(length=limit)
@@ -48,18 +48,22 @@ class AuthService:
         }
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
 
-    def verify_token(self, token):
+    def decode_token(self, token):
+        """Payload of a token issued by ``generate_token``, without a user lookup"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
-            user = User.get_by_id(payload['user_id'])
-            if not user or not user.is_active:
-                return None
-            return user
+            return jwt.decode(token, self.secret_key, algorithms=['HS256'])
         except jwt.ExpiredSignatureError:
             raise ValueError("Token has expired")
         except jwt.InvalidTokenError:
             raise ValueError("Invalid token")
 
+    def verify_token(self, token):
+        payload = self.decode_token(token)
+        user = User.get_by_id(payload['user_id'])
+        if not user or not user.is_active:
+            return None
+        return user
+
     def refresh_token(self, refresh_token):
         try:
             user = self.verify_token(refresh_token)
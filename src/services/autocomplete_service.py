@@ -0,0 +1,351 @@
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional
+import heapq
+import os
+import re
+import unicodedata
+
+from config.database import db
+from services.notification_service import socketio
+
+# (kind, collection, filter for live documents, parent field, score field)
+SOURCES = [
+    ('restaurant', 'restaurant_cards', {'is_active': True}, None, 'rating'),
+    ('menu_item', 'menu_items', {'is_available': True}, 'restaurant_id', None),
+    ('grocery_product', 'grocery_products', {'in_stock': True}, 'store_id', None),
+]
+KIND_IDS = {source[0]: i for i, source in enumerate(SOURCES)}
+
+MAX_ENTRIES = int(os.getenv('AUTOCOMPLETE_MAX_ENTRIES', 200000))
+INFIX_SCAN_LIMIT = 1000
+DELTA_SCAN_LIMIT = 2000
+DELTA_MERGE_SIZE = 5000
+RECONCILE_SECONDS = float(os.getenv('AUTOCOMPLETE_RECONCILE_SECONDS', 600))
+PREFIX_BONUS = 10.0  # ranks word-prefix matches above infix matches
+KEY_END = '\x7f'  # sorts after every normalized character
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AutocompleteIndex:
+    """Prefix + trigram index over catalog names.
+
+    Entries live in parallel arrays addressed by an integer entry id. Every
+    word start of a name is a key in a sorted key array, so "burg" finds
+    "Classic Burger". A segment tree over the keys holds the best-scored
+    key of each range, which makes top-k for any prefix O(k log n) without
+    scanning all matches. Trigram postings (``array('I')``, best-scored
+    entries first) serve infix matches for longer queries.
+
+    Incremental upserts go to a small sorted delta and tombstone the old
+    entry; the delta is merged periodically and the whole index is rebuilt
+    once tombstones dominate or it grows past ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self.kinds = array('B')
+        self.scores = array('f')
+        self.alive = bytearray()
+        self.labels: List[str] = []
+        self.norm_labels: List[str] = []
+        self.refs: List[tuple] = []  # (id, parent_id)
+        self.entry_of: Dict[tuple, int] = {}  # (kind_id, id) -> entry
+        self.prefix = ([], array('I'), array('I'))  # sorted keys, entry ids, segment tree
+        self.delta: List[tuple] = []  # sorted (key, entry)
+        self.trigram_postings: Dict[str, array] = {}
+        self.live_count = 0
+
+    def __len__(self):
+        return self.live_count
+
+    def _append(self, kind_id: int, doc_id: str, parent_id: Optional[str], label: str, score: float) -> Optional[int]:
+        norm = normalize(label)
+        if not norm:
+            return None
+        entry = len(self.labels)
+        self.kinds.append(kind_id)
+        self.scores.append(score)
+        self.alive.append(1)
+        self.labels.append(label)
+        self.norm_labels.append(norm)
+        self.refs.append((doc_id, parent_id))
+        self.entry_of[(kind_id, doc_id)] = entry
+        self.live_count += 1
+        for gram in trigrams(f' {norm} '):
+            self.trigram_postings.setdefault(gram, array('I')).append(entry)
+        return entry
+
+    def _word_keys(self, entry: int):
+        norm = self.norm_labels[entry]
+        starts = [0] + [i + 1 for i, char in enumerate(norm) if char == ' ']
+        return [norm[i:] for i in starts]
+
+    def _remove(self, kind_id: int, doc_id: str):
+        entry = self.entry_of.pop((kind_id, doc_id), None)
+        if entry is not None and self.alive[entry]:
+            self.alive[entry] = 0
+            self.live_count -= 1
+
+    def _set_prefix(self, pairs: List[tuple]):
+        """Install sorted (key, entry) pairs and build the range-max segment tree"""
+        keys = [key for key, _ in pairs]
+        entries = array('I', (entry for _, entry in pairs))
+        size = 1
+        while size < len(keys):
+            size <<= 1
+        tree = array('I', bytes(4 * 2 * size))
+        for i in range(len(keys)):
+            tree[size + i] = i
+        scores, n = self.scores, len(keys)
+        for node in range(size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            if right < n and (left >= n or scores[entries[right]] > scores[entries[left]]):
+                left = right
+            tree[node] = left if left < n else n
+        self.prefix = (keys, entries, tree)
+
+    def build(self, rows: List[tuple]):
+        """Load (kind, id, parent_id, label, score) rows into an empty index, keeping the best-scored"""
+        rows = sorted(rows, key=lambda r: r[4], reverse=True)[:self.max_entries]
+        with self._lock:
+            pairs = []
+            for kind, doc_id, parent_id, label, score in rows:
+                entry = self._append(KIND_IDS[kind], doc_id, parent_id, label, score)
+                if entry is not None:
+                    pairs.extend((key, entry) for key in self._word_keys(entry))
+            pairs.sort()
+            self._set_prefix(pairs)
+
+    def upsert(self, kind: str, doc_id: str, parent_id: Optional[str], label: str, score: float):
+        with self._lock:
+            kind_id = KIND_IDS[kind]
+            self._remove(kind_id, doc_id)
+            entry = self._append(kind_id, doc_id, parent_id, label, score)
+            if entry is None:
+                return
+            delta = list(self.delta)
+            for key in self._word_keys(entry):
+                insort(delta, (key, entry))
+            self.delta = delta
+            if len(delta) >= DELTA_MERGE_SIZE:
+                keys, entries, _ = self.prefix
+                self._set_prefix([
+                    (key, e) for key, e in heapq.merge(zip(keys, entries), delta) if self.alive[e]
+                ])
+                self.delta = []
+
+    def remove(self, kind: str, doc_id: str):
+        with self._lock:
+            self._remove(KIND_IDS[kind], doc_id)
+
+    def ids(self, kind: str) -> List[str]:
+        """Ids of the live entries of ``kind``"""
+        kind_id = KIND_IDS[kind]
+        with self._lock:
+            return [doc_id for k, doc_id in self.entry_of if k == kind_id]
+
+    def needs_compaction(self) -> bool:
+        return len(self.labels) > 2 * max(self.live_count, 1000) or self.live_count > self.max_entries
+
+    def rows(self) -> List[tuple]:
+        """Live entries as build() rows, used to compact the index"""
+        kinds = [source[0] for source in SOURCES]
+        return [
+            (kinds[self.kinds[e]], self.refs[e][0], self.refs[e][1], self.labels[e], self.scores[e])
+            for e in range(len(self.labels)) if self.alive[e]
+        ]
+
+    def _range_max(self, tree, entries, n, lo, hi) -> int:
+        """Position of the best-scored key in [lo, hi)"""
+        size = len(tree) // 2
+        best, lo, hi = n, lo + size, hi + size
+        scores = self.scores
+        while lo < hi:
+            for node in ((lo,) if lo & 1 else ()) + ((hi - 1,) if hi & 1 else ()):
+                pos = tree[node]
+                if pos < n and (best == n or scores[entries[pos]] > scores[entries[best]]):
+                    best = pos
+            lo = (lo + 1) >> 1
+            hi >>= 1
+        return best
+
+    def _prefix_top(self, norm: str, limit: int, wanted) -> List[int]:
+        keys, entries, tree = self.prefix
+        n = len(keys)
+        found, seen = [], set()
+        lo, hi = bisect_left(keys, norm), bisect_left(keys, norm + KEY_END)
+        heap = []
+        if lo < hi:
+            pos = self._range_max(tree, entries, n, lo, hi)
+            heap.append((-self.scores[entries[pos]], pos, lo, hi))
+        while heap and len(found) < limit:
+            _, pos, lo, hi = heapq.heappop(heap)
+            entry = entries[pos]
+            if entry not in seen and wanted(entry):
+                seen.add(entry)
+                found.append(entry)
+            for sub_lo, sub_hi in ((lo, pos), (pos + 1, hi)):
+                if sub_lo < sub_hi:
+                    sub = self._range_max(tree, entries, n, sub_lo, sub_hi)
+                    heapq.heappush(heap, (-self.scores[entries[sub]], sub, sub_lo, sub_hi))
+
+        delta = self.delta
+        start = bisect_left(delta, (norm, -1))
+        for key, entry in delta[start:start + DELTA_SCAN_LIMIT]:
+            if not key.startswith(norm):
+                break
+            if entry not in seen and wanted(entry):
+                seen.add(entry)
+                found.append(entry)
+        return found
+
+    def _infix_matches(self, norm: str, limit: int, wanted) -> List[int]:
+        postings = [self.trigram_postings.get(gram) for gram in trigrams(norm)]
+        if not postings or any(p is None for p in postings):
+            return []
+        found = []
+        for entry in min(postings, key=len)[:INFIX_SCAN_LIMIT]:
+            if norm in self.norm_labels[entry] and wanted(entry):
+                found.append(entry)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[dict]:
+        norm = normalize(query)
+        if not norm:
+            return []
+        kind_filter = {KIND_IDS[k] for k in kinds} if kinds else None
+
+        def wanted(entry):
+            return self.alive[entry] and (kind_filter is None or self.kinds[entry] in kind_filter)
+
+        scored = {e: self.scores[e] + PREFIX_BONUS for e in self._prefix_top(norm, limit, wanted)}
+        if len(scored) < limit and len(norm) >= 3:
+            for e in self._infix_matches(norm, limit * 2, wanted):
+                scored.setdefault(e, self.scores[e])
+        ranked = heapq.nlargest(limit, scored, key=scored.get)
+
+        kinds_by_id = [source[0] for source in SOURCES]
+        suggestions = []
+        for e in ranked:
+            doc_id, parent_id = self.refs[e]
+            suggestion = {'type': kinds_by_id[self.kinds[e]], 'id': doc_id, 'label': self.labels[e]}
+            if parent_id:
+                suggestion['parent_id'] = parent_id
+            suggestions.append(suggestion)
+        return suggestions
+
+
+class AutocompleteService:
+    def __init__(self):
+        self.index = AutocompleteIndex()
+        self.last_refresh: Optional[datetime] = None
+        self.last_reconcile: Optional[datetime] = None
+
+    @staticmethod
+    def _row(kind, parent_field, score_field, doc):
+        score = float(doc.get(score_field) or 0) if score_field else 0.0
+        if doc.get('is_featured'):
+            score += 1.0
+        parent = doc.get(parent_field) if parent_field else None
+        return (kind, str(doc['_id']), str(parent) if parent else None, doc.get('name', ''), score)
+
+    @staticmethod
+    def _projection(parent_field, score_field):
+        projection = {'name': 1, 'is_featured': 1}
+        for field in (parent_field, score_field):
+            if field:
+                projection[field] = 1
+        return projection
+
+    def build(self):
+        """Load every live catalog name and rebuild the index"""
+        started = datetime.utcnow()
+        rows = []
+        for kind, collection, live, parent_field, score_field in SOURCES:
+            cursor = db.get_db()[collection].find(live, self._projection(parent_field, score_field))
+            rows.extend(self._row(kind, parent_field, score_field, doc) for doc in cursor)
+
+        # Build off to the side and swap, so readers never see a half-built index
+        index = AutocompleteIndex()
+        index.build(rows)
+        self.index = index
+        self.last_refresh = self.last_reconcile = started
+
+    def reconcile(self) -> int:
+        """Remove entries whose documents were deleted or are no longer live.
+
+        ``refresh`` only sees documents that still exist, so deletes are
+        caught here (or sooner by the change watcher). Returns the number
+        of entries removed.
+        """
+        started = datetime.utcnow()
+        removed = 0
+        for kind, collection, live, _, _ in SOURCES:
+            live_ids = {str(doc['_id']) for doc in db.get_db()[collection].find(live, {'_id': 1})}
+            for doc_id in self.index.ids(kind):
+                if doc_id not in live_ids:
+                    self.index.remove(kind, doc_id)
+                    removed += 1
+        self.last_reconcile = started
+        return removed
+
+    def refresh(self):
+        """Apply documents changed since the last refresh, reconciling deletions periodically"""
+        if self.last_refresh is None:
+            return self.build()
+        started = datetime.utcnow()
+        for kind, collection, live, parent_field, score_field in SOURCES:
+            projection = self._projection(parent_field, score_field)
+            projection.update({field: 1 for field in live})
+            changed = db.get_db()[collection].find({'updated_at': {'$gte': self.last_refresh}}, projection)
+            for doc in changed:
+                if all(doc.get(field) == value for field, value in live.items()):
+                    self.index.upsert(*self._row(kind, parent_field, score_field, doc))
+                else:
+                    self.index.remove(kind, str(doc['_id']))
+        self.last_refresh = started
+        if (started - self.last_reconcile).total_seconds() >= RECONCILE_SECONDS:
+            self.reconcile()
+        if self.index.needs_compaction():
+            index = AutocompleteIndex()
+            index.build(self.index.rows())
+            self.index = index
+
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[List[str]] = None) -> List[dict]:
+        return self.index.suggest(query, limit, kinds)
+
+
+# Create a singleton instance
+autocomplete_service = AutocompleteService()
+
+
+def start_autocomplete_refresher(interval: Optional[float] = None):
+    """Build the index in the background, then refresh it every ``interval`` seconds"""
+    interval = interval or float(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', 60))
+
+    def loop():
+        while True:
+            try:
+                autocomplete_service.refresh()
+            except Exception as e:
+                print(f"Autocomplete refresh failed: {str(e)}")
+            socketio.sleep(interval)
+
+    return socketio.start_background_task(loop)
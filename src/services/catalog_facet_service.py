@@ -0,0 +1,140 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from config.database import db
+from utils.http_cache import bump_version
+
+# Lower bounds of the price buckets; the last bucket is open-ended
+PRICE_BOUNDARIES = [0, 2, 5, 10, 20, 50]
+
+# Product fields the facet counts are built from
+FACET_FIELDS = ['store_id', 'category', 'price', 'in_stock']
+
+# Materialized facets older than this are recomputed on read, bounding the
+# drift from product deletes the change watcher can't attribute to a store
+MAX_AGE_SECONDS = float(os.getenv('CATALOG_FACETS_MAX_AGE_SECONDS', 3600))
+
+
+def price_bucket(price: float) -> str:
+    """Label of the price bucket containing ``price``"""
+    for low, high in zip(PRICE_BOUNDARIES, PRICE_BOUNDARIES[1:]):
+        if low <= price < high:
+            return f"{low}-{high}"
+    return f"{PRICE_BOUNDARIES[-1]}+"
+
+
+class CatalogFacetService:
+    """Materialized per-store facet counts in ``store_catalog_facets``.
+
+    Documents are keyed by store id and hold total/in-stock counts, a
+    per-category breakdown and price bucket counts. They are computed with
+    a single ``$facet`` aggregation on first read (or by ``refresh``) and
+    then kept current with ``$inc`` deltas from ``apply_product_change``,
+    which the change watcher calls for every product write. Deletes the
+    watcher can't attribute to a store drop every materialized document
+    (``invalidate``), and documents are recomputed in full once older than
+    ``MAX_AGE_SECONDS`` (polling never sees deletes). Category keys
+    are category ids, so they never contain dots. Products without an
+    ``in_stock`` field are in stock, as in ``GroceryProduct``.
+    """
+
+    @staticmethod
+    def compute(store_id: str) -> dict:
+        """Aggregate facet counts for a store from grocery_products"""
+        in_stock = {'$sum': {'$cond': [{'$ne': [{'$ifNull': ['$in_stock', True]}, False]}, 1, 0]}}
+        [result] = db.get_db().grocery_products.aggregate([
+            {'$match': {'store_id': store_id}},
+            {'$facet': {
+                'totals': [
+                    {'$group': {'_id': None, 'total': {'$sum': 1}, 'in_stock': in_stock}}
+                ],
+                'categories': [
+                    {'$group': {'_id': '$category', 'count': {'$sum': 1}, 'in_stock': in_stock}}
+                ],
+                'prices': [
+                    {'$bucket': {
+                        'groupBy': '$price',
+                        'boundaries': PRICE_BOUNDARIES + [float('inf')],
+                        'default': 'other',
+                        'output': {'count': {'$sum': 1}}
+                    }}
+                ]
+            }}
+        ])
+
+        totals = result['totals'][0] if result['totals'] else {'total': 0, 'in_stock': 0}
+        now = datetime.utcnow()
+        return {
+            '_id': store_id,
+            'total': totals['total'],
+            'in_stock': totals['in_stock'],
+            'categories': {
+                c['_id']: {'count': c['count'], 'in_stock': c['in_stock']}
+                for c in result['categories'] if c['_id'] is not None
+            },
+            'price_buckets': {
+                price_bucket(b['_id']): b['count']
+                for b in result['prices'] if b['_id'] != 'other'
+            },
+            'computed_at': now,
+            'updated_at': now
+        }
+
+    @staticmethod
+    def refresh(store_id: str) -> dict:
+        """Recompute and store the facets for a store"""
+        facets = CatalogFacetService.compute(store_id)
+        db.get_db().store_catalog_facets.replace_one({'_id': store_id}, facets, upsert=True)
+        return facets
+
+    @staticmethod
+    def get(store_id: str) -> dict:
+        """Facets for a store: one read by _id, computed on first access and once stale"""
+        facets = db.get_db().store_catalog_facets.find_one({'_id': store_id})
+        stale_before = datetime.utcnow() - timedelta(seconds=MAX_AGE_SECONDS)
+        if not facets or facets.get('computed_at', datetime.min) < stale_before:
+            facets = CatalogFacetService.refresh(store_id)
+        return facets
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop every materialized store; each is recomputed on its next read"""
+        db.get_db().store_catalog_facets.delete_many({})
+        bump_version('grocery_products')
+
+    @staticmethod
+    def _deltas(product: dict, sign: int) -> dict:
+        in_stock = sign if product.get('in_stock') is not False else 0
+        category = product.get('category')
+        deltas = {'total': sign, 'in_stock': in_stock}
+        if category:
+            deltas[f'categories.{category}.count'] = sign
+            deltas[f'categories.{category}.in_stock'] = in_stock
+        if product.get('price') is not None:
+            deltas[f'price_buckets.{price_bucket(product["price"])}'] = sign
+        return deltas
+
+    @staticmethod
+    def apply_product_change(before: Optional[dict], after: Optional[dict]) -> None:
+        """Apply a product insert (before=None), update or delete (after=None) to the facets.
+
+        Stores without a materialized document are skipped; they are
+        computed in full on their next read.
+        """
+        per_store = {}
+        for product, sign in ((before, -1), (after, 1)):
+            if not product:
+                continue
+            deltas = per_store.setdefault(product['store_id'], {})
+            for field, value in CatalogFacetService._deltas(product, sign).items():
+                deltas[field] = deltas.get(field, 0) + value
+
+        for store_id, deltas in per_store.items():
+            deltas = {field: value for field, value in deltas.items() if value}
+            if deltas:
+                db.get_db().store_catalog_facets.update_one(
+                    {'_id': store_id},
+                    {'$inc': deltas, '$set': {'updated_at': datetime.utcnow()}}
+                )
+        bump_version('grocery_products')
@@ -0,0 +1,341 @@
+"""
+Cache invalidation driven by MongoDB change streams.
+
+Writes to tax rules, menus, likes, restaurants and grocery products happen
+in many places, so instead of every write path remembering which caches to drop, each
+worker tails the collections its caches are built from and evicts
+affected entries when any writer changes them. On a standalone server, where change streams are
+unavailable, the watcher polls each collection's timestamp field instead;
+that fallback cannot see deletes, which stay covered by the write paths'
+own invalidation and cache TTLs. When a stream cannot resume because the
+oplog moved past its resume token, every derived cache is dropped.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+import os
+import threading
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config.database import db
+from utils.cache import get_cache_backend
+from utils.http_cache import bump_version
+
+# Server error codes meaning change streams are not available here
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+# ChangeStreamHistoryLost and InvalidResumeToken: changes since the resume
+# token may have been missed
+RESUME_FAILED = {286, 260}
+
+# Collections whose writes bump their ``collection_versions`` counter
+VERSIONED_COLLECTIONS = ['grocery_categories', 'grocery_stores', 'grocery_products']
+
+POLL_OVERLAP = timedelta(seconds=2)  # re-read this much history to absorb clock skew
+ONCE_TTL = 600  # seconds a cluster-wide handler run is remembered
+
+# handler(document_id, document) where ``document`` holds at least the
+# subscribed keys, or is None when the document was deleted. Handlers
+# subscribed with ``pre_image=True`` also get the document as it was
+# before the change: None for inserts, NO_PRE_IMAGE when unknown.
+Handler = Callable[..., None]
+
+NO_PRE_IMAGE = object()
+
+
+class _Subscription:
+    __slots__ = ('collection', 'handler', 'fields', 'keys', 'once', 'timestamp_field', 'pre_image')
+
+    def __init__(self, collection, handler, fields, keys, once, timestamp_field, pre_image):
+        self.collection = collection
+        self.handler = handler
+        self.fields = tuple(fields)
+        self.keys = tuple(keys)
+        self.once = once
+        self.timestamp_field = timestamp_field
+        self.pre_image = pre_image
+
+    def wants(self, updated_fields: Optional[Iterable[str]]) -> bool:
+        """Whether an update touching ``updated_fields`` (None: unknown) concerns this handler"""
+        if updated_fields is None or not self.fields:
+            return True
+        return any(
+            path.split('.', 1)[0] in self.fields or field.startswith(path + '.')
+            for path in updated_fields for field in self.fields
+        )
+
+
+class ChangeWatcher:
+    """Dispatches document changes of watched collections to cache handlers.
+
+    Handlers run in every worker, so evicting in-process entries works
+    everywhere. Handlers subscribed with ``once=True`` write shared state
+    (such as read models) and run in one worker per change, arbitrated
+    through the shared cache backend.
+    """
+
+    def __init__(self, poll_interval: float = 5.0, backend=None):
+        self.poll_interval = poll_interval
+        self.backend = backend
+        self.subscriptions: Dict[str, List[_Subscription]] = defaultdict(list)
+        self.mode = None
+        self._stop = threading.Event()
+        self._resume_token = None
+        self._poll_since: Dict[str, datetime] = {}
+        self._reset_handlers: List[Callable[[], None]] = []
+
+    def subscribe(self, collection: str, handler: Handler, fields: Iterable[str] = (),
+                  keys: Iterable[str] = (), once: bool = False,
+                  timestamp_field: str = 'updated_at', pre_image: bool = False) -> None:
+        """Call ``handler`` on inserts, deletes and updates touching ``fields`` (any if
+        empty) in ``collection``; ``keys`` are the fields the handler reads.
+
+        Pre-images need MongoDB 6.0 with ``changeStreamPreAndPostImages``
+        enabled on the collection; polling never has them.
+        """
+        self.subscriptions[collection].append(
+            _Subscription(collection, handler, fields, keys, once, timestamp_field, pre_image)
+        )
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        """Call ``handler`` when changes may have been missed and every
+        derived cache must be dropped or rebuilt"""
+        self._reset_handlers.append(handler)
+
+    def reset(self) -> None:
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as e:
+                print(f"Change watcher reset handler failed: {str(e)}")
+
+    def dispatch(self, collection: str, document_id, document: Optional[dict],
+                 updated_fields: Optional[Iterable[str]] = None, event_id: Optional[str] = None,
+                 before=NO_PRE_IMAGE, after: Optional[dict] = None) -> None:
+        """Run the handlers concerned by a change; ``after`` is the exact post-image
+        for pre-image handlers when it differs from the looked-up ``document``"""
+        if updated_fields is not None:
+            updated_fields = list(updated_fields)
+        for subscription in self.subscriptions.get(collection, ()):
+            if not subscription.wants(updated_fields):
+                continue
+            if subscription.once and event_id is not None and not self._claim(subscription, event_id):
+                continue
+            try:
+                if subscription.pre_image:
+                    subscription.handler(document_id, document if after is None else after, before)
+                else:
+                    subscription.handler(document_id, document)
+            except Exception as e:
+                print(f"Change handler for {collection} failed: {str(e)}")
+
+    def _claim(self, subscription: _Subscription, event_id: str) -> bool:
+        backend = self.backend or get_cache_backend()
+        key = f"change:{subscription.collection}:{subscription.handler.__qualname__}:{event_id}"
+        return backend.add(key, b'1', ONCE_TTL)
+
+    def _projection(self, collection: str) -> dict:
+        projection = {}
+        for subscription in self.subscriptions[collection]:
+            projection.update({key: 1 for key in subscription.keys})
+            projection[subscription.timestamp_field] = 1
+        return projection
+
+    def watch(self) -> None:
+        """Tail a change stream over the watched collections until stopped"""
+        pipeline = [{'$match': {
+            'ns.coll': {'$in': list(self.subscriptions)},
+            'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}
+        }}]
+        pre_images = any(s.pre_image for subscriptions in self.subscriptions.values() for s in subscriptions)
+        with db.get_db().watch(
+            pipeline, full_document='updateLookup', resume_after=self._resume_token, max_await_time_ms=1000,
+            full_document_before_change='whenAvailable' if pre_images else None
+        ) as stream:
+            self.mode = 'change_stream'
+            while not self._stop.is_set():
+                change = stream.try_next()
+                if change is None:
+                    continue
+                self._resume_token = stream.resume_token
+                self._dispatch_change(change)
+
+    def _dispatch_change(self, change: dict) -> None:
+        collection = change['ns']['coll']
+        document_id = change['documentKey']['_id']
+        updated_fields = None
+        if change['operationType'] == 'update':
+            description = change.get('updateDescription', {})
+            updated_fields = list(description.get('updatedFields', {})) + description.get('removedFields', [])
+        document = None if change['operationType'] == 'delete' else change.get('fullDocument')
+        before, after = None, None
+        if change['operationType'] != 'insert':
+            before = change.get('fullDocumentBeforeChange') or NO_PRE_IMAGE
+        if change['operationType'] == 'update' and before is not NO_PRE_IMAGE:
+            # The looked-up document may already include later changes
+            after = _apply_update(before, change.get('updateDescription', {}))
+        self.dispatch(collection, document_id, document, updated_fields,
+                      event_id=str(change['_id']['_data']), before=before, after=after)
+
+    def poll(self) -> None:
+        """Dispatch documents whose timestamp field moved since the previous poll"""
+        self.mode = 'polling'
+        for collection, subscriptions in self.subscriptions.items():
+            started = datetime.utcnow()
+            since = self._poll_since.get(collection)
+            if since is not None:
+                for timestamp_field in {s.timestamp_field for s in subscriptions}:
+                    changed = db.get_db()[collection].find(
+                        {timestamp_field: {'$gte': since - POLL_OVERLAP}}, self._projection(collection)
+                    )
+                    for document in changed:
+                        stamp = document.get(timestamp_field)
+                        event_id = f"{document['_id']}:{stamp.isoformat() if stamp else ''}"
+                        self.dispatch(collection, document['_id'], document, event_id=event_id)
+            self._poll_since[collection] = started
+
+    def run(self) -> None:
+        """Watch with a change stream, falling back to polling on standalone servers"""
+        while not self._stop.is_set():
+            try:
+                if self.mode != 'polling':
+                    self.watch()
+                    continue
+                self.poll()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    print("Change streams unavailable, polling for cache invalidation")
+                    self.poll()
+                elif e.code in RESUME_FAILED:
+                    print(f"Change stream cannot resume, invalidating every cache: {str(e)}")
+                    self._resume_token = None
+                    self.reset()
+                else:
+                    print(f"Change watcher error: {str(e)}")
+            except PyMongoError as e:
+                print(f"Change watcher error: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def _apply_update(before: dict, description: dict) -> dict:
+    """Post-image of an update from its pre-image; only top-level fields are applied"""
+    after = dict(before)
+    after.update({path: value for path, value in description.get('updatedFields', {}).items() if '.' not in path})
+    for path in description.get('removedFields', []):
+        after.pop(path, None)
+    return after
+
+
+def register_cache_handlers(watcher: ChangeWatcher) -> ChangeWatcher:
+    """Wire the application's caches to the collections they are built from"""
+    from services.autocomplete_service import SOURCES, autocomplete_service
+    from services.catalog_facet_service import FACET_FIELDS, CatalogFacetService
+    from services.like_service import LikeService
+    from services.menu_service import MenuService
+    from services.notification_service import NotificationService
+    from services.order_service import OrderService
+    from services.restaurant_card_service import RestaurantCardService
+
+    def tax_rule_changed(_, rule):
+        if rule is not None:
+            OrderService.get_tax_rules.invalidate(rule['restaurant_id'])
+
+    def menu_item_changed(_, item):
+        if item is not None:
+            MenuService.evict(item['restaurant_id'])
+        else:
+            MenuService.evict()
+
+    def menu_version_changed(restaurant_id, _):
+        MenuService.evict(str(restaurant_id))
+
+    def restaurant_changed(restaurant_id, _):
+        RestaurantCardService.sync(restaurant_id)
+
+    def owner_changed(_, restaurant, before):
+        # The previous owner is only known from the pre-image; without one
+        # any owner may have lost the restaurant
+        if before is NO_PRE_IMAGE:
+            NotificationService.owned_restaurants.clear()
+            return
+        for document in (restaurant, before):
+            if document and document.get('owner_id'):
+                NotificationService.owned_restaurants.invalidate(str(document['owner_id']))
+
+    def catalog_entry_deleted(kind):
+        def handler(document_id, document):
+            if document is None:
+                autocomplete_service.index.remove(kind, str(document_id))
+        return handler
+
+    def product_facets_changed(_, product, before):
+        if before is not NO_PRE_IMAGE:
+            CatalogFacetService.apply_product_change(before, product)
+        elif product is not None:
+            CatalogFacetService.refresh(product['store_id'])
+        else:
+            # A delete without a pre-image: the store is unknown
+            CatalogFacetService.invalidate()
+
+    def versioned_collection_changed(collection):
+        def handler(_, __):
+            bump_version(collection)
+        return handler
+
+    def like_changed(_, like, before):
+        # Deletes only carry the user in the pre-image; without one they
+        # rely on the writer's own invalidation (the toggle endpoint's)
+        for document in (like, before):
+            if document and document is not NO_PRE_IMAGE:
+                LikeService.invalidate(document['user_id'])
+
+    def reset_caches():
+        OrderService.get_tax_rules.clear()
+        MenuService.evict()
+        LikeService.liked_ids.clear()
+        NotificationService.owned_restaurants.clear()
+        autocomplete_service.reconcile()
+        CatalogFacetService.invalidate()
+        bump_version(*VERSIONED_COLLECTIONS)
+        RestaurantCardService.rebuild()
+
+    watcher.subscribe('tax_rules', tax_rule_changed, keys=['restaurant_id'])
+    watcher.subscribe('menu_items', menu_item_changed, keys=['restaurant_id'])
+    watcher.subscribe('restaurants', menu_version_changed, fields=['menu_version'])
+    watcher.subscribe(
+        'restaurants', restaurant_changed,
+        ['name', 'cuisine_types', 'price_range', 'rating', 'total_ratings', 'delivery_fee',
+         'estimated_delivery_time', 'images', 'is_active', 'address', 'open_intervals'],
+        once=True
+    )
+    watcher.subscribe('restaurants', owner_changed, fields=['owner_id'], keys=['owner_id'], pre_image=True)
+    # Updates never touch _id, so these only see inserts and deletes
+    for kind, collection, *_ in SOURCES:
+        watcher.subscribe(collection, catalog_entry_deleted(kind), fields=['_id'])
+    watcher.subscribe(
+        'grocery_products', product_facets_changed, FACET_FIELDS, keys=FACET_FIELDS, once=True, pre_image=True
+    )
+    # ETags of cached grocery responses are derived from these versions
+    for collection in VERSIONED_COLLECTIONS:
+        watcher.subscribe(collection, versioned_collection_changed(collection), once=True)
+    watcher.subscribe(
+        'restaurant_likes', like_changed, keys=['user_id'], timestamp_field='created_at', pre_image=True
+    )
+    watcher.on_reset(reset_caches)
+    return watcher
+
+
+def start_change_watcher(poll_interval: Optional[float] = None) -> ChangeWatcher:
+    """Start this worker's cache invalidation watcher in a daemon thread.
+
+    A real thread rather than a socketio background task, because waiting
+    on the change stream blocks and must not stall an unpatched event loop.
+    """
+    interval = poll_interval or float(os.getenv('CHANGE_WATCHER_POLL_SECONDS', 5))
+    watcher = register_cache_handlers(ChangeWatcher(poll_interval=interval))
+    thread = threading.Thread(target=watcher.run, name='change-watcher', daemon=True)
+    thread.start()
+    return watcher
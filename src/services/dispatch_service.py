@@ -0,0 +1,308 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import os
+
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from config.database import db
+from models.order import OrderStatus
+from services.notification_service import socketio
+from services.order_event_service import OrderEventService
+
+# Orders are stored with either the enum value or the enum name depending on
+# which write path touched them last, so match both spellings.
+DISPATCHABLE_STATUSES = [
+    OrderStatus.PREPARING.value, OrderStatus.READY.value,
+    OrderStatus.PREPARING.name, OrderStatus.READY.name
+]
+READY_STATUSES = {OrderStatus.READY.value, OrderStatus.READY.name}
+
+EARTH_RADIUS_KM = 6371.0
+AVERAGE_SPEED_KMH = float(os.getenv('DISPATCH_AVERAGE_SPEED_KMH', 25))
+MAX_PICKUP_KM = float(os.getenv('DISPATCH_MAX_PICKUP_KM', 8))
+IDLE_WEIGHT = 0.5  # cost per minute a driver waits at the restaurant
+AGE_WEIGHT = 0.2  # cost discount per minute a ready order has been waiting
+CANDIDATES_PER_ORDER = 8
+CHUNK_SIZE = 1024
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Vectorized great-circle distance in kilometres"""
+    lat1, lng1, lat2, lng2 = (np.radians(x) for x in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def project_km(points: np.ndarray, origin_lat: float) -> np.ndarray:
+    """Project (lat, lng) rows onto a local equirectangular plane in km.
+
+    Within the dispatch radius the error against haversine is well under 1%,
+    and plain euclidean distances are far cheaper over a full cost matrix.
+    """
+    radians = np.radians(points)
+    scale = np.array([1.0, np.cos(np.radians(origin_lat))]) * EARTH_RADIUS_KM
+    return (radians * scale).astype(np.float32)
+
+
+def build_cost_matrix(
+    pickup_xy: np.ndarray,
+    driver_xy: np.ndarray,
+    ready_in: np.ndarray,
+    waited: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Build (cost, pickup_eta) matrices of shape (orders, drivers).
+
+    Points are rows from ``project_km``. ``ready_in`` is the number of
+    minutes until each order's food is ready and ``waited`` how long a ready
+    order has already been waiting. Pairs beyond MAX_PICKUP_KM cost ``inf``.
+    """
+    dy = pickup_xy[:, 0:1] - driver_xy[:, 0][np.newaxis, :]
+    dx = pickup_xy[:, 1:2] - driver_xy[:, 1][np.newaxis, :]
+    distance = np.sqrt(dx * dx + dy * dy)
+    travel = distance * np.float32(60.0 / AVERAGE_SPEED_KMH)
+    ready_in = ready_in.astype(np.float32)[:, np.newaxis]
+    pickup_eta = np.maximum(travel, ready_in)
+    idle = np.maximum(ready_in - travel, 0)
+    cost = pickup_eta + IDLE_WEIGHT * idle - AGE_WEIGHT * waited.astype(np.float32)[:, np.newaxis]
+    cost[distance > MAX_PICKUP_KM] = np.inf
+    return cost, pickup_eta
+
+
+def solve_assignment(
+    pickup_points: np.ndarray,
+    driver_points: np.ndarray,
+    ready_in: np.ndarray,
+    waited: np.ndarray,
+    candidates: int = CANDIDATES_PER_ORDER
+) -> List[Tuple[int, int, float]]:
+    """Assign drivers to orders, returning (order_idx, driver_idx, pickup_eta).
+
+    The cost matrix is built in row chunks and only the ``candidates``
+    cheapest drivers per order are kept, so memory stays bounded for large
+    batches. Candidate pairs are then matched greedily in global cost order.
+    Orders that lose all their candidates are retried against the drivers
+    still free until no further match is possible.
+    """
+    assignments = []
+    origin_lat = float(np.mean(pickup_points[:, 0])) if len(pickup_points) else 0.0
+    pickup_xy = project_km(pickup_points, origin_lat)
+    driver_xy = project_km(driver_points, origin_lat)
+    order_idx = np.arange(len(pickup_points))
+    driver_idx = np.arange(len(driver_points))
+
+    while len(order_idx) and len(driver_idx):
+        k = min(candidates, len(driver_idx))
+        pair_orders, pair_drivers, pair_costs, pair_etas = [], [], [], []
+
+        for start in range(0, len(order_idx), CHUNK_SIZE):
+            rows = order_idx[start:start + CHUNK_SIZE]
+            cost, eta = build_cost_matrix(
+                pickup_xy[rows], driver_xy[driver_idx],
+                ready_in[rows], waited[rows]
+            )
+            if k < len(driver_idx):
+                best = np.argpartition(cost, k - 1, axis=1)[:, :k]
+            else:
+                best = np.broadcast_to(np.arange(k), (len(rows), k))
+            best_cost = np.take_along_axis(cost, best, axis=1)
+            finite = np.isfinite(best_cost)
+            pair_orders.append(np.broadcast_to(rows[:, np.newaxis], best.shape)[finite])
+            pair_drivers.append(driver_idx[best[finite]])
+            pair_costs.append(best_cost[finite])
+            pair_etas.append(np.take_along_axis(eta, best, axis=1)[finite])
+
+        pair_costs = np.concatenate(pair_costs)
+        if not len(pair_costs):
+            break
+        pair_orders = np.concatenate(pair_orders)
+        pair_drivers = np.concatenate(pair_drivers)
+        pair_etas = np.concatenate(pair_etas)
+
+        taken_orders, taken_drivers = set(), set()
+        for i in np.argsort(pair_costs, kind='stable'):
+            o, d = int(pair_orders[i]), int(pair_drivers[i])
+            if o in taken_orders or d in taken_drivers:
+                continue
+            taken_orders.add(o)
+            taken_drivers.add(d)
+            assignments.append((o, d, float(pair_etas[i])))
+
+        if not taken_orders:
+            break
+        order_idx = order_idx[~np.isin(order_idx, list(taken_orders))]
+        driver_idx = driver_idx[~np.isin(driver_idx, list(taken_drivers))]
+        if k >= len(driver_idx) + len(taken_drivers):
+            # Every free driver was already a candidate for every order
+            break
+
+    return assignments
+
+
+def _drop_point(order: dict) -> Optional[Tuple[float, float]]:
+    """Customer (lat, lng) of an order, None when it is missing"""
+    info = order.get('delivery_info') or {}
+    if info.get('latitude') is None or info.get('longitude') is None:
+        return None
+    return info['latitude'], info['longitude']
+
+
+class DispatchService:
+    @staticmethod
+    def load_batch(now: Optional[datetime] = None) -> Tuple[list, list]:
+        """Fetch unassigned preparing/ready orders and available drivers"""
+        now = now or datetime.utcnow()
+        orders = list(db.get_db().orders.find(
+            {
+                'status': {'$in': DISPATCHABLE_STATUSES},
+                'delivery_info.driver_id': None
+            },
+            {
+                'restaurant_id': 1, 'user_id': 1, 'status': 1, 'updated_at': 1,
+                'estimated_preparation_time': 1,
+                'delivery_info.latitude': 1, 'delivery_info.longitude': 1
+            }
+        ))
+        drivers = list(db.get_db().users.find(
+            {
+                'role': 'delivery_driver',
+                'is_available': True,
+                'current_location': {'$exists': True}
+            },
+            {'current_location': 1}
+        ))
+        if not orders or not drivers:
+            return [], []
+
+        # Skip malformed orders instead of failing the whole cycle on them
+        orders = [o for o in orders if _drop_point(o) is not None and ObjectId.is_valid(o.get('restaurant_id'))]
+        restaurant_ids = {ObjectId(o['restaurant_id']) for o in orders}
+        locations = {}
+        for r in db.get_db().restaurants.find(
+            {'_id': {'$in': list(restaurant_ids)}},
+            {'address.location.coordinates': 1}
+        ):
+            coordinates = ((r.get('address') or {}).get('location') or {}).get('coordinates')
+            if coordinates:
+                locations[str(r['_id'])] = coordinates
+        orders = [o for o in orders if o['restaurant_id'] in locations]
+        for o in orders:
+            lng, lat = locations[o['restaurant_id']]
+            o['pickup'] = (lat, lng)
+            elapsed = (now - (o.get('updated_at') or now)).total_seconds() / 60
+            if o['status'] in READY_STATUSES:
+                o['ready_in'], o['waited'] = 0.0, max(elapsed, 0.0)
+            else:
+                o['ready_in'] = max((o.get('estimated_preparation_time') or 0) - elapsed, 0.0)
+                o['waited'] = 0.0
+        return orders, drivers
+
+    @staticmethod
+    def run_cycle(now: Optional[datetime] = None) -> int:
+        """Run one dispatch pass and return the number of assignments made"""
+        now = now or datetime.utcnow()
+        orders, drivers = DispatchService.load_batch(now)
+        if not orders or not drivers:
+            return 0
+
+        pickup_points = np.array([o['pickup'] for o in orders], dtype=np.float64)
+        driver_points = np.array(
+            [d['current_location']['coordinates'][::-1] for d in drivers],
+            dtype=np.float64
+        )
+        ready_in = np.array([o['ready_in'] for o in orders], dtype=np.float32)
+        waited = np.array([o['waited'] for o in orders], dtype=np.float32)
+
+        assignments = solve_assignment(pickup_points, driver_points, ready_in, waited)
+        if not assignments:
+            return 0
+
+        # Leg from restaurant to customer does not depend on the driver
+        drop_points = np.array([_drop_point(orders[o]) for o, _, _ in assignments], dtype=np.float64)
+        pickups = np.array([orders[o]['pickup'] for o, _, _ in assignments], dtype=np.float64)
+        delivery_minutes = haversine_km(
+            pickups[:, 0], pickups[:, 1], drop_points[:, 0], drop_points[:, 1]
+        ) * (60.0 / AVERAGE_SPEED_KMH)
+
+        return DispatchService.assign([
+            (orders[o], drivers[d], pickup_eta, now + timedelta(minutes=pickup_eta + float(leg)))
+            for (o, d, pickup_eta), leg in zip(assignments, delivery_minutes)
+        ], now)
+
+    @staticmethod
+    def assign(pairs: List[Tuple[dict, dict, float, datetime]], now: datetime) -> int:
+        """Write (order, driver, pickup_eta, eta) assignments and return how many held.
+
+        Drivers are claimed in one bulk write guarded on still being
+        available, then the orders of the claimed drivers in one bulk write
+        guarded on still being unassigned. Drivers whose order was assigned
+        concurrently are handed back. Drivers are notified by the order's
+        ``delivery_update`` event, so only assignments that held notify.
+        """
+        users, orders = db.get_db().users, db.get_db().orders
+        users.bulk_write([
+            UpdateOne(
+                {'_id': driver['_id'], 'is_available': True},
+                {'$set': {'is_available': False, 'current_order_id': str(order['_id'])}}
+            )
+            for order, driver, _, _ in pairs
+        ], ordered=False)
+        claimed = {
+            (d['_id'], d.get('current_order_id'))
+            for d in users.find({'_id': {'$in': [driver['_id'] for _, driver, _, _ in pairs]}}, {'current_order_id': 1})
+        }
+        pairs = [pair for pair in pairs if (pair[1]['_id'], str(pair[0]['_id'])) in claimed]
+        if not pairs:
+            return 0
+
+        orders.bulk_write([
+            UpdateOne(
+                {'_id': order['_id'], 'delivery_info.driver_id': None},
+                {
+                    '$set': {
+                        'delivery_info.driver_id': str(driver['_id']),
+                        'delivery_info.estimated_delivery_time': eta,
+                        'updated_at': now
+                    },
+                    '$push': OrderEventService.push(OrderEventService.event(
+                        'delivery_update', now, status='driver_assigned',
+                        driver_id=str(driver['_id']),
+                        pickup_eta_minutes=round(pickup_eta, 1),
+                        estimated_delivery_time=eta
+                    ))
+                }
+            )
+            for order, driver, pickup_eta, eta in pairs
+        ], ordered=False)
+        assigned = {
+            (o['_id'], (o.get('delivery_info') or {}).get('driver_id'))
+            for o in orders.find({'_id': {'$in': [order['_id'] for order, _, _, _ in pairs]}}, {'delivery_info.driver_id': 1})
+        }
+        lost = [(order, driver) for order, driver, _, _ in pairs if (order['_id'], str(driver['_id'])) not in assigned]
+        if lost:
+            # Assigned concurrently: hand the drivers back
+            users.bulk_write([
+                UpdateOne(
+                    {'_id': driver['_id'], 'current_order_id': str(order['_id'])},
+                    {'$set': {'is_available': True}, '$unset': {'current_order_id': ''}}
+                )
+                for order, driver in lost
+            ], ordered=False)
+        return len(pairs) - len(lost)
+
+
+def start_dispatch_scheduler(interval: Optional[float] = None):
+    """Run DispatchService.run_cycle every ``interval`` seconds in the background"""
+    interval = interval or float(os.getenv('DISPATCH_INTERVAL_SECONDS', 5))
+
+    def loop():
+        while True:
+            try:
+                DispatchService.run_cycle()
+            except Exception as e:
+                print(f"Dispatch cycle failed: {str(e)}")
+            socketio.sleep(interval)
+
+    return socketio.start_background_task(loop)
@@ -0,0 +1,62 @@
+from typing import FrozenSet, Iterable, List, Optional
+
+from bson import ObjectId
+
+from config.database import db
+from utils.cache import cached
+
+# Writes invalidate the cached set (toggles directly, any other writer
+# through the change watcher); the TTL only bounds missed invalidations
+LIKED_IDS_TTL = 3600
+
+
+class LikeService:
+    """Per-user sets of liked restaurant ids for ``isLiked`` on any card list.
+
+    Each set holds the 12-byte binary form of the restaurant ObjectIds, so
+    checking a card is one hash lookup and a user with hundreds of likes
+    costs a few kilobytes of cache.
+    """
+
+    @staticmethod
+    @cached('liked_restaurants', ttl=LIKED_IDS_TTL, local_ttl=300, max_size=10000)
+    def liked_ids(user_id: str) -> FrozenSet[bytes]:
+        """Binary ids of every restaurant the user likes"""
+        return liked_set(db.restaurant_likes.find(*liked_query(user_id)))
+
+    @staticmethod
+    def invalidate(user_id: str) -> None:
+        """Drop a user's cached liked ids after their likes were written"""
+        LikeService.liked_ids.invalidate(str(user_id))
+
+    @staticmethod
+    def is_liked(user_id: Optional[str], restaurant_id: str) -> bool:
+        if not user_id:
+            return False
+        return bytes.fromhex(str(restaurant_id)) in LikeService.liked_ids(str(user_id))
+
+    @staticmethod
+    def decorate(cards: Iterable, user_id: Optional[str] = None) -> List[dict]:
+        """Cards (read models or dicts with an ``id``) as dicts with ``isLiked``"""
+        liked = LikeService.liked_ids(str(user_id)) if user_id else frozenset()
+        return mark_liked(cards, liked)
+
+
+def liked_query(user_id: str) -> tuple:
+    """Filter and projection of a user's liked restaurant ids"""
+    # Covered by the unique (user_id, restaurant_id) index
+    return {'user_id': ObjectId(user_id)}, {'_id': 0, 'restaurant_id': 1}
+
+
+def liked_set(likes: Iterable[dict]) -> FrozenSet[bytes]:
+    return frozenset(like['restaurant_id'].binary for like in likes)
+
+
+def mark_liked(cards: Iterable, liked: FrozenSet[bytes]) -> List[dict]:
+    """Cards as dicts with ``isLiked`` from a set of liked binary ids"""
+    decorated = []
+    for card in cards:
+        card = card._asdict() if hasattr(card, '_asdict') else dict(card)
+        card['isLiked'] = bytes.fromhex(str(card['id'])) in liked
+        decorated.append(card)
+    return decorated
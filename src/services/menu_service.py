@@ -0,0 +1,162 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+
+from config.database import db
+from models.menu_item import MenuItem
+from models.read_models import MenuItemView
+from utils.cache import TTLCache
+
+# Snapshots are revalidated against restaurants.menu_version on every read,
+# the TTL only bounds how long an idle restaurant's menu stays resident
+SNAPSHOT_TTL = 600
+
+
+class MenuSnapshot:
+    """All available items of one restaurant menu at a given ``menu_version``.
+
+    Items are grouped by category for the menu screen and indexed by id with
+    their option prices for checkout, so both read the same warm structure.
+    """
+    __slots__ = ('restaurant_id', 'version', 'categories', 'items', 'option_prices')
+
+    def __init__(self, restaurant_id: str, version: int, items: Iterable[MenuItemView]):
+        self.restaurant_id = restaurant_id
+        self.version = version
+        items = sorted(items, key=lambda item: (item.category, item.name))
+
+        grouped: Dict[str, List[MenuItemView]] = {}
+        for item in items:
+            grouped.setdefault(item.category, []).append(item)
+        self.categories: Tuple[Tuple[str, Tuple[MenuItemView, ...]], ...] = tuple(
+            (category, tuple(category_items)) for category, category_items in grouped.items()
+        )
+
+        self.items: Dict[str, MenuItemView] = {item.id: item for item in items}
+        # Option name -> price, first match wins as options are looked up by name only
+        self.option_prices: Dict[str, Dict[str, float]] = {}
+        for item in items:
+            prices = {}
+            for customization in item.customizations:
+                for option in customization.options:
+                    prices.setdefault(option.name, option.price)
+            self.option_prices[item.id] = prices
+
+    def unit_price(self, item_id: str, customizations: Iterable[dict] = ()) -> Optional[float]:
+        """Price of one unit with the selected options, None if the item is not on the menu"""
+        item = self.items.get(item_id)
+        if item is None:
+            return None
+        prices = self.option_prices[item_id]
+        return item.price + sum(
+            prices.get(option, 0)
+            for customization in customizations
+            for option in customization['options']
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'restaurant_id': self.restaurant_id,
+            'version': self.version,
+            'categories': [
+                {'name': category, 'items': items} for category, items in self.categories
+            ]
+        }
+
+
+class MenuService:
+    _snapshots = TTLCache(max_size=1024, ttl=SNAPSHOT_TTL)
+
+    @staticmethod
+    def get_version(restaurant_id: str) -> Optional[int]:
+        """Current menu_version of a restaurant, None if it does not exist"""
+        restaurant = db.get_db().restaurants.find_one(
+            {'_id': ObjectId(restaurant_id)}, {'menu_version': 1}
+        )
+        if not restaurant:
+            return None
+        return restaurant.get('menu_version', 0)
+
+    @staticmethod
+    def get_snapshot(restaurant_id: str, version: Optional[int] = None) -> MenuSnapshot:
+        """Menu snapshot at the restaurant's current version.
+
+        Pass ``version`` when the caller already read the restaurant document
+        to skip the version lookup.
+        """
+        if version is None:
+            version = MenuService.get_version(restaurant_id)
+            if version is None:
+                raise ValueError("Restaurant not found")
+
+        snapshot = MenuService._snapshots.get(restaurant_id)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        # Loaded after reading the version, so a concurrent write can only
+        # make this snapshot newer than its tag, never older
+        items = db.get_db().menu_items.find({'restaurant_id': restaurant_id, 'is_available': True})
+        snapshot = MenuSnapshot(restaurant_id, version, (MenuItemView.convert(item) for item in items))
+        MenuService._snapshots.set(restaurant_id, snapshot)
+        return snapshot
+
+    @staticmethod
+    def evict(restaurant_id: Optional[str] = None) -> None:
+        """Drop this worker's snapshot of a restaurant's menu, or of every menu"""
+        if restaurant_id is None:
+            MenuService._snapshots.clear()
+        else:
+            MenuService._snapshots.delete(restaurant_id)
+
+    @staticmethod
+    def bump_menu_version(restaurant_id: str) -> None:
+        """Invalidate cached snapshots of a restaurant's menu in every worker"""
+        db.get_db().restaurants.update_one(
+            {'_id': ObjectId(restaurant_id)},
+            {'$inc': {'menu_version': 1}}
+        )
+        MenuService.evict(restaurant_id)
+
+    @staticmethod
+    def create_item(item: MenuItem) -> str:
+        """Insert a new menu item"""
+        document = item.model_dump(by_alias=True)
+        document['_id'] = ObjectId(item.id)
+        db.get_db().menu_items.insert_one(document)
+        MenuService.bump_menu_version(item.restaurant_id)
+        return item.id
+
+    @staticmethod
+    def update_item(item: MenuItem) -> bool:
+        """Overwrite an item of ``item.restaurant_id``, returning False if it does not exist"""
+        item.updated_at = datetime.utcnow()
+        fields = item.model_dump(by_alias=True, exclude={'id', 'created_at'})
+        result = db.get_db().menu_items.update_one(
+            {'_id': ObjectId(item.id), 'restaurant_id': item.restaurant_id},
+            {'$set': fields}
+        )
+        if result.matched_count:
+            MenuService.bump_menu_version(item.restaurant_id)
+        return bool(result.matched_count)
+
+    @staticmethod
+    def set_availability(restaurant_id: str, item_id: str, is_available: bool) -> bool:
+        """Mark an item (un)available, returning False if it does not exist"""
+        result = db.get_db().menu_items.update_one(
+            {'_id': ObjectId(item_id), 'restaurant_id': restaurant_id},
+            {'$set': {'is_available': is_available, 'updated_at': datetime.utcnow()}}
+        )
+        if result.matched_count:
+            MenuService.bump_menu_version(restaurant_id)
+        return bool(result.matched_count)
+
+    @staticmethod
+    def delete_item(restaurant_id: str, item_id: str) -> bool:
+        """Delete an item, returning False if it does not exist"""
+        result = db.get_db().menu_items.delete_one(
+            {'_id': ObjectId(item_id), 'restaurant_id': restaurant_id}
+        )
+        if result.deleted_count:
+            MenuService.bump_menu_version(restaurant_id)
+        return bool(result.deleted_count)
@@ -1,83 +1,172 @@
+from flask import request, session
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from typing import Dict, Set
+from typing import Dict, FrozenSet, Optional, Set, Tuple
 from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from config.database import db
+from services.auth_service import auth_service
+from utils.cache import cached
 
 socketio = SocketIO()
 
+ROOM_TYPES = ('user', 'restaurant', 'driver', 'order')
+
+
+def _connect_token(auth) -> Optional[str]:
+    """Token from the Socket.IO ``auth`` payload, a ``token`` query argument
+    or a bearer Authorization header, in that order"""
+    if isinstance(auth, dict) and auth.get('token'):
+        return auth['token']
+    if request.args.get('token'):
+        return request.args['token']
+    parts = request.headers.get('Authorization', '').split()
+    return parts[1] if len(parts) == 2 else None
+
+
 class NotificationService:
     # Store active connections
     user_connections: Dict[str, Set[str]] = {}  # user_id -> set of socket_ids
     restaurant_connections: Dict[str, Set[str]] = {}  # restaurant_id -> set of socket_ids
     driver_connections: Dict[str, Set[str]] = {}  # driver_id -> set of socket_ids
 
+    @staticmethod
+    @cached('restaurant_owners', ttl=300, max_size=10000)
+    def owned_restaurants(user_id: str) -> FrozenSet[str]:
+        """Ids of the restaurants a user owns; owner changes invalidate it via the change watcher"""
+        return frozenset(
+            str(restaurant['_id'])
+            for restaurant in db.get_db().restaurants.find({'owner_id': user_id}, {'_id': 1})
+        )
+
+    @staticmethod
+    @cached('order_parties', ttl=300, max_size=10000)
+    def order_parties(order_id: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """(user_id, restaurant_id, driver_id) of an order, None if it does not exist"""
+        order = db.get_db().orders.find_one(
+            {'_id': ObjectId(order_id)}, {'user_id': 1, 'restaurant_id': 1, 'delivery_info.driver_id': 1}
+        )
+        if not order:
+            return None
+        return (str(order['user_id']), str(order['restaurant_id']),
+                (order.get('delivery_info') or {}).get('driver_id'))
+
+    @staticmethod
+    def can_join(principal: dict, entity_type: str, entity_id: str) -> bool:
+        """Whether the connected principal may receive events of a room"""
+        user_id, role = principal['user_id'], principal['role']
+        if role == 'admin':
+            return True
+        if entity_type == 'user':
+            return entity_id == user_id
+        if entity_type == 'driver':
+            return role == 'delivery_driver' and entity_id == user_id
+        if entity_type == 'restaurant':
+            return role == 'restaurant_owner' and entity_id in NotificationService.owned_restaurants(user_id)
+        if entity_type == 'order':
+            parties = NotificationService.order_parties(entity_id)
+            if parties is not None and NotificationService._is_party(principal, parties):
+                return True
+            # A driver may have been assigned since the parties were cached
+            NotificationService.order_parties.invalidate(entity_id)
+            parties = NotificationService.order_parties(entity_id)
+            return parties is not None and NotificationService._is_party(principal, parties)
+        return False
+
+    @staticmethod
+    def _is_party(principal: dict, parties: Tuple[str, str, Optional[str]]) -> bool:
+        user_id, restaurant_id, driver_id = parties
+        return principal['user_id'] in (user_id, driver_id) or (
+            principal['role'] == 'restaurant_owner'
+            and restaurant_id in NotificationService.owned_restaurants(principal['user_id'])
+        )
+
+    @staticmethod
+    def _connections(entity_type: str) -> Optional[Dict[str, Set[str]]]:
+        return {
+            'user': NotificationService.user_connections,
+            'restaurant': NotificationService.restaurant_connections,
+            'driver': NotificationService.driver_connections
+        }.get(entity_type)
+
     @staticmethod
     @socketio.on('connect')
-    def handle_connect():
-        """Handle new WebSocket connection"""
-        emit('connected', {'status': 'connected'})
+    def handle_connect(auth=None):
+        """Authenticate the socket once and keep the principal on its session"""
+        token = _connect_token(auth)
+        try:
+            user = auth_service.verify_token(token) if token else None
+        except ValueError:
+            user = None
+        if user is None:
+            return False
+
+        user_id = str(user._id)
+        session['principal'] = {'user_id': user_id, 'role': user.role}
+        session['rooms'] = []
+        # Every socket follows its own user room
+        join_room(f"user_{user_id}")
+        NotificationService._track('user', user_id)
+        emit('connected', {'status': 'connected', 'user_id': user_id})
+
+    @staticmethod
+    def _track(entity_type: str, entity_id: str) -> None:
+        session['rooms'].append((entity_type, entity_id))
+        connections = NotificationService._connections(entity_type)
+        if connections is not None:
+            connections.setdefault(entity_id, set()).add(request.sid)
+
+    @staticmethod
+    def _untrack(entity_type: str, entity_id: str) -> None:
+        connections = NotificationService._connections(entity_type)
+        if connections is not None and entity_id in connections:
+            connections[entity_id].discard(request.sid)
+            if not connections[entity_id]:
+                del connections[entity_id]
 
     @staticmethod
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle WebSocket disconnection"""
-        socket_id = request.sid
-        # Remove socket from all connection maps
-        for connections in [NotificationService.user_connections, 
-                          NotificationService.restaurant_connections,
-                          NotificationService.driver_connections]:
-            for entity_id in connections:
-                if socket_id in connections[entity_id]:
-                    connections[entity_id].remove(socket_id)
+        for entity_type, entity_id in session.get('rooms', []):
+            NotificationService._untrack(entity_type, entity_id)
 
     @staticmethod
     @socketio.on('join')
     def handle_join(data):
-        """Handle client joining a room"""
-        entity_type = data.get('type')  # 'user', 'restaurant', or 'driver'
-        entity_id = data.get('id')
-        
-        if not entity_type or not entity_id:
-            return
-            
-        socket_id = request.sid
-        room = f"{entity_type}_{entity_id}"
-        join_room(room)
-        
-        # Store connection
-        if entity_type == 'user':
-            if entity_id not in NotificationService.user_connections:
-                NotificationService.user_connections[entity_id] = set()
-            NotificationService.user_connections[entity_id].add(socket_id)
-        elif entity_type == 'restaurant':
-            if entity_id not in NotificationService.restaurant_connections:
-                NotificationService.restaurant_connections[entity_id] = set()
-            NotificationService.restaurant_connections[entity_id].add(socket_id)
-        elif entity_type == 'driver':
-            if entity_id not in NotificationService.driver_connections:
-                NotificationService.driver_connections[entity_id] = set()
-            NotificationService.driver_connections[entity_id].add(socket_id)
+        """Join the room of an entity the connected principal may follow"""
+        principal = session.get('principal')
+        entity_type = (data or {}).get('type')
+        entity_id = str((data or {}).get('id') or '')
+
+        if not principal or entity_type not in ROOM_TYPES or not entity_id:
+            return {'joined': False, 'error': 'Invalid room'}
+        try:
+            allowed = NotificationService.can_join(principal, entity_type, entity_id)
+        except InvalidId:
+            allowed = False
+        if not allowed:
+            return {'joined': False, 'error': 'Unauthorized'}
+
+        if (entity_type, entity_id) not in session['rooms']:
+            join_room(f"{entity_type}_{entity_id}")
+            NotificationService._track(entity_type, entity_id)
+        return {'joined': True}
 
     @staticmethod
     @socketio.on('leave')
     def handle_leave(data):
         """Handle client leaving a room"""
-        entity_type = data.get('type')
-        entity_id = data.get('id')
-        
-        if not entity_type or not entity_id:
+        entity_type = (data or {}).get('type')
+        entity_id = str((data or {}).get('id') or '')
+        rooms = session.get('rooms', [])
+        if (entity_type, entity_id) not in rooms:
             return
-            
-        socket_id = request.sid
-        room = f"{entity_type}_{entity_id}"
-        leave_room(room)
-        
-        # Remove connection
-        if entity_type == 'user' and entity_id in NotificationService.user_connections:
-            NotificationService.user_connections[entity_id].discard(socket_id)
-        elif entity_type == 'restaurant' and entity_id in NotificationService.restaurant_connections:
-            NotificationService.restaurant_connections[entity_id].discard(socket_id)
-        elif entity_type == 'driver' and entity_id in NotificationService.driver_connections:
-            NotificationService.driver_connections[entity_id].discard(socket_id)
+
+        leave_room(f"{entity_type}_{entity_id}")
+        rooms.remove((entity_type, entity_id))
+        NotificationService._untrack(entity_type, entity_id)
 
     @staticmethod
     def notify_order_status_update(order_id: str, status: str, additional_data: dict = None):
@@ -93,7 +182,7 @@ class NotificationService:
             base_data.update(additional_data)
         
         # Emit to order-specific room
-        emit('order_update', base_data, room=f"order_{order_id}")
+        socketio.emit('order_update', base_data, room=f"order_{order_id}")
 
     @staticmethod
     def notify_new_order(restaurant_id: str, order_data: dict):
@@ -105,7 +194,7 @@ class NotificationService:
         }
         
         # Emit to restaurant room
-        emit('new_order', data, room=f"restaurant_{restaurant_id}")
+        socketio.emit('new_order', data, room=f"restaurant_{restaurant_id}")
 
     @staticmethod
     def notify_order_assigned(driver_id: str, order_data: dict):
@@ -117,7 +206,7 @@ class NotificationService:
         }
         
         # Emit to driver room
-        emit('order_assigned', data, room=f"driver_{driver_id}")
+        socketio.emit('order_assigned', data, room=f"driver_{driver_id}")
 
     @staticmethod
     def notify_payment_update(order_id: str, status: str, user_id: str):
@@ -130,7 +219,7 @@ class NotificationService:
         }
         
         # Emit to user room
-        emit('payment_update', data, room=f"user_{user_id}")
+        socketio.emit('payment_update', data, room=f"user_{user_id}")
 
     @staticmethod
     def notify_delivery_update(order_id: str, status: str, location: dict = None):
@@ -146,7 +235,7 @@ class NotificationService:
             data['location'] = location
             
         # Emit to order-specific room
-        emit('delivery_update', data, room=f"order_{order_id}")
+        socketio.emit('delivery_update', data, room=f"order_{order_id}")
 
     @staticmethod
     def broadcast_restaurant_status(restaurant_id: str, is_online: bool):
@@ -159,4 +248,4 @@ class NotificationService:
         }
         
         # Broadcast to all connected clients
-        emit('restaurant_status', data, broadcast=True) 
\ No newline at end of file
+        socketio.emit('restaurant_status', data) 
\ No newline at end of file
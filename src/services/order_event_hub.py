@@ -0,0 +1,139 @@
+"""
+Server-sent event streams of order events.
+
+The outbox dispatcher publishes every order status and delivery event on
+the shared cache backend's bus; each worker's hub relays them to the SSE
+streams open on it. A stream first replays the order's stored ``events``
+after ``Last-Event-ID`` (or the whole history on a fresh connection),
+then follows live events, sending a comment line as heartbeat while idle.
+"""
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+import os
+import queue
+
+import orjson
+
+from utils.cache import get_cache_backend
+from utils.json_provider import DUMP_OPTIONS, default
+
+ORDER_EVENTS_CHANNEL = 'order_events'
+STREAMED_EVENT_TYPES = {'order_status', 'delivery_update'}
+
+SSE_MAX_CONNECTIONS = int(os.getenv('SSE_MAX_CONNECTIONS', 500))
+SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+SSE_RETRY_MS = 3000  # client reconnect delay
+SUBSCRIBER_BUFFER = 64  # events held for a slow stream before dropping
+
+
+def event_message(order_id, event: dict) -> dict:
+    """The wire form of a stored event: ``id``, ``type`` and its ``data``"""
+    data = {key: value for key, value in event.items() if key not in ('id', 'created_at')}
+    data.update(order_id=str(order_id), timestamp=event['created_at'])
+    return {'id': str(event['id']), 'type': event['type'], 'data': data}
+
+
+def sse_frame(message: dict) -> bytes:
+    data = orjson.dumps(message['data'], default=default, option=DUMP_OPTIONS)
+    return b'id: %s\nevent: %s\ndata: %s\n\n' % (message['id'].encode(), message['type'].encode(), data)
+
+
+def replay_after(history: Iterable[dict], last_event_id: Optional[str]) -> List[dict]:
+    """Streamed events of ``history`` after ``last_event_id``, or all of them
+    when it is absent or has already been trimmed from the history"""
+    events = [event for event in history if event['type'] in STREAMED_EVENT_TYPES]
+    ids = [str(event['id']) for event in events]
+    if last_event_id in ids:
+        return events[ids.index(last_event_id) + 1:]
+    return events
+
+
+class OrderEventHub:
+    """Relays published order events to this worker's SSE streams"""
+
+    def __init__(self, max_connections: int = SSE_MAX_CONNECTIONS, backend=None):
+        self.max_connections = max_connections
+        self.backend = backend
+        self._streams: Dict[str, Set[queue.Queue]] = {}
+        self._count = 0
+        self._lock = Lock()
+        self._listening = False
+
+    def _listen(self) -> None:
+        with self._lock:
+            if self._listening:
+                return
+            self._listening = True
+        (self.backend or get_cache_backend()).subscribe(ORDER_EVENTS_CHANNEL, self._on_message)
+
+    def _on_message(self, message: str) -> None:
+        message = orjson.loads(message)
+        with self._lock:
+            streams = list(self._streams.get(message['data']['order_id'], ()))
+        for stream in streams:
+            try:
+                stream.put_nowait(message)
+            except queue.Full:
+                pass  # the client catches up through Last-Event-ID on reconnect
+
+    def publish(self, order_id, event: dict) -> None:
+        """Announce a dispatched event to the streams of every worker"""
+        if event['type'] in STREAMED_EVENT_TYPES:
+            message = event_message(order_id, event)
+            (self.backend or get_cache_backend()).publish(
+                ORDER_EVENTS_CHANNEL, orjson.dumps(message, default=default, option=DUMP_OPTIONS).decode()
+            )
+
+    def connect(self, order_id: str) -> Optional[queue.Queue]:
+        """Open a stream for ``order_id``, or None when this worker is at capacity"""
+        self._listen()
+        with self._lock:
+            if self._count >= self.max_connections:
+                return None
+            stream = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+            self._streams.setdefault(order_id, set()).add(stream)
+            self._count += 1
+            return stream
+
+    def disconnect(self, order_id: str, stream: queue.Queue) -> None:
+        with self._lock:
+            streams = self._streams.get(order_id)
+            if streams and stream in streams:
+                streams.discard(stream)
+                self._count -= 1
+                if not streams:
+                    del self._streams[order_id]
+
+    @property
+    def connections(self) -> int:
+        return self._count
+
+    def stream(self, order_id: str, stream: queue.Queue, history: Iterable[dict],
+               last_event_id: Optional[str] = None,
+               heartbeat: float = SSE_HEARTBEAT_SECONDS) -> Iterator[bytes]:
+        """SSE frames for an opened stream; closes it when the client goes away.
+
+        ``stream`` must be connected before ``history`` is read so no event
+        falls between the replay and the live feed; repeats are skipped.
+        """
+        try:
+            yield b'retry: %d\n\n' % SSE_RETRY_MS
+            seen = set()
+            for event in replay_after(history, last_event_id):
+                message = event_message(order_id, event)
+                seen.add(message['id'])
+                yield sse_frame(message)
+            while True:
+                try:
+                    message = stream.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield b': heartbeat\n\n'
+                    continue
+                if message['id'] not in seen:
+                    seen.add(message['id'])
+                    yield sse_frame(message)
+        finally:
+            self.disconnect(order_id, stream)
+
+
+order_event_hub = OrderEventHub()
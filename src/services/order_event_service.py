@@ -0,0 +1,191 @@
+"""
+Order event outbox.
+
+Every order state change appends an event to the order's ``events``
+history and ``pending_events`` outbox in the same write that changes the
+state, so an event exists exactly when the change does. A dispatcher
+drains the outbox in batches: it emits the SocketIO notifications,
+publishes to the SSE hub and folds the events into per-restaurant daily
+analytics, then pulls the delivered events from the outbox. Delivery is
+at least once; the event ``id`` lets clients drop repeats.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import os
+import socket
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from config.database import db
+from models.order import OrderStatus, PaymentStatus
+from services.notification_service import NotificationService, socketio
+from services.order_event_hub import order_event_hub
+from utils.cache import get_cache_backend
+
+ORDER_EVENT_HISTORY = 50  # events kept on the order for replay
+DISPATCH_BATCH_SIZE = 200  # orders drained per pass
+DELIVERY_STATUSES = {OrderStatus.PICKED_UP.value, OrderStatus.DELIVERED.value}
+
+# Projection keeping the event history and outbox out of order reads served to clients
+WITHOUT_EVENTS = {'events': 0, 'pending_events': 0}
+
+# One worker drains the outbox at a time; the others wait for the lease
+LEASE_KEY = 'order_events:lease'
+LEASE_TTL = 15
+
+
+def _value(enum, status: str) -> str:
+    """Status value for either spelling (``PREPARING`` or ``preparing``)"""
+    return enum[status].value if status in enum.__members__ else enum(status).value
+
+
+class OrderEventService:
+    @staticmethod
+    def event(event_type: str, now: Optional[datetime] = None, **data) -> dict:
+        """A new event of ``event_type`` ('new_order', 'order_status',
+        'payment_update' or 'delivery_update')"""
+        return {'id': ObjectId(), 'type': event_type, 'created_at': now or datetime.utcnow(), **data}
+
+    @staticmethod
+    def status_event(status: str, now: Optional[datetime] = None) -> dict:
+        return OrderEventService.event('order_status', now, status=_value(OrderStatus, status))
+
+    @staticmethod
+    def payment_event(status: str, now: Optional[datetime] = None) -> dict:
+        return OrderEventService.event('payment_update', now, status=_value(PaymentStatus, status))
+
+    @staticmethod
+    def initial(event: dict) -> dict:
+        """Fields to add to a new order document carrying its first event"""
+        return {'events': [event], 'pending_events': [event]}
+
+    @staticmethod
+    def push(*events: dict) -> dict:
+        """``$push`` clause recording ``events`` in the order's history and outbox"""
+        return {
+            'events': {'$each': list(events), '$slice': -ORDER_EVENT_HISTORY},
+            'pending_events': {'$each': list(events)}
+        }
+
+    @staticmethod
+    def emit(order: dict, event: dict) -> None:
+        """Send the SocketIO notification for one event"""
+        order_id = str(order['_id'])
+        if event['type'] == 'new_order':
+            NotificationService.notify_new_order(order['restaurant_id'], {
+                'order_id': order_id,
+                'user_id': order['user_id'],
+                'total': event.get('total'),
+                'item_count': event.get('item_count'),
+                'event_id': str(event['id'])
+            })
+        elif event['type'] == 'order_status':
+            NotificationService.notify_order_status_update(
+                order_id, event['status'], {'event_id': str(event['id'])}
+            )
+            if event['status'] in DELIVERY_STATUSES:
+                NotificationService.notify_delivery_update(order_id, event['status'])
+        elif event['type'] == 'payment_update':
+            NotificationService.notify_payment_update(order_id, event['status'], order['user_id'])
+        elif event['type'] == 'delivery_update':
+            NotificationService.notify_delivery_update(order_id, event['status'], event.get('location'))
+            if event.get('driver_id'):
+                NotificationService.notify_order_assigned(event['driver_id'], {
+                    'order_id': order_id,
+                    'restaurant_id': order['restaurant_id'],
+                    'pickup_eta_minutes': event.get('pickup_eta_minutes'),
+                    'estimated_delivery_time': event['estimated_delivery_time'].isoformat(),
+                    'event_id': str(event['id'])
+                })
+
+    @staticmethod
+    def analytics_ops(batch: List[Tuple[dict, dict]], now: Optional[datetime] = None) -> List[UpdateOne]:
+        """One upsert per (restaurant, day) summing the counters of ``batch``"""
+        increments: Dict[Tuple[str, str], Counter] = {}
+        for order, event in batch:
+            key = (order['restaurant_id'], event['created_at'].strftime('%Y-%m-%d'))
+            counters = increments.setdefault(key, Counter())
+            if event['type'] == 'new_order':
+                counters['orders'] += 1
+                counters['revenue'] += event.get('total') or 0
+            elif event['type'] == 'order_status':
+                counters[f"status_counts.{event['status']}"] += 1
+        now = now or datetime.utcnow()
+        return [
+            UpdateOne(
+                {'restaurant_id': restaurant_id, 'date': day},
+                {'$inc': dict(counters), '$set': {'updated_at': now}},
+                upsert=True
+            )
+            for (restaurant_id, day), counters in increments.items() if counters
+        ]
+
+    @staticmethod
+    def dispatch_pending(limit: int = DISPATCH_BATCH_SIZE) -> int:
+        """Deliver the oldest pending events and return how many were sent"""
+        orders = list(db.get_db().orders.find(
+            {'pending_events.created_at': {'$lte': datetime.utcnow()}},
+            {'user_id': 1, 'restaurant_id': 1, 'pending_events': 1}
+        ).sort('pending_events.created_at', 1).limit(limit))
+        if not orders:
+            return 0
+
+        batch = [
+            (order, event)
+            for order in orders
+            for event in sorted(order['pending_events'], key=lambda e: e['created_at'])
+        ]
+        for order, event in batch:
+            try:
+                OrderEventService.emit(order, event)
+                order_event_hub.publish(order['_id'], event)
+            except Exception as e:
+                print(f"Order event {event['id']} notification failed: {str(e)}")
+
+        analytics = OrderEventService.analytics_ops(batch)
+        if analytics:
+            db.get_db().restaurant_analytics.bulk_write(analytics, ordered=False)
+
+        db.get_db().orders.bulk_write([
+            UpdateOne(
+                {'_id': order['_id']},
+                {'$pull': {'pending_events': {'id': {'$in': [e['id'] for e in order['pending_events']]}}}}
+            )
+            for order in orders
+        ], ordered=False)
+        return len(batch)
+
+
+def _hold_lease(backend, owner: bytes) -> bool:
+    """Take or renew the dispatcher lease"""
+    current = backend.get(LEASE_KEY)
+    if current == owner:
+        backend.set(LEASE_KEY, owner, LEASE_TTL)
+        return True
+    return current is None and backend.add(LEASE_KEY, owner, LEASE_TTL)
+
+
+def start_order_event_dispatcher(interval: Optional[float] = None):
+    """Drain the order event outbox every ``interval`` seconds in the background.
+
+    Every worker runs the loop but only the lease holder dispatches, so
+    events are sent once; with several workers, set SOCKETIO_MESSAGE_QUEUE
+    so the emits reach clients connected to the other workers.
+    """
+    interval = interval or float(os.getenv('ORDER_EVENTS_INTERVAL_SECONDS', 1))
+    owner = f"{socket.gethostname()}:{os.getpid()}".encode()
+
+    def loop():
+        while True:
+            try:
+                if _hold_lease(get_cache_backend(), owner):
+                    # Keep draining while full batches come back
+                    while OrderEventService.dispatch_pending() >= DISPATCH_BATCH_SIZE:
+                        pass
+            except Exception as e:
+                print(f"Order event dispatch failed: {str(e)}")
+            socketio.sleep(interval)
+
+    return socketio.start_background_task(loop)
@@ -1,13 +1,32 @@
 from datetime import datetime
-from typing import List, Optional
-from models.order import Order, OrderStatus, PaymentStatus
+from typing import List, Optional, Tuple
+from pydantic import TypeAdapter
+from models.order import Order, OrderItem, DeliveryInfo, PaymentInfo, PaymentMethod, OrderStatus, PaymentStatus
 from models.restaurant import Restaurant
+from models.read_models import TaxRuleView
+from services.menu_service import MenuService
+from services.order_event_service import WITHOUT_EVENTS, OrderEventService
+from utils.cache import cached
 from config.database import db
 from config.paypal import configure_paypal
 import paypalrestsdk
 from bson import ObjectId
 
+# Validators for the client-supplied parts of an order
+ORDER_ITEMS = TypeAdapter(List[OrderItem])
+OPTIONAL_DATETIME = TypeAdapter(Optional[datetime])
+OPTIONAL_TEXT = TypeAdapter(Optional[str])
+
 class OrderService:
+    @staticmethod
+    @cached('tax_rules', ttl=3600)
+    def get_tax_rules(restaurant_id: str) -> Tuple[TaxRuleView, ...]:
+        """Active tax rules of a restaurant; tax rule writes invalidate it, directly or via the change watcher"""
+        return tuple(
+            TaxRuleView.convert(rule)
+            for rule in db.get_db().tax_rules.find({'restaurant_id': restaurant_id, 'is_active': True})
+        )
+
     @staticmethod
     def create_order(user_id: str, order_data: dict) -> Order:
         """Create a new order"""
@@ -19,30 +38,16 @@ class OrderService:
         if not restaurant:
             raise ValueError("Restaurant not found or is inactive")
             
-        # Calculate order total and validate items
+        # Calculate order total and validate items against the menu snapshot
+        menu = MenuService.get_snapshot(order_data['restaurant_id'], restaurant.get('menu_version', 0))
         total = 0
         for item in order_data['items']:
-            menu_item = db.get_db().menu_items.find_one({
-                '_id': ObjectId(item['menu_item_id']),
-                'restaurant_id': order_data['restaurant_id'],
-                'is_available': True
-            })
-            if not menu_item:
+            unit_price = menu.unit_price(item['menu_item_id'], item.get('customizations', []))
+            if unit_price is None:
                 raise ValueError(f"Menu item {item['menu_item_id']} not found or unavailable")
             
-            # Calculate item total with customizations
-            item_total = menu_item['price'] * item['quantity']
-            for customization in item.get('customizations', []):
-                for option in customization['options']:
-                    option_price = next(
-                        (opt['price'] for cust in menu_item['customizations']
-                         for opt in cust['options']
-                         if opt['name'] == option),
-                        0
-                    )
-                    item_total += option_price * item['quantity']
-            
-            item['unit_price'] = menu_item['price']
+            item_total = unit_price * item['quantity']
+            item['unit_price'] = menu.items[item['menu_item_id']].price
             item['subtotal'] = item_total
             total += item_total
             
@@ -52,40 +57,36 @@ class OrderService:
         
         # Calculate applicable taxes
         tax_total = 0
-        tax_rules = db.get_db().tax_rules.find({
-            'restaurant_id': order_data['restaurant_id'],
-            'is_active': True
-        })
-        
-        for rule in tax_rules:
-            if total >= rule['minimum_order_amount']:
-                if (order_data.get('is_delivery') and rule['applies_to_delivery']) or \
-                   (not order_data.get('is_delivery') and rule['applies_to_pickup']):
-                    tax_total += total * (float(rule['rate']) / 100)
+        is_delivery = bool(order_data.get('is_delivery'))
+        for rule in OrderService.get_tax_rules(order_data['restaurant_id']):
+            if total >= rule.minimum_order_amount and rule.applies(is_delivery):
+                tax_total += total * (rule.rate / 100)
         
         # Create payment info
         payment_info = {
-            'method': order_data['payment_method'],
+            'method': PaymentMethod(order_data['payment_method']),
             'subtotal': total,
             'tax': tax_total,
             'delivery_fee': delivery_fee,
             'service_fee': service_fee,
             'tip': order_data.get('tip', 0),
             'total': total + tax_total + delivery_fee + service_fee + order_data.get('tip', 0),
-            'status': PaymentStatus.PENDING
+            'status': PaymentStatus.PENDING,
+            'transaction_id': None
         }
         
-        # Create order instance
-        order = Order(
+        # Create order instance: client input is validated once, while
+        # prices and fees computed above from our own data are trusted
+        order = Order.model_construct(
             user_id=user_id,
             restaurant_id=order_data['restaurant_id'],
-            items=order_data['items'],
-            delivery_info=order_data['delivery_info'],
-            payment_info=payment_info,
-            is_scheduled=order_data.get('is_scheduled', False),
-            scheduled_for=order_data.get('scheduled_for'),
+            items=ORDER_ITEMS.validate_python(order_data['items']),
+            delivery_info=DeliveryInfo.model_validate(order_data['delivery_info']),
+            payment_info=PaymentInfo.model_construct(**payment_info),
+            is_scheduled=bool(order_data.get('is_scheduled', False)),
+            scheduled_for=OPTIONAL_DATETIME.validate_python(order_data.get('scheduled_for')),
             estimated_preparation_time=restaurant['preparation_time'],
-            special_instructions=order_data.get('special_instructions')
+            special_instructions=OPTIONAL_TEXT.validate_python(order_data.get('special_instructions'))
         )
         
         # Process payment if not cash
@@ -128,8 +129,14 @@ class OrderService:
             except Exception as e:
                 raise ValueError(f"Payment processing failed: {str(e)}")
         
-        # Save order to database
-        result = db.get_db().orders.insert_one(order.dict(by_alias=True))
+        # Save order to database together with its new_order event
+        document = order.model_dump(by_alias=True)
+        document.update(OrderEventService.initial(OrderEventService.event(
+            'new_order',
+            total=payment_info['total'],
+            item_count=sum(item['quantity'] for item in order_data['items'])
+        )))
+        result = db.get_db().orders.insert_one(document)
         order.id = str(result.inserted_id)
         
         # Update restaurant's active orders count
@@ -143,10 +150,10 @@ class OrderService:
     @staticmethod
     def get_order(order_id: str) -> dict:
         """Get order details"""
-        order = db.get_db().orders.find_one({'_id': ObjectId(order_id)})
+        order = db.get_db().orders.find_one({'_id': ObjectId(order_id)}, WITHOUT_EVENTS)
         if not order:
             raise ValueError("Order not found")
-        return {**order, '_id': str(order['_id'])}
+        return order
 
     @staticmethod
     def update_order_status(order_id: str, new_status: str) -> None:
@@ -165,7 +172,8 @@ class OrderService:
                 '$set': {
                     'status': new_status,
                     'updated_at': datetime.utcnow()
-                }
+                },
+                '$push': OrderEventService.push(OrderEventService.status_event(new_status))
             }
         )
         
@@ -191,7 +199,7 @@ class OrderService:
             
         result = db.get_db().orders.update_one(
             {'_id': ObjectId(order_id)},
-            {'$set': update}
+            {'$set': update, '$push': OrderEventService.push(OrderEventService.payment_event(payment_status))}
         )
         
         if result.modified_count == 0:
@@ -224,14 +232,10 @@ class OrderService:
             if to_date:
                 query['created_at']['$lte'] = to_date
                 
-        orders = list(db.get_db().orders.find(query)
+        orders = list(db.get_db().orders.find(query, WITHOUT_EVENTS)
                      .sort('created_at', -1)
                      .skip(skip)
                      .limit(limit))
-                     
-        # Convert ObjectId to string
-        for order in orders:
-            order['_id'] = str(order['_id'])
             
         return orders
 
@@ -264,7 +268,12 @@ class OrderService:
                     # Update payment status
                     db.get_db().orders.update_one(
                         {'_id': ObjectId(order_id)},
-                        {'$set': {'payment_info.status': PaymentStatus.REFUNDED.value}}
+                        {
+                            '$set': {'payment_info.status': PaymentStatus.REFUNDED.value},
+                            '$push': OrderEventService.push(
+                                OrderEventService.payment_event(PaymentStatus.REFUNDED.value)
+                            )
+                        }
                     )
                 else:
                     raise ValueError(refund.error)
@@ -279,7 +288,8 @@ class OrderService:
                 '$set': {
                     'status': OrderStatus.CANCELLED.value,
                     'updated_at': datetime.utcnow()
-                }
+                },
+                '$push': OrderEventService.push(OrderEventService.status_event(OrderStatus.CANCELLED.value))
             }
         )
         
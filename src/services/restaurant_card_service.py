@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Iterable, Optional
+import os
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from config.database import db
+from models.read_models import RestaurantCard
+from models.restaurant import Restaurant
+from services.notification_service import socketio
+from utils.cache import get_cache_backend
+
+# Restaurant fields a card is built from
+SOURCE_PROJECTION = {
+    'name': 1,
+    'cuisine_types': 1,
+    'price_range': 1,
+    'rating': 1,
+    'total_ratings': 1,
+    'delivery_fee': 1,
+    'estimated_delivery_time': 1,
+    'images.url': 1,
+    'images.is_primary': 1,
+    'is_active': 1,
+    'address.location': 1,
+    'open_intervals': 1
+}
+
+SYNC_BATCH_SIZE = 500
+
+# Workers booting within this many seconds of each other rebuild once
+REBUILD_LOCK_KEY = 'restaurant_cards:rebuild'
+REBUILD_LOCK_TTL = 120
+
+
+class RestaurantCardService:
+    """Maintains ``restaurant_cards``, the denormalized read model behind listings.
+
+    A card holds what a list row shows plus the fields listings filter on
+    (``is_active``, ``location``, ``open_intervals``), keyed by the
+    restaurant ``_id``. Code that writes any of the source fields calls
+    ``sync`` afterwards and the change watcher syncs writes made anywhere
+    else; ``rebuild`` reconciles the whole collection at startup.
+    """
+
+    @staticmethod
+    def card_document(restaurant: dict, now: Optional[datetime] = None) -> dict:
+        card = RestaurantCard.convert(restaurant)._asdict()
+        del card['id'], card['distance']
+        card.update({
+            '_id': restaurant['_id'],
+            'cuisine_types': list(card['cuisine_types']),
+            'is_active': restaurant.get('is_active', True),
+            'open_intervals': restaurant.get('open_intervals', []),
+            'updated_at': now or datetime.utcnow()
+        })
+        location = (restaurant.get('address') or {}).get('location')
+        if location:
+            card['location'] = location
+        return card
+
+    @staticmethod
+    def _write(restaurants: Iterable[dict]) -> set:
+        """Upsert the cards of ``restaurants`` in batches, returning their ids"""
+        now = datetime.utcnow()
+        synced, batch = set(), []
+        for restaurant in restaurants:
+            synced.add(restaurant['_id'])
+            batch.append(ReplaceOne(
+                {'_id': restaurant['_id']},
+                RestaurantCardService.card_document(restaurant, now),
+                upsert=True
+            ))
+            if len(batch) >= SYNC_BATCH_SIZE:
+                db.get_db().restaurant_cards.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            db.get_db().restaurant_cards.bulk_write(batch, ordered=False)
+        return synced
+
+    @staticmethod
+    def sync(*restaurant_ids) -> None:
+        """Refresh the cards of restaurants that were just written, dropping deleted ones"""
+        ids = [ObjectId(restaurant_id) for restaurant_id in restaurant_ids]
+        synced = RestaurantCardService._write(
+            db.get_db().restaurants.find({'_id': {'$in': ids}}, SOURCE_PROJECTION)
+        )
+        missing = [restaurant_id for restaurant_id in ids if restaurant_id not in synced]
+        if missing:
+            db.get_db().restaurant_cards.delete_many({'_id': {'$in': missing}})
+
+    @staticmethod
+    def rebuild(backend=None) -> int:
+        """Rebuild every card and remove cards of deleted restaurants.
+
+        Workers booting together share one rebuild through a lock in the
+        shared cache backend; the others return 0 straight away.
+        """
+        backend = backend or get_cache_backend()
+        if not backend.add(REBUILD_LOCK_KEY, b'1', REBUILD_LOCK_TTL):
+            return 0
+        synced = RestaurantCardService._write(db.get_db().restaurants.find({}, SOURCE_PROJECTION))
+        RestaurantCardService._sweep(synced)
+        return len(synced)
+
+    @staticmethod
+    def _sweep(synced: set) -> None:
+        """Delete cards whose restaurant no longer exists.
+
+        Cards not rewritten by the rebuild are re-checked against
+        ``restaurants``, so cards synced meanwhile for new restaurants stay.
+        """
+        cards = db.get_db().restaurant_cards.find({}, {'_id': 1})
+        stale = [card['_id'] for card in cards if card['_id'] not in synced]
+        for start in range(0, len(stale), SYNC_BATCH_SIZE):
+            batch = stale[start:start + SYNC_BATCH_SIZE]
+            live = {r['_id'] for r in db.get_db().restaurants.find({'_id': {'$in': batch}}, {'_id': 1})}
+            deleted = [card_id for card_id in batch if card_id not in live]
+            if deleted:
+                db.get_db().restaurant_cards.delete_many({'_id': {'$in': deleted}})
+
+
+def start_schedule_refresher(interval: Optional[float] = None):
+    """Recompile opening-hour schedules whose UTC offset changed (DST) every
+    ``interval`` seconds, keeping open-now listings right in long-lived workers"""
+    interval = interval or float(os.getenv('SCHEDULE_REFRESH_SECONDS', 900))
+
+    def loop():
+        while True:
+            socketio.sleep(interval)
+            try:
+                refreshed = Restaurant.refresh_schedules()
+                if refreshed:
+                    RestaurantCardService.sync(*refreshed)
+            except Exception as e:
+                print(f"Schedule refresh failed: {str(e)}")
+
+    return socketio.start_background_task(loop)
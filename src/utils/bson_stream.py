@@ -0,0 +1,49 @@
+from typing import Iterable, Iterator
+
+import bson
+import orjson
+from flask import Response, stream_with_context
+
+from utils.json_provider import DUMP_OPTIONS, default
+
+RAW_BATCH_SIZE = 1000
+NDJSON_OPTIONS = DUMP_OPTIONS | orjson.OPT_APPEND_NEWLINE
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'bson': 'application/bson'
+}
+
+
+def ndjson_from_batch(batch: bytes) -> bytes:
+    """Transcode a server batch of concatenated BSON documents to NDJSON.
+
+    The whole batch is decoded in one C call and each document is encoded
+    straight to bytes by orjson, so no per-document cursor or str round
+    trips happen in Python.
+    """
+    return b''.join(
+        orjson.dumps(doc, default=default, option=NDJSON_OPTIONS)
+        for doc in bson.decode_all(batch)
+    )
+
+
+def stream_raw_batches(batches: Iterable[bytes], fmt: str = 'ndjson') -> Iterator[bytes]:
+    """Yield one response chunk per server batch.
+
+    ``bson`` passes the batch bytes through untouched, which is a valid
+    stream of concatenated BSON documents (the mongodump/bsondump format).
+    """
+    try:
+        for batch in batches:
+            yield batch if fmt == 'bson' else ndjson_from_batch(batch)
+    finally:
+        close = getattr(batches, 'close', None)
+        if close:
+            close()
+
+
+def raw_response(batches: Iterable[bytes], fmt: str = 'ndjson') -> Response:
+    """Stream a ``find_raw_batches``/``aggregate_raw_batches`` cursor as NDJSON or BSON"""
+    if fmt not in MIMETYPES:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return Response(stream_with_context(stream_raw_batches(batches, fmt)), mimetype=MIMETYPES[fmt])
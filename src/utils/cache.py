@@ -0,0 +1,327 @@
+from collections import Counter, OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+import os
+import pickle
+import time
+import uuid
+
+from utils.single_flight import SingleFlight
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoryBackend:
+    """Process-local stand-in for the shared cache tier (development and tests)"""
+
+    def __init__(self, max_size: int = 100_000):
+        self._data = TTLCache(max_size=max_size)
+        self._subscribers = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._data.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data.set(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set ``key`` only if it is absent"""
+        with self._lock:
+            if self._data.get(key) is not None:
+                return False
+            self._data.set(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        self._data.delete(key)
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisBackend:
+    """Shared cache tier and invalidation bus backed by Redis"""
+
+    def __init__(self, url: str):
+        import redis  # only needed when REDIS_URL is configured
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set ``key`` only if it is absent"""
+        return bool(self._client.set(key, value, px=max(int(ttl * 1000), 1), nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def publish(self, channel: str, message: str) -> None:
+        self._client.publish(channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: lambda message: callback(message['data'].decode())})
+        pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+
+_backend = None
+_backend_lock = Lock()
+
+
+def get_cache_backend():
+    """Shared tier for this process: Redis when REDIS_URL is set, else in-memory"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = os.getenv('REDIS_URL')
+            _backend = RedisBackend(url) if url else MemoryBackend()
+        return _backend
+
+
+class TwoTierCache:
+    """Per-worker LRU in front of a shared backend.
+
+    Reads check the local LRU, then the shared tier, then call the loader.
+    Concurrent misses for the same key in a worker wait for the first
+    caller's load instead of stampeding the database. ``invalidate`` drops
+    the key from the shared tier and publishes it so every worker evicts
+    its local copy; ``clear`` does the same for every key by moving the
+    namespace to a new shared-tier epoch. A load that was invalidated while in flight returns
+    its result to its callers but is not cached, so it cannot overwrite
+    the invalidation. Values are pickled in the shared tier, so only cache
+    data produced by this application.
+    """
+
+    CHANNEL = 'cache-invalidation'
+    EPOCH_TTL = 30 * 86400  # seconds; older epochs' entries expired long before
+
+    def __init__(self, namespace: str, ttl: float = 60.0, local_ttl: float = None,
+                 max_size: int = 1024, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=ttl if local_ttl is None else local_ttl)
+        self.backend = backend or get_cache_backend()
+        self.stats = Counter()
+        self._flight = SingleFlight(namespace)
+        # Keys with loads in flight: number of loads and invalidation generation
+        self._loading: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = Lock()
+        epoch = self.backend.get(self._epoch_key())
+        self._epoch = epoch.decode() if epoch else '0'
+        self.backend.subscribe(self.CHANNEL, self._on_invalidate)
+
+    def _epoch_key(self) -> str:
+        return f"cache-epoch:{self.namespace}"
+
+    def _shared_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{self._epoch}:{key}"
+
+    def _on_invalidate(self, message: str) -> None:
+        namespace, separator, key = message.partition('\x00')
+        if separator:
+            if namespace == self.namespace:
+                self._evict(key)
+            return
+        namespace, _, epoch = message.partition('\x01')
+        if namespace == self.namespace:
+            self._reset(epoch)
+
+    def _reset(self, epoch: str) -> None:
+        with self._lock:
+            self._epoch = epoch
+            for key in self._generations:
+                self._generations[key] += 1
+            self.local.clear()
+
+    def _evict(self, key: str) -> None:
+        with self._lock:
+            self._bump(key)
+            self.local.delete(key)
+
+    def _bump(self, key: str) -> None:
+        if key in self._loading:
+            self._generations[key] += 1
+
+    def _begin(self, key: str) -> int:
+        """Register a load of ``key`` and return the generation it starts at"""
+        with self._lock:
+            self._loading[key] = self._loading.get(key, 0) + 1
+            return self._generations.setdefault(key, 0)
+
+    def _end(self, key: str, generation: int, value: Any = _MISSING, shared: bool = True) -> None:
+        """Finish a load, caching ``value`` unless ``key`` was invalidated since it began"""
+        with self._lock:
+            invalidated = self._generations[key] != generation
+            if self._loading[key] == 1:
+                del self._loading[key], self._generations[key]
+            else:
+                self._loading[key] -= 1
+            if value is _MISSING:
+                return
+            if not invalidated:
+                self.local.set(key, value)
+        if invalidated:
+            self.stats['stale_loads'] += 1
+            if not shared:
+                self.backend.delete(self._shared_key(key))
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats['local_hits'] += 1
+            return value
+        # Concurrent misses in this worker wait for one load
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key: str, loader: Callable[[], Any]) -> Any:
+        generation = self._begin(key)
+        try:
+            raw = self._shared_get(key)
+            value = loader() if raw is None else pickle.loads(raw)
+            if raw is None:
+                self.backend.set(self._shared_key(key), pickle.dumps(value), self.ttl)
+        except BaseException:
+            self._end(key, generation)
+            raise
+        self._end(key, generation, value, shared=raw is not None)
+        return value
+
+    async def get_or_load_async(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """``get_or_load`` with a coroutine loader; concurrent misses are not coalesced"""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats['local_hits'] += 1
+            return value
+        generation = self._begin(key)
+        try:
+            raw = self._shared_get(key)
+            value = await loader() if raw is None else pickle.loads(raw)
+            if raw is None:
+                self.backend.set(self._shared_key(key), pickle.dumps(value), self.ttl)
+        except BaseException:
+            self._end(key, generation)
+            raise
+        self._end(key, generation, value, shared=raw is not None)
+        return value
+
+    def _shared_get(self, key: str) -> Optional[bytes]:
+        raw = self.backend.get(self._shared_key(key))
+        self.stats['shared_hits' if raw is not None else 'misses'] += 1
+        return raw
+
+    def set(self, key: str, value: Any) -> None:
+        """Write a value through both tiers; other workers drop their local copy"""
+        self.backend.set(self._shared_key(key), pickle.dumps(value), self.ttl)
+        self.backend.publish(self.CHANNEL, f"{self.namespace}\x00{key}")
+        with self._lock:
+            self._bump(key)
+            self.local.set(key, value)
+
+    def invalidate(self, key: str) -> None:
+        self._evict(key)
+        self.backend.delete(self._shared_key(key))
+        self.backend.publish(self.CHANNEL, f"{self.namespace}\x00{key}")
+        self.stats['invalidations'] += 1
+
+    def clear(self) -> None:
+        """Invalidate every key of the namespace in every worker"""
+        epoch = uuid.uuid4().hex
+        self.backend.set(self._epoch_key(), epoch.encode(), self.EPOCH_TTL)
+        self._reset(epoch)
+        self.backend.publish(self.CHANNEL, f"{self.namespace}\x01{epoch}")
+        self.stats['clears'] += 1
+
+    def metrics(self) -> dict:
+        stats = self.stats + Counter(coalesced=self._flight.stats['coalesced'])
+        requests = sum(stats[name] for name in ('local_hits', 'shared_hits', 'coalesced', 'misses'))
+        hits = requests - stats['misses']
+        return {**stats, 'hit_ratio': hits / requests if requests else 0.0, 'size': len(self.local)}
+
+
+def cached(namespace: str, ttl: float = 60.0, local_ttl: float = None, max_size: int = 1024):
+    """Cache a function's result in a TwoTierCache keyed by its positional arguments.
+
+    The wrapped function gains ``invalidate(*args)``, ``set(value, *args)``,
+    ``clear()`` and ``cache`` attributes.
+    The shared backend is resolved on first call, after configuration.
+    """
+    def decorator(fn):
+        cache = None
+        lock = Lock()
+
+        def get_cache():
+            nonlocal cache
+            if cache is None:
+                with lock:
+                    if cache is None:
+                        cache = TwoTierCache(namespace, ttl, local_ttl, max_size)
+            return cache
+
+        def key_for(args):
+            return ':'.join(str(arg) for arg in args)
+
+        @wraps(fn)
+        def wrapper(*args):
+            return get_cache().get_or_load(key_for(args), lambda: fn(*args))
+
+        wrapper.invalidate = lambda *args: get_cache().invalidate(key_for(args))
+        wrapper.set = lambda value, *args: get_cache().set(key_for(args), value)
+        wrapper.clear = lambda: get_cache().clear()
+        wrapper.cache = get_cache
+        return wrapper
+    return decorator
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+import os
+
+FANOUT_MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', 16))
+FANOUT_TIMEOUT = float(os.getenv('FANOUT_TIMEOUT', 10))  # seconds
+
+# Shared by every request in the worker so concurrent composite requests
+# queue for a slot instead of opening unbounded threads and connections.
+# Blocking pymongo calls release the GIL, and under eventlet monkey patching
+# these threads are green threads, so the reads overlap either way.
+_pool = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+
+
+def fan_out(calls: Dict[str, Callable[[], Any]], timeout: Optional[float] = FANOUT_TIMEOUT) -> Dict[str, Any]:
+    """Run independent reads concurrently and return their results by name.
+
+    Latency is that of the slowest call rather than the sum. The first
+    failure (or a timeout) is raised once every call has settled or the
+    deadline passes. Calls must not fan out themselves, as nested calls
+    could wait on the slots held by their parents.
+    """
+    futures = {name: _pool.submit(fn) for name, fn in calls.items()}
+    _, pending = wait(futures.values(), timeout=timeout)
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise TimeoutError(f"Fan-out did not finish within {timeout}s")
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,69 @@
+import math
+from typing import Tuple
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Sphere $geoNear measures GeoJSON distances on, so both agree
+EARTH_RADIUS_M = 6378100.0
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    """Encode a coordinate as a geohash string of ``precision`` characters"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return (min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """Return the (latitude, longitude) centre of a geohash cell"""
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance in metres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def geohash_radius_m(geohash: str) -> float:
+    """Distance in metres from a cell's centre to its farthest corner"""
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    center_lat, center_lng = geohash_center(geohash)
+    return max(
+        distance_m(center_lat, center_lng, lat, lng)
+        for lat in (min_lat, max_lat) for lng in (min_lng, max_lng)
+    )
@@ -0,0 +1,100 @@
+from functools import wraps
+from typing import Iterable
+import hashlib
+
+from flask import request, make_response
+import os
+
+from config.database import db
+from utils.cache import TTLCache, get_cache_backend
+from utils.single_flight import SingleFlight
+
+VERSION_TTL = 1.0  # seconds a worker may serve a stale version after another worker's write
+
+# Collection name -> version counter
+_versions = TTLCache(max_size=256, ttl=VERSION_TTL)
+# ETag -> (serialized body, mimetype)
+_bodies = TTLCache(max_size=1024, ttl=600)
+# Concurrent renders of the same ETag share one view call
+_renders = None
+
+
+def collection_versions(names: Iterable[str]) -> tuple:
+    """Current version counters for the given collections"""
+    names = sorted(names)
+    versions = {name: _versions.get(name) for name in names}
+    missing = [name for name, version in versions.items() if version is None]
+    if missing:
+        found = {
+            doc['_id']: doc['version']
+            for doc in db.get_db().collection_versions.find({'_id': {'$in': missing}})
+        }
+        for name in missing:
+            versions[name] = found.get(name, 0)
+            _versions.set(name, versions[name])
+    return tuple(versions[name] for name in names)
+
+
+def bump_version(*names: str) -> None:
+    """Invalidate cached responses derived from the given collections"""
+    for name in names:
+        db.get_db().collection_versions.update_one({'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+        _versions.delete(name)
+
+
+def _render_flight() -> SingleFlight:
+    """Created on first use, after the environment is loaded. Set
+    SINGLE_FLIGHT_SHARED=true to also coalesce renders across workers."""
+    global _renders
+    if _renders is None:
+        shared = os.getenv('SINGLE_FLIGHT_SHARED', 'false').lower() == 'true'
+        _renders = SingleFlight('http', backend=get_cache_backend() if shared else None)
+    return _renders
+
+
+def _render(fn, args, kwargs) -> tuple:
+    response = make_response(fn(*args, **kwargs))
+    return response.get_data(), response.mimetype, response.status_code
+
+
+def cached_response(collections: Iterable[str], max_age: int = 60):
+    """Cache a public GET view by a strong ETag derived from collection versions.
+
+    The ETag hashes the request path, query string and the version counter
+    of every collection the view reads, so any write that calls
+    ``bump_version`` changes it. Matching ``If-None-Match`` requests get a
+    304 without running the view, serialized bodies are kept in an
+    in-process LRU keyed by ETag, and concurrent misses for one ETag run the
+    view once.
+    """
+    collections = tuple(collections)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = collection_versions(collections)
+            key = f"{request.path}?{sorted(request.args.items(multi=True))}|{versions}"
+            etag = hashlib.sha1(key.encode()).hexdigest()
+            cache_control = f'public, max-age={max_age}'
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                cached = _bodies.get(etag)
+                if cached is not None:
+                    body, mimetype = cached
+                    response = make_response(body, 200)
+                    response.mimetype = mimetype
+                else:
+                    body, mimetype, status = _render_flight().do(etag, lambda: _render(fn, args, kwargs))
+                    response = make_response(body, status)
+                    response.mimetype = mimetype
+                    if status != 200:
+                        return response
+                    _bodies.set(etag, (body, mimetype))
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from typing import Any, Union
+
+import orjson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+
+DUMP_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def default(obj: Any) -> Any:
+    """Encode the types orjson does not handle natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Decimal128):
+        return float(obj.to_decimal())
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, tuple) and hasattr(obj, '_asdict'):
+        return obj._asdict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    ObjectId is encoded as its hex string, datetimes as ISO 8601 (naive
+    values are treated as UTC, which is how they are stored), Decimal and
+    Decimal128 as numbers, pydantic models through ``model_dump`` and
+    NamedTuple read models as objects, so views can return Mongo documents
+    and cached projections as-is.
+    """
+
+    mimetype = "application/json"
+
+    def _options(self) -> int:
+        if self._app.debug:
+            return DUMP_OPTIONS | orjson.OPT_INDENT_2
+        return DUMP_OPTIONS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=default, option=self._options()).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,133 @@
+from collections import Counter
+from threading import Event, Lock
+from typing import Any, Callable, Optional
+import pickle
+import time
+import uuid
+
+try:
+    import eventlet
+    import greenlet
+    from eventlet import patcher
+except ImportError:  # pragma: no cover - eventlet is a deployment dependency
+    eventlet = None
+
+POLL_INTERVAL = 0.01  # seconds between checks for another worker's result
+
+
+def _in_green_thread() -> bool:
+    """True when running in an eventlet green thread whose blocking calls are not patched"""
+    if eventlet is None or patcher.is_monkey_patched('thread'):
+        return False
+    return greenlet.getcurrent().parent is not None
+
+
+class _GreenEvent:
+    """threading.Event interface over an eventlet event, so waiting yields to the hub"""
+
+    def __init__(self):
+        self._event = eventlet.event.Event()
+
+    def set(self):
+        if not self._event.ready():
+            self._event.send(True)
+
+    def wait(self, timeout: Optional[float] = None):
+        return self._event.wait(timeout)
+
+
+def _new_event():
+    return _GreenEvent() if _in_green_thread() else Event()
+
+
+def _sleep(seconds: float):
+    if _in_green_thread():
+        eventlet.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+class _Call:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = _new_event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so only one runs and the rest share its result.
+
+    Within a worker, callers of ``do`` with a key that is already in flight
+    wait for the leader and receive the same value (or exception). Waiting
+    uses green events under unpatched eventlet and threading events
+    otherwise. With ``backend`` set (see ``utils.cache.get_cache_backend``)
+    the leader also takes a short lock in the shared store so leaders in
+    other workers poll for its pickled result instead of querying; that
+    result stays readable for ``result_ttl`` seconds.
+
+    Results are shared objects: callers must not mutate them.
+    """
+
+    def __init__(self, namespace: str, backend=None, lock_ttl: float = 5.0, result_ttl: float = 1.0):
+        self.namespace = namespace
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.stats = Counter()
+        self._calls = {}
+        self._lock = Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self.stats['coalesced'] += 1
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        self.stats['leaders'] += 1
+        try:
+            call.value = self._run(key, fn) if self.backend is not None else fn()
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _run(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` at most once across workers sharing the backend"""
+        lock_key = f"flight:{self.namespace}:{key}"
+        result_key = f"{lock_key}:result"
+        token = uuid.uuid4().hex.encode()
+        deadline = time.monotonic() + self.lock_ttl
+
+        while True:
+            raw = self.backend.get(result_key)
+            if raw is not None:
+                self.stats['remote_results'] += 1
+                return pickle.loads(raw)
+            if self.backend.add(lock_key, token, self.lock_ttl):
+                break
+            if time.monotonic() > deadline:
+                # The other worker is slow or died; stop waiting for it
+                return fn()
+            _sleep(POLL_INTERVAL)
+
+        try:
+            value = fn()
+            self.backend.set(result_key, pickle.dumps(value), self.result_ttl)
+            return value
+        finally:
+            if self.backend.get(lock_key) == token:
+                self.backend.delete(lock_key)
@@ -0,0 +1,172 @@
+"""
+Requests per second per core: gunicorn + Flask (the Procfile deployment,
+one sync worker) against hypercorn + Quart/Motor (one asyncio worker) on
+the same read endpoints, under the same number of concurrent clients.
+
+Each server runs a single worker process, so its RPS is also its RPS per
+core. Needs a disposable MongoDB:
+    BENCH_MONGO_URI=mongodb://localhost:27017 PYTHONPATH=src \
+        pytest tests/benchmarks/test_async_load_benchmark.py -s
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+
+pytestmark = pytest.mark.slow
+
+BENCH_MONGO_URI = os.getenv('BENCH_MONGO_URI')
+BENCH_DB = 'ubereats_load_bench'
+CONCURRENCY = int(os.getenv('BENCH_CONCURRENCY', 64))
+DURATION = float(os.getenv('BENCH_DURATION', 10))
+N_STORES = 20
+N_PRODUCTS = 200  # per store
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def flask_read_app():
+    """The Flask read endpoints without the rest of ``create_app``'s startup work"""
+    from flask import Flask
+    from controllers.grocery_controller import grocery
+    from utils.json_provider import OrjsonProvider
+
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(grocery, url_prefix='/api/grocery')
+    return app
+
+
+def seed(database):
+    rng = random.Random(7)
+    database.grocery_stores.drop()
+    database.grocery_products.drop()
+
+    store_ids = [ObjectId() for _ in range(N_STORES)]
+    database.grocery_stores.insert_many([
+        {'_id': store_id, 'name': f'Store {i}', 'rating': 4.5, 'categories': ['dairy']}
+        for i, store_id in enumerate(store_ids)
+    ])
+    database.grocery_products.insert_many([
+        {
+            'store_id': str(store_id),
+            'name': f'Product {rng.randint(0, 10 ** 6)}',
+            'price': round(rng.uniform(1, 50), 2),
+            'category': 'dairy',
+            'in_stock': True
+        }
+        for store_id in store_ids for _ in range(N_PRODUCTS)
+    ])
+    database.grocery_products.create_index([('store_id', 1), ('_id', 1)])
+    return [str(store_id) for store_id in store_ids]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_serving(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def start_server(kind, port):
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([str(ROOT / 'src'), str(ROOT / 'tests' / 'benchmarks')]),
+        MONGO_URI=BENCH_MONGO_URI,
+        MONGODB_NAME=BENCH_DB
+    )
+    if kind == 'gunicorn':
+        command = [
+            sys.executable, '-m', 'gunicorn', '--workers', '1', '--bind', f'127.0.0.1:{port}',
+            'test_async_load_benchmark:flask_read_app()'
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'hypercorn', '--workers', '1', '--bind', f'127.0.0.1:{port}',
+            'asgi:app'
+        ]
+    process = subprocess.Popen(
+        command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    wait_until_serving(port)
+    return process
+
+
+def client(port, paths, deadline):
+    """One keep-alive client issuing requests until the deadline"""
+    done = errors = 0
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        try:
+            connection.request('GET', rng.choice(paths))
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                done += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.close()
+    return done, errors
+
+
+def load(port, paths):
+    deadline = time.monotonic() + DURATION
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        results = list(pool.map(lambda _: client(port, paths, deadline), range(CONCURRENCY)))
+    return sum(r[0] for r in results) / DURATION, sum(r[1] for r in results)
+
+
+@pytest.mark.skipif(not BENCH_MONGO_URI, reason="set BENCH_MONGO_URI to a disposable MongoDB")
+def test_requests_per_core_gunicorn_vs_asgi():
+    """Test requests per core of gunicorn and hypercorn on uncached product pages"""
+    mongo = MongoClient(BENCH_MONGO_URI)
+    try:
+        store_ids = seed(mongo[BENCH_DB])
+        # Product pages are not response-cached on either stack, so every
+        # request reaches MongoDB
+        paths = [f'/api/grocery/stores/{store_id}/products?limit=50' for store_id in store_ids]
+
+        results = {}
+        for kind in ('gunicorn', 'hypercorn'):
+            port = free_port()
+            process = start_server(kind, port)
+            try:
+                load(port, paths[:2])  # warm up connections and caches
+                results[kind] = load(port, paths)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+
+        for kind, (rps, errors) in results.items():
+            print(f"\n{kind}: {rps:.0f} req/s per core, {errors} errors, {CONCURRENCY} clients")
+        print(f"asgi/gunicorn: {results['hypercorn'][0] / results['gunicorn'][0]:.2f}x")
+
+        assert all(errors == 0 for _, errors in results.values())
+        assert all(rps > 0 for rps, _ in results.values())
+    finally:
+        mongo.drop_database(BENCH_DB)
+        mongo.close()
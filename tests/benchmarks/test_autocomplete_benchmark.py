@@ -0,0 +1,33 @@
+"""
+Autocomplete lookup latency over a 100k entry in-memory index.
+
+Run with: PYTHONPATH=src pytest tests/benchmarks/test_autocomplete_benchmark.py -s
+"""
+import time
+
+import pytest
+
+from services.autocomplete_service import AutocompleteIndex
+
+pytestmark = pytest.mark.slow
+
+N_ENTRIES = 100_000
+QUERIES = ['sp', 'chick', 'ger sal', 'noodle bo']
+WORDS = ['spicy', 'chicken', 'burger', 'salad', 'pizza', 'taco', 'noodle', 'sushi', 'vegan', 'bowl']
+
+
+def test_suggest_is_fast_on_large_catalog():
+    """Test lookups stay well under a millisecond for 100k entries"""
+    index = AutocompleteIndex()
+    index.build([
+        ('menu_item', f'm{i}', 'r1', f'{WORDS[i % 10]} {WORDS[(i // 10) % 10]} {i}', float(i % 97))
+        for i in range(N_ENTRIES)
+    ])
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(100):
+            index.suggest(query)
+        per_lookup_us = (time.perf_counter() - start) / 100 * 1e6
+        print(f"\n{query!r}: {per_lookup_us:.0f} us per lookup")
+        assert per_lookup_us < 1000
@@ -0,0 +1,41 @@
+"""
+Peak-load simulation for the batch dispatcher.
+
+Run with: PYTHONPATH=src pytest tests/benchmarks/test_dispatch_benchmark.py -s
+"""
+import os
+import time
+import numpy as np
+import pytest
+from services.dispatch_service import solve_assignment
+
+pytestmark = pytest.mark.slow
+
+DISPATCH_INTERVAL_SECONDS = float(os.getenv('DISPATCH_INTERVAL_SECONDS', 5))
+
+def synthetic_city(n_orders, n_drivers, seed=42):
+    """Scatter orders and drivers over a ~20x20 km metro area."""
+    rng = np.random.default_rng(seed)
+    origin = np.array([40.65, -74.05])
+    span = np.array([0.18, 0.24])
+    pickups = origin + rng.random((n_orders, 2)) * span
+    drivers = origin + rng.random((n_drivers, 2)) * span
+    ready_in = np.where(rng.random(n_orders) < 0.5, 0, rng.random(n_orders) * 20)
+    waited = np.where(ready_in == 0, rng.random(n_orders) * 10, 0)
+    return pickups, drivers, ready_in.astype(np.float32), waited.astype(np.float32)
+
+@pytest.mark.parametrize("n_orders,n_drivers", [(1000, 800), (5000, 3000), (10000, 6000)])
+def test_dispatch_keeps_up_at_peak(n_orders, n_drivers):
+    """A full dispatch solve must finish inside one scheduler tick."""
+    pickups, drivers, ready_in, waited = synthetic_city(n_orders, n_drivers)
+
+    start = time.perf_counter()
+    assignments = solve_assignment(pickups, drivers, ready_in, waited)
+    elapsed = time.perf_counter() - start
+
+    etas = np.array([eta for _, _, eta in assignments])
+    print(f"\n{n_orders} orders x {n_drivers} drivers: {len(assignments)} assigned "
+          f"in {elapsed * 1000:.0f} ms, median pickup ETA {np.median(etas):.1f} min")
+
+    assert len(assignments) == min(n_orders, n_drivers)
+    assert elapsed < DISPATCH_INTERVAL_SECONDS
@@ -0,0 +1,88 @@
+"""
+Regex vs text-index latency for grocery product search.
+
+Needs a disposable MongoDB; the catalog is generated on first run:
+    BENCH_MONGO_URI=mongodb://localhost:27017 PYTHONPATH=src \
+        pytest tests/benchmarks/test_grocery_search_benchmark.py -s
+"""
+import os
+import random
+import statistics
+import time
+import pytest
+from pymongo import MongoClient
+from config.indexes import setup_indexes
+
+pytestmark = pytest.mark.slow
+
+BENCH_MONGO_URI = os.getenv('BENCH_MONGO_URI')
+N_PRODUCTS = int(os.getenv('BENCH_PRODUCTS', 1_000_000))
+N_STORES = 200
+RUNS = 20
+
+ADJECTIVES = ['organic', 'fresh', 'frozen', 'smoked', 'spicy', 'sweet', 'whole', 'low-fat', 'roasted', 'wild']
+NOUNS = ['apple', 'banana', 'salmon', 'chicken', 'yogurt', 'bread', 'cheddar', 'almond', 'coffee', 'tomato',
+         'spinach', 'pasta', 'rice', 'honey', 'butter', 'granola', 'avocado', 'mango', 'tofu', 'oat']
+TERMS = ['salmon', 'organic honey', 'granola', 'tofu']
+
+@pytest.fixture(scope='module')
+def catalog():
+    if not BENCH_MONGO_URI:
+        pytest.skip('BENCH_MONGO_URI not set')
+    client = MongoClient(BENCH_MONGO_URI)
+    bench_db = client['ubereats_bench']
+    if bench_db.grocery_products.estimated_document_count() < N_PRODUCTS:
+        bench_db.grocery_products.drop()
+        rng = random.Random(7)
+        batch = []
+        for i in range(N_PRODUCTS):
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(NOUNS)}"
+            batch.append({
+                'store_id': f'store{i % N_STORES}',
+                'name': name,
+                'description': f"{rng.choice(ADJECTIVES)} {name} from local farms",
+                'price': round(rng.uniform(0.5, 40), 2),
+                'category': rng.choice(NOUNS),
+                'in_stock': rng.random() > 0.1
+            })
+            if len(batch) == 10_000:
+                bench_db.grocery_products.insert_many(batch)
+                batch = []
+        if batch:
+            bench_db.grocery_products.insert_many(batch)
+    setup_indexes(bench_db)
+    yield bench_db.grocery_products
+    client.close()
+
+def _timed(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+@pytest.mark.parametrize('term', TERMS)
+def test_text_search_beats_regex(catalog, term):
+    """Store-scoped $text search should beat an unanchored regex scan."""
+    store_id = 'store42'
+
+    def regex_search():
+        list(catalog.find({'store_id': store_id, '$or': [
+            {'name': {'$regex': term, '$options': 'i'}},
+            {'description': {'$regex': term, '$options': 'i'}}
+        ]}))
+
+    def text_search():
+        list(catalog.find(
+            {'store_id': store_id, '$text': {'$search': term}},
+            {'score': {'$meta': 'textScore'}}
+        ).sort([('score', {'$meta': 'textScore'})]).limit(50))
+
+    regex_p50, regex_p95 = _timed(regex_search)
+    text_p50, text_p95 = _timed(text_search)
+    print(f"\n{term!r}: regex p50={regex_p50:.1f}ms p95={regex_p95:.1f}ms | "
+          f"text p50={text_p50:.1f}ms p95={text_p95:.1f}ms")
+
+    assert text_p50 < regex_p50
@@ -0,0 +1,101 @@
+"""
+Serialization micro-benchmark: Flask's default provider with the old
+per-document ``_id`` conversion vs. the orjson provider.
+
+Run with: PYTHONPATH=src pytest tests/benchmarks/test_json_serialization_benchmark.py -s
+"""
+from datetime import datetime, timedelta
+import random
+import time
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.json_provider import OrjsonProvider
+
+pytestmark = pytest.mark.slow
+
+ROUNDS = 50
+
+
+def sample_order(rng, now):
+    items = [
+        {
+            'menu_item_id': str(ObjectId()),
+            'name': f'Item {i}',
+            'quantity': rng.randint(1, 3),
+            'unit_price': round(rng.uniform(3, 30), 2),
+            'customizations': [{'name': 'Spice', 'options': ['Medium'], 'additional_price': 0.5}],
+            'special_instructions': None,
+            'subtotal': round(rng.uniform(3, 90), 2)
+        }
+        for i in range(rng.randint(1, 6))
+    ]
+    return {
+        '_id': ObjectId(),
+        'user_id': str(ObjectId()),
+        'restaurant_id': str(ObjectId()),
+        'items': items,
+        'status': 'delivered',
+        'payment_status': 'completed',
+        'delivery_info': {
+            'address': '123 Main St', 'city': 'New York', 'state': 'NY', 'zip_code': '10001',
+            'latitude': 40.71, 'longitude': -74.0, 'driver_id': str(ObjectId()),
+            'estimated_delivery_time': now + timedelta(minutes=35)
+        },
+        'subtotal': 42.5, 'tax': 3.77, 'delivery_fee': 2.99, 'total': 49.26,
+        'created_at': now, 'updated_at': now
+    }
+
+
+def sample_store(rng, now):
+    return {
+        '_id': ObjectId(),
+        'name': f'Store {rng.randint(0, 10 ** 6)}',
+        'description': 'Fresh produce, dairy and pantry staples',
+        'image_url': 'https://example.com/store.jpg',
+        'delivery_time': '20-30 min', 'delivery_fee': 1.99, 'minimum_order': 10.0,
+        'rating': 4.6, 'total_ratings': rng.randint(0, 5000),
+        'categories': ['produce', 'dairy', 'bakery'],
+        'offers': [{'title': '10% off', 'expires_at': now + timedelta(days=7)}],
+        'is_featured': rng.random() < 0.1,
+        'created_at': now
+    }
+
+
+def legacy_response(app, docs):
+    """What views used to do: copy each document with a string _id, then jsonify"""
+    return app.json.response([{**doc, '_id': str(doc['_id'])} for doc in docs])
+
+
+def measure(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+@pytest.mark.parametrize('kind,count', [('orders', 100), ('orders', 1000), ('stores', 500)])
+def test_orjson_provider_is_faster(kind, count):
+    """Test the orjson provider serializes payloads faster than the default provider"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    factory = sample_order if kind == 'orders' else sample_store
+    docs = [factory(rng, now) for _ in range(count)]
+
+    default_app = Flask('default')
+    default_app.json = DefaultJSONProvider(default_app)
+    orjson_app = Flask('orjson')
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    with default_app.app_context():
+        baseline = measure(lambda: legacy_response(default_app, docs))
+    with orjson_app.app_context():
+        fast = measure(lambda: orjson_app.json.response(docs))
+
+    print(f"\n{count} {kind}: default {baseline * 1000:.2f} ms, orjson {fast * 1000:.2f} ms "
+          f"({baseline / fast:.1f}x)")
+
+    assert fast < baseline
@@ -0,0 +1,98 @@
+"""
+Per-object cost of validated vs trusted model construction from DB documents.
+
+Only flat models with Python-side validators (User and its EmailStr) get
+cheaper. Nested trees such as Order and MenuItem are built by
+pydantic-core either way, so their read paths keep raw documents or the
+compact read models instead of constructing models at all.
+
+Run with: PYTHONPATH=src pytest tests/benchmarks/test_model_construct_benchmark.py -s
+"""
+from datetime import datetime
+import time
+
+import pytest
+from bson import ObjectId
+
+from models.menu_item import MenuItem
+from models.order import Order
+from models.trusted import from_db
+from models.user import User
+
+pytestmark = pytest.mark.slow
+
+N_OBJECTS = 20_000
+NOW = datetime(2024, 1, 1)
+
+
+def order_document():
+    item = {
+        'menu_item_id': str(ObjectId()), 'name': 'Classic Burger', 'quantity': 2, 'unit_price': 9.99,
+        'customizations': [{'name': 'Cheese', 'options': ['American']}],
+        'special_instructions': 'No onions', 'subtotal': 19.98
+    }
+    return {
+        '_id': str(ObjectId()), 'user_id': str(ObjectId()), 'restaurant_id': str(ObjectId()),
+        'items': [item] * 3, 'status': 'preparing',
+        'delivery_info': {
+            'address': '123 Main St', 'city': 'New York', 'state': 'NY', 'zip_code': '10001',
+            'latitude': 40.73, 'longitude': -73.93, 'instructions': None, 'driver_id': None,
+            'estimated_delivery_time': None, 'actual_delivery_time': None
+        },
+        'payment_info': {
+            'method': 'credit_card', 'subtotal': 59.94, 'tax': 5.32, 'delivery_fee': 2.99,
+            'service_fee': 3.0, 'tip': 4.0, 'total': 75.25, 'status': 'pending', 'transaction_id': None
+        },
+        'is_scheduled': False, 'scheduled_for': None, 'created_at': NOW, 'updated_at': NOW,
+        'estimated_preparation_time': 20, 'special_instructions': None
+    }
+
+
+def user_document():
+    return {
+        '_id': str(ObjectId()), 'email': 'jane@example.com', 'password': '', 'password_hash': 'pbkdf2:sha256$x',
+        'first_name': 'Jane', 'last_name': 'Doe', 'phone_number': '+1234567890',
+        'is_active': True, 'is_verified': True, 'role': 'customer', 'created_at': NOW, 'updated_at': NOW,
+        'preferences': {'notifications': True, 'language': 'en', 'dark_mode': False},
+        'saved_addresses': [{'type': 'home', 'address': '123 Main St'}], 'payment_methods': []
+    }
+
+
+def menu_item_document():
+    option = {'name': 'Bacon', 'price': 2.0, 'is_available': True}
+    return {
+        '_id': str(ObjectId()), 'restaurant_id': str(ObjectId()), 'name': 'Classic Burger',
+        'description': 'Juicy beef patty', 'price': 9.99, 'category': 'Burgers', 'image_url': None,
+        'customizations': [{'name': 'Toppings', 'multiple_select': True, 'options': [option] * 4}] * 2,
+        'nutritional_info': {'calories': 650, 'protein': 35, 'carbohydrates': 28, 'fat': 45, 'allergens': ['dairy']},
+        'preparation_time': 10, 'created_at': NOW, 'updated_at': NOW
+    }
+
+
+def per_object_us(fn, docs):
+    start = time.perf_counter()
+    for doc in docs:
+        fn(doc)
+    return (time.perf_counter() - start) / len(docs) * 1e6
+
+
+@pytest.mark.parametrize('model,factory', [
+    (Order, order_document), (User, user_document), (MenuItem, menu_item_document)
+], ids=['Order', 'User', 'MenuItem'])
+def test_trusted_construction_cost(model, factory):
+    """Test from_db is cheaper for User and no slower for nested models"""
+    docs = [factory() for _ in range(N_OBJECTS)]
+
+    validated = per_object_us(model.model_validate, docs)
+    trusted = per_object_us(lambda doc: from_db(model, doc), docs)
+    dumped = per_object_us(lambda doc: doc.model_dump(by_alias=True), [from_db(model, d) for d in docs[:2000]])
+
+    print(f"\n{model.__name__}: model_validate {validated:.1f} us, from_db {trusted:.1f} us, "
+          f"model_dump {dumped:.1f} us per object")
+
+    if model is User:
+        # EmailStr validation runs in Python and dominates flat models
+        assert trusted * 3 < validated
+    else:
+        # Nested trees are built by pydantic-core either way: no speedup
+        assert trusted < validated * 1.5
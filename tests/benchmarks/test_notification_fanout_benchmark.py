@@ -0,0 +1,168 @@
+"""
+Notification fan-out of one worker: how long ``NotificationService.notify_*``
+takes to reach every socket in the target room, and how much memory each
+connected socket costs.
+
+The app is built with ``create_app`` against an in-memory MongoDB
+(mongomock) with the change watcher and order event dispatcher disabled.
+N authenticated Socket.IO test clients connect: restaurant owners joining
+their restaurant room and customers joining their order room (every
+socket also follows its user room). Notifications are then driven at a
+fixed rate. Test clients receive in-process, so latency is the server-side
+cost of an emit (room lookup, packet encoding, per-socket enqueue) without
+network transport.
+
+Run with:
+    PYTHONPATH=src pytest tests/benchmarks/test_notification_fanout_benchmark.py -s
+Tune with BENCH_CLIENTS, BENCH_EMITS_PER_SECOND, BENCH_DURATION and
+BENCH_BROADCAST_SHARE (fraction of emits broadcast to every socket).
+"""
+from datetime import datetime, timedelta
+import gc
+import os
+import random
+import time
+import tracemalloc
+from unittest import mock
+
+import jwt
+import mongomock
+import pytest
+from bson import ObjectId
+
+pytestmark = pytest.mark.slow
+
+N_CLIENTS = int(os.getenv('BENCH_CLIENTS', 500))
+EMITS_PER_SECOND = float(os.getenv('BENCH_EMITS_PER_SECOND', 200))
+DURATION = float(os.getenv('BENCH_DURATION', 5))
+BROADCAST_SHARE = float(os.getenv('BENCH_BROADCAST_SHARE', 0.02))
+OWNER_SHARE = 0.1  # clients that own a restaurant; the rest follow one order each
+
+BENCH_ENV = {
+    'MONGO_URI': 'mongodb://localhost:27017/ubereats',
+    'SECRET_KEY': 'bench-secret',
+    'JWT_SECRET': 'bench-secret',
+    'CORS_ORIGIN': '*',
+    'CHANGE_WATCHER_ENABLED': 'false',
+    'ORDER_EVENTS_ENABLED': 'false',
+    'DISPATCH_ENABLED': 'false'
+}
+
+
+@pytest.fixture(scope='module')
+def app():
+    from app import create_app
+    from config.paypal import paypal_keys
+
+    placeholders = {key: 'bench' for key, value in paypal_keys.items() if value.startswith('your_paypal_')}
+    with mock.patch.dict(os.environ, BENCH_ENV), mock.patch.dict(paypal_keys, placeholders), \
+            mock.patch('config.database.MongoClient', mongomock.MongoClient):
+        yield create_app()
+
+
+def seed(database, rng):
+    """Owners with one restaurant each and customers with one order each"""
+    n_owners = max(int(N_CLIENTS * OWNER_SHARE), 1)
+    owners = [(ObjectId(), ObjectId()) for _ in range(n_owners)]
+    customers = [(ObjectId(), ObjectId(), rng.choice(owners)[1]) for _ in range(N_CLIENTS - n_owners)]
+
+    def user(user_id, role):
+        return {'_id': user_id, 'email': f'{user_id}@example.com', 'password_hash': 'x',
+                'first_name': 'Bench', 'last_name': 'User', 'role': role, 'is_active': True}
+
+    database.users.insert_many(
+        [user(owner_id, 'restaurant_owner') for owner_id, _ in owners] +
+        [user(customer_id, 'customer') for customer_id, _, _ in customers]
+    )
+    database.restaurants.insert_many([
+        {'_id': restaurant_id, 'name': 'Bench Kitchen', 'owner_id': str(owner_id)}
+        for owner_id, restaurant_id in owners
+    ])
+    database.orders.insert_many([
+        {'_id': order_id, 'user_id': str(customer_id), 'restaurant_id': str(restaurant_id),
+         'status': 'pending', 'delivery_info': {'driver_id': None}}
+        for customer_id, order_id, restaurant_id in customers
+    ])
+    return owners, customers
+
+
+def token(user_id):
+    from services.auth_service import auth_service
+    payload = {'user_id': str(user_id), 'exp': datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, auth_service.secret_key, algorithm='HS256')
+
+
+def connect(app, user_id, room_type, room_id):
+    from services.notification_service import socketio
+    client = socketio.test_client(app, auth={'token': token(user_id)})
+    assert client.is_connected()
+    assert client.emit('join', {'type': room_type, 'id': str(room_id)}, callback=True) == {'joined': True}
+    client.get_received()
+    return client
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def test_notification_fanout(app):
+    """Test every emit reaches its room while measuring latency and memory per socket"""
+    from config.database import db
+    from services.notification_service import NotificationService
+
+    rng = random.Random(7)
+    owners, customers = seed(db.get_db(), rng)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    clients = [connect(app, owner_id, 'restaurant', restaurant_id) for owner_id, restaurant_id in owners]
+    clients += [connect(app, customer_id, 'order', order_id) for customer_id, order_id, _ in customers]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    per_connection = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / len(clients)
+
+    # (kind, call, receivers) for each kind of notification
+    def next_emit():
+        if rng.random() < BROADCAST_SHARE:
+            return 'broadcast', lambda: NotificationService.broadcast_restaurant_status('r', True), len(clients)
+        customer_id, order_id, restaurant_id = rng.choice(customers)
+        kind = rng.choice(['order_status', 'new_order', 'payment_update'])
+        if kind == 'order_status':
+            return kind, lambda: NotificationService.notify_order_status_update(str(order_id), 'preparing'), 1
+        if kind == 'new_order':
+            return kind, lambda: NotificationService.notify_new_order(str(restaurant_id), {'order_id': str(order_id)}), 1
+        return kind, lambda: NotificationService.notify_payment_update(str(order_id), 'completed', str(customer_id)), 1
+
+    latencies, expected, lag = {}, 0, 0.0
+    n_emits = int(EMITS_PER_SECOND * DURATION)
+    started = time.perf_counter()
+    for i in range(n_emits):
+        due = started + i / EMITS_PER_SECOND
+        now = time.perf_counter()
+        if now < due:
+            time.sleep(due - now)
+        else:
+            lag = max(lag, now - due)
+        kind, call, receivers = next_emit()
+        t0 = time.perf_counter()
+        call()
+        latencies.setdefault(kind, []).append(time.perf_counter() - t0)
+        expected += receivers
+    elapsed = time.perf_counter() - started
+
+    delivered = sum(len(client.get_received()) for client in clients)
+    for client in clients:
+        client.disconnect()
+
+    print(f"\n{len(clients)} sockets ({len(owners)} restaurant, {len(customers)} order rooms), "
+          f"{n_emits} emits in {elapsed:.2f}s ({n_emits / elapsed:.0f}/s, target {EMITS_PER_SECOND:.0f}/s, "
+          f"max lag {lag * 1000:.1f} ms)")
+    print(f"Deliveries: {delivered} ({delivered / elapsed:.0f}/s); memory per connection: {per_connection / 1024:.1f} KiB")
+    for kind, samples in sorted(latencies.items()):
+        print(f"  {kind:<14} n={len(samples):<6} p50={percentile(samples, 0.5) * 1e6:8.0f}us "
+              f"p95={percentile(samples, 0.95) * 1e6:8.0f}us p99={percentile(samples, 0.99) * 1e6:8.0f}us")
+
+    assert delivered == expected
@@ -0,0 +1,119 @@
+"""
+Raw-BSON streaming vs the per-document cursor path for bulk exports.
+
+The CPU-only cases replay pre-encoded server batches. The end-to-end case
+needs a disposable MongoDB:
+    BENCH_MONGO_URI=mongodb://localhost:27017 PYTHONPATH=src \
+        pytest tests/benchmarks/test_raw_bson_benchmark.py -s
+"""
+from datetime import datetime
+import os
+import random
+import time
+
+import bson
+import pytest
+from bson import ObjectId
+from flask import Flask
+from pymongo import MongoClient
+
+from utils.bson_stream import RAW_BATCH_SIZE, stream_raw_batches
+from utils.json_provider import OrjsonProvider
+
+pytestmark = pytest.mark.slow
+
+BENCH_MONGO_URI = os.getenv('BENCH_MONGO_URI')
+N_DOCS = int(os.getenv('BENCH_EXPORT_DOCS', 50_000))
+REPEATS = 5
+
+
+def sample_product(rng, now):
+    return {
+        '_id': ObjectId(),
+        'store_id': str(ObjectId()),
+        'name': f'Product {rng.randint(0, 10 ** 6)}',
+        'description': 'Organic whole milk, 1 gallon, from local farms',
+        'price': round(rng.uniform(1, 50), 2),
+        'category': 'dairy',
+        'image_url': 'https://example.com/p.jpg',
+        'in_stock': True,
+        'nutrition': {'calories': 150, 'fat': 8.0, 'protein': 8.0},
+        'tags': ['organic', 'local'],
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def per_document_path(app, docs):
+    """Previous export path: a decoding cursor and one dumps() per document"""
+    return b''.join((app.json.dumps(doc) + '\n').encode() for doc in docs)
+
+
+def timed(fn):
+    """Best of REPEATS runs, to keep GC pauses out of the comparison"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, timings):
+    print(f"\n{label}: " + ', '.join(f"{name} {elapsed * 1000:.0f} ms" for name, elapsed in timings.items()))
+
+
+def test_raw_batches_cpu_cost():
+    """Test the CPU cost of streaming raw batches against per-document encoding"""
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    docs = [sample_product(rng, now) for _ in range(N_DOCS)]
+    batches = [
+        b''.join(bson.encode(doc) for doc in docs[i:i + RAW_BATCH_SIZE])
+        for i in range(0, N_DOCS, RAW_BATCH_SIZE)
+    ]
+    app = Flask('bench')
+    app.json = OrjsonProvider(app)
+
+    with app.app_context():
+        # The regular cursor decodes every batch before handing out documents
+        cursor_path = timed(lambda: per_document_path(
+            app, (doc for batch in batches for doc in bson.decode_all(batch))
+        ))
+    ndjson_path = timed(lambda: b''.join(stream_raw_batches(iter(batches), 'ndjson')))
+    bson_path = timed(lambda: b''.join(stream_raw_batches(iter(batches), 'bson')))
+
+    report(f"{N_DOCS} products (CPU only)",
+           {'cursor+dumps': cursor_path, 'raw ndjson': ndjson_path, 'raw bson': bson_path})
+
+    # Decoding dominates the JSON path either way; passthrough skips it entirely
+    assert ndjson_path < cursor_path * 1.2
+    assert bson_path * 10 < cursor_path
+
+
+def test_raw_batches_end_to_end():
+    """Test raw batch streaming against a regular cursor on a live MongoDB"""
+    if not BENCH_MONGO_URI:
+        pytest.skip('BENCH_MONGO_URI not set')
+    collection = MongoClient(BENCH_MONGO_URI)['ubereats_bench'].export_products
+    if collection.estimated_document_count() < N_DOCS:
+        collection.drop()
+        rng = random.Random(3)
+        now = datetime.utcnow()
+        collection.insert_many([sample_product(rng, now) for _ in range(N_DOCS)])
+
+    app = Flask('bench')
+    app.json = OrjsonProvider(app)
+    with app.app_context():
+        cursor_path = timed(lambda: per_document_path(app, collection.find().batch_size(RAW_BATCH_SIZE)))
+    ndjson_path = timed(lambda: b''.join(
+        stream_raw_batches(collection.find_raw_batches(batch_size=RAW_BATCH_SIZE), 'ndjson')
+    ))
+    bson_path = timed(lambda: b''.join(
+        stream_raw_batches(collection.find_raw_batches(batch_size=RAW_BATCH_SIZE), 'bson')
+    ))
+
+    report(f"{N_DOCS} products (MongoDB)",
+           {'cursor+dumps': cursor_path, 'raw ndjson': ndjson_path, 'raw bson': bson_path})
+
+    assert bson_path < cursor_path
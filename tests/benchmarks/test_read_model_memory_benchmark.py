@@ -0,0 +1,95 @@
+"""
+Memory held by cached menu items, tax rules and restaurant cards as pydantic
+models, raw documents and compact read models.
+
+Run with: PYTHONPATH=src pytest tests/benchmarks/test_read_model_memory_benchmark.py -s
+"""
+from datetime import datetime
+import gc
+import random
+import tracemalloc
+
+import bson
+import pytest
+from bson import ObjectId
+
+from models.menu_item import MenuItem
+from models.read_models import MenuItemView, RestaurantCard, TaxRuleView
+from models.restaurant import Restaurant
+from models.tax_rule import TaxRule
+
+pytestmark = pytest.mark.slow
+
+N_OBJECTS = 5000
+NOW = datetime(2024, 1, 1)
+
+
+def menu_item_document(rng):
+    return {
+        '_id': str(ObjectId()), 'restaurant_id': 'r1', 'name': f'Item {rng.randint(0, 10 ** 6)}',
+        'description': 'Juicy beef patty with lettuce, tomato, and special sauce',
+        'price': round(rng.uniform(3, 30), 2), 'category': rng.choice(['Burgers', 'Sides', 'Drinks']),
+        'image_url': 'https://example.com/images/item.jpg', 'preparation_time': 10,
+        'customizations': [
+            {'name': 'Cheese', 'options': [{'name': 'American', 'price': 1.0}, {'name': 'Cheddar', 'price': 1.0}]},
+            {'name': 'Extra Toppings', 'multiple_select': True, 'max_selections': 3,
+             'options': [{'name': 'Bacon', 'price': 2.0}, {'name': 'Avocado', 'price': 1.5}]}
+        ],
+        'nutritional_info': {'calories': 650, 'protein': 35, 'carbohydrates': 28, 'fat': 45,
+                             'allergens': ['dairy', 'gluten']},
+        'created_at': NOW, 'updated_at': NOW
+    }
+
+
+def tax_rule_document(rng):
+    return {
+        '_id': str(ObjectId()), 'restaurant_id': 'r1', 'name': 'Sales Tax',
+        'description': 'Standard state sales tax', 'rate': 8.88, 'minimum_order_amount': 0.0,
+        'created_at': NOW, 'updated_at': NOW
+    }
+
+
+def restaurant_document(rng):
+    return {
+        '_id': str(ObjectId()), 'name': f'Restaurant {rng.randint(0, 10 ** 6)}', 'description': 'Best burgers in town',
+        'owner_id': 'user123', 'cuisine_types': ['American', 'Fast Food'], 'price_range': '$$',
+        'address': {'street': '123 Main St', 'city': 'New York', 'state': 'NY', 'zip_code': '10001',
+                    'location': {'type': 'Point', 'coordinates': [-73.93, 40.73]}},
+        'opening_hours': [{'day': day, 'open': '09:00', 'close': '22:00'} for day in range(7)],
+        'rating': 4.5, 'total_ratings': 120, 'delivery_fee': 2.99, 'estimated_delivery_time': 30,
+        'preparation_time': 15, 'images': [{'url': 'https://example.com/r.jpg', 'alt': 'front', 'is_primary': True}],
+        'created_at': NOW, 'updated_at': NOW
+    }
+
+
+def retained_bytes(build):
+    """Bytes still allocated after ``build()`` returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+@pytest.mark.parametrize('model,view,factory', [
+    (MenuItem, MenuItemView, menu_item_document),
+    (TaxRule, TaxRuleView, tax_rule_document),
+    (Restaurant, RestaurantCard, restaurant_document)
+], ids=['MenuItem', 'TaxRule', 'Restaurant'])
+def test_read_models_are_several_times_smaller(model, view, factory):
+    """Test read models retain several times less memory than pydantic models"""
+    rng = random.Random(5)
+    # Round-trip through BSON so every document owns its strings, as when read from MongoDB
+    encoded = [bson.encode(factory(rng)) for _ in range(N_OBJECTS)]
+
+    as_documents = retained_bytes(lambda: [bson.decode(raw) for raw in encoded])
+    as_models = retained_bytes(lambda: [model.model_validate(bson.decode(raw)) for raw in encoded])
+    as_views = retained_bytes(lambda: [view.convert(bson.decode(raw)) for raw in encoded])
+
+    print(f"\n{N_OBJECTS} {model.__name__}: documents {as_documents / N_OBJECTS:.0f} B, "
+          f"pydantic {as_models / N_OBJECTS:.0f} B, {view.__name__} {as_views / N_OBJECTS:.0f} B per object")
+
+    assert as_views * 3 < as_models
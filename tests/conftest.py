@@ -1,8 +1,16 @@
 import pytest
+import copy
 import os
+import bson
+import mongomock
+from bson import ObjectId
 from pymongo import MongoClient
 from dotenv import load_dotenv
 from app import create_app
+from config.async_database import async_db
+from config.database import db
+from models.user import User
+from services.auth_service import auth_service
 
 # Load test environment variables
 load_dotenv()
@@ -30,6 +38,119 @@ def mongo():
     client.drop_database(db.name)
     client.close()
 
+def _as_list(fields):
+    return [fields] if isinstance(fields, str) else fields
+
+def raw_batches(documents, batch_size):
+    """Raw BSON batches as returned by the ``*_raw_batches`` methods"""
+    encoded = [bson.encode(document) for document in documents]
+    return [b''.join(encoded[i:i + batch_size]) for i in range(0, len(encoded), batch_size)]
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """In-memory MongoDB (mongomock) behind the shared ``db`` connection.
+
+    mongomock lacks the raw batch reads and the ``$unset`` stage, so they
+    are emulated with ``find``, ``aggregate`` and ``$project``.
+    """
+    aggregate = mongomock.Collection.aggregate
+
+    def aggregate_with_unset(self, pipeline, *args, **kwargs):
+        pipeline = [
+            {'$project': {field: 0 for field in _as_list(stage['$unset'])}} if '$unset' in stage else stage
+            for stage in pipeline
+        ]
+        return aggregate(self, pipeline, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.Collection, 'aggregate', aggregate_with_unset)
+    monkeypatch.setattr(mongomock.Collection, 'find_raw_batches',
+                        lambda self, *args, batch_size=101, **kwargs:
+                        raw_batches(self.find(*args, **kwargs), batch_size),)
+    monkeypatch.setattr(mongomock.Collection, 'aggregate_raw_batches',
+                        lambda self, pipeline, batchSize=101, **kwargs:
+                        raw_batches(self.aggregate(pipeline, **kwargs), batchSize),)
+    database = mongomock.MongoClient().get_database('ubereats_test')
+    monkeypatch.setattr(db, 'db', database)
+    return database
+
+class AsyncCursor:
+    """Motor cursor over a mongomock cursor"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, name):
+        # sort/skip/limit chain on the wrapped cursor
+        method = getattr(self.cursor, name)
+        return lambda *args, **kwargs: AsyncCursor(method(*args, **kwargs))
+
+    async def to_list(self, length):
+        documents = list(self.cursor)
+        return documents[:length] if length else documents
+
+class AsyncCollection:
+    """Motor collection over a mongomock collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs):
+        return AsyncCursor(self.collection.aggregate(pipeline, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+class AsyncDatabase:
+    def __init__(self, database):
+        self.database = database
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.database[name])
+
+    __getattr__ = __getitem__
+
+@pytest.fixture
+def mock_async_db(mock_db, monkeypatch):
+    """``mock_db`` behind the shared ``async_db`` connection as well."""
+    monkeypatch.setattr(async_db, 'db', AsyncDatabase(mock_db))
+    return mock_db
+
+@pytest.fixture
+def spy(monkeypatch):
+    """Record the calls of a method: ``calls = spy(mock_db.users, 'find')``.
+
+    Arguments are copied, as mongomock adds ``_id`` to projections in place.
+    """
+    def spy_on(target, name):
+        calls, method = [], getattr(target, name)
+
+        def record(*args, **kwargs):
+            calls.append(copy.deepcopy(args))
+            return method(*args, **kwargs)
+        monkeypatch.setattr(target, name, record)
+        return calls
+    return spy_on
+
+@pytest.fixture
+def bearer(mock_db):
+    """Insert a user and return its id with the headers of a token ``AuthService`` issued for it."""
+    def issue(role='customer', **fields):
+        user_id = ObjectId()
+        mock_db.users.insert_one({
+            '_id': user_id, 'email': f'{user_id}@example.com', 'password_hash': 'x',
+            'first_name': 'Test', 'last_name': 'User', 'role': role, 'is_active': True, **fields
+        })
+        token = auth_service.generate_token(User.get_by_id(user_id))
+        return str(user_id), {'Authorization': f'Bearer {token}'}
+    return issue
+
 @pytest.fixture
 def test_user_data():
     """Sample user data for testing."""
@@ -0,0 +1,121 @@
+import asyncio
+
+from bson import ObjectId
+from quart import Quart, jsonify
+from werkzeug.datastructures import MultiDict
+
+from controllers.grocery_controller import products_pipeline, stores_query, next_products_cursor
+from utils.json_provider import OrjsonProvider
+
+
+def test_store_query_is_shared_by_both_stacks():
+    """Test the store query helper builds the filter used by both stacks"""
+    query, projection, search = stores_query(MultiDict({'category': 'dairy', 'search': 'milk'}))
+
+    assert query == {'categories': 'dairy', '$text': {'$search': 'milk'}}
+    assert projection['score'] == {'$meta': 'textScore'}
+    assert search
+
+
+def test_products_pipeline_pages_by_id():
+    """Test product pages continue after the cursor id"""
+    cursor = ObjectId()
+    pipeline = products_pipeline('s1', MultiDict({'cursor': str(cursor), 'limit': '2'}))
+
+    assert pipeline[0] == {'$match': {'store_id': 's1', '_id': {'$gt': cursor}}}
+    assert {'$limit': 2} in pipeline
+    products = [{'id': ObjectId()}, {'id': ObjectId()}]
+    assert next_products_cursor(MultiDict({'limit': '2'}), products) == str(products[-1]['id'])
+    assert next_products_cursor(MultiDict({'limit': '3'}), products) is None
+
+
+def test_quart_app_encodes_documents_with_orjson():
+    """Test the Quart app encodes Mongo documents with the orjson provider"""
+    app = Quart(__name__)
+    app.json = OrjsonProvider(app)
+    order_id = ObjectId()
+
+    @app.route('/order')
+    async def order():
+        return jsonify({'_id': order_id, 'total': 12.5})
+
+    async def fetch():
+        response = await app.test_client().get('/order')
+        return response.mimetype, await response.get_json()
+
+    mimetype, body = asyncio.run(fetch())
+
+    assert mimetype == 'application/json'
+    assert body == {'_id': str(order_id), 'total': 12.5}
+
+
+def test_async_nearby_marks_the_callers_likes(mock_async_db, bearer, spy, monkeypatch):
+    """Test the async nearby search adds isLiked per caller on shared cached cards"""
+    import controllers.async_restaurant_controller as async_restaurant_controller
+    from controllers.restaurant_controller import nearby_cache
+    from services.like_service import LikeService
+
+    (user_id, headers), liked, other = bearer(), ObjectId(), ObjectId()
+    cards = mock_async_db.restaurant_cards
+    cards.insert_many([
+        {'id': str(r), 'name': 'R', 'cursor_distance': 10.0, 'coordinates': [-73.9, 40.7]} for r in (liked, other)
+    ])
+    mock_async_db.restaurant_likes.insert_one({'user_id': ObjectId(user_id), 'restaurant_id': liked})
+    # mongomock has no $geoNear: serve every card in insertion order
+    find = cards.find
+    monkeypatch.setattr(cards, 'aggregate', lambda pipeline: find({}, {'_id': 0}))
+    queries = spy(mock_async_db.restaurant_likes, 'find')
+    nearby_cache.clear()
+    LikeService.liked_ids.invalidate(user_id)
+    app = Quart(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(async_restaurant_controller.async_restaurant, url_prefix='/api/restaurants')
+
+    async def fetch(headers):
+        response = await app.test_client().get('/api/restaurants/nearby?lat=40.7&lng=-73.9', headers=headers)
+        return [card['isLiked'] for card in (await response.get_json())['restaurants']]
+
+    assert asyncio.run(fetch(headers)) == [True, False]
+    assert asyncio.run(fetch(headers)) == [True, False]
+    assert asyncio.run(fetch({})) == [False, False]
+    assert len(queries) == 1
+
+
+def test_async_order_routes_accept_issued_tokens(mock_async_db, bearer):
+    """Test the async order routes verify tokens with the same secret as the rest of the app"""
+    from routes.async_order import async_order
+
+    user_id, headers = bearer()
+    order_id = mock_async_db.orders.insert_one({'user_id': user_id, 'restaurant_id': 'r1'}).inserted_id
+    app = Quart(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(async_order, url_prefix='/api')
+
+    async def fetch(headers):
+        response = await app.test_client().get(f'/api/orders/{order_id}', headers=headers)
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(fetch(headers))
+    assert (status, body['user_id']) == (200, user_id)
+    assert asyncio.run(fetch({'Authorization': 'Bearer nope'}))[0] == 401
+
+
+def test_async_order_listing_scopes_owners_to_their_restaurants(mock_async_db, bearer):
+    """Test owners list only the orders of restaurants they own on the async stack"""
+    from routes.async_order import async_order
+
+    owner_id, headers = bearer('restaurant_owner')
+    owned = str(mock_async_db.restaurants.insert_one({'owner_id': owner_id}).inserted_id)
+    mock_async_db.orders.insert_many([
+        {'user_id': 'u1', 'restaurant_id': owned, 'created_at': 1},
+        {'user_id': 'u1', 'restaurant_id': 'elsewhere', 'created_at': 2},
+    ])
+    app = Quart(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(async_order, url_prefix='/api')
+
+    async def fetch():
+        response = await app.test_client().get('/api/orders', headers=headers)
+        return [o['restaurant_id'] for o in await response.get_json()]
+
+    assert asyncio.run(fetch()) == [owned]
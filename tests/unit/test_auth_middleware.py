@@ -0,0 +1,28 @@
+import jwt
+from flask import Flask, jsonify
+
+from middleware.auth import token_required, user_id_from_authorization
+
+
+def test_issued_tokens_identify_the_caller(bearer):
+    """Test optional identification accepts tokens issued at login and rejects other signatures"""
+    user_id, headers = bearer()
+    forged = jwt.encode({'user_id': user_id}, 'another-secret', algorithm='HS256')
+
+    assert user_id_from_authorization(headers['Authorization']) == user_id
+    assert user_id_from_authorization(f'Bearer {forged}') is None
+    assert user_id_from_authorization(None) is None
+
+
+def test_token_required_accepts_issued_tokens(bearer):
+    """Test protected routes load the user of a token issued at login"""
+    user_id, headers = bearer()
+    app = Flask(__name__)
+
+    @app.route('/me')
+    @token_required
+    def me(current_user):
+        return jsonify({'id': str(current_user['_id'])})
+
+    assert app.test_client().get('/me', headers=headers).get_json() == {'id': user_id}
+    assert app.test_client().get('/me', headers={'Authorization': 'Bearer nope'}).status_code == 401
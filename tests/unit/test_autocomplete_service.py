@@ -0,0 +1,67 @@
+from services.autocomplete_service import AutocompleteIndex, normalize
+
+ROWS = [
+    ('restaurant', 'r1', None, 'Burger Palace', 4.5),
+    ('restaurant', 'r2', None, 'Crème Brûlée Café', 4.8),
+    ('menu_item', 'm1', 'r1', 'Classic Burger', 0.0),
+    ('menu_item', 'm2', 'r1', 'Cheeseburger Deluxe', 1.0),
+    ('grocery_product', 'g1', 's1', 'Organic Honey', 0.0),
+]
+
+def build_index(rows=ROWS):
+    index = AutocompleteIndex()
+    index.build(list(rows))
+    return index
+
+def test_normalize_strips_accents_and_punctuation():
+    """Test normalization folds accents, case and punctuation."""
+    assert normalize('Crème Brûlée-Café!') == 'creme brulee cafe'
+
+def test_word_prefix_match():
+    """Test word-start matches rank above infix matches."""
+    labels = [s['label'] for s in build_index().suggest('burg')]
+    assert labels == ['Burger Palace', 'Classic Burger', 'Cheeseburger Deluxe']
+
+def test_infix_match_via_trigrams():
+    """Test matches inside a word are found through trigrams."""
+    labels = [s['label'] for s in build_index().suggest('eseburg')]
+    assert labels == ['Cheeseburger Deluxe']
+
+def test_short_prefix_ranked_by_score():
+    """Test single character queries return the best-scored entries."""
+    results = build_index().suggest('c', limit=2)
+    assert [s['id'] for s in results] == ['r2', 'm2']
+
+def test_type_filter_and_parent():
+    """Test results can be restricted by type and carry their parent id."""
+    results = build_index().suggest('burger', kinds=['menu_item'])
+    assert {s['id'] for s in results} == {'m1', 'm2'}
+    assert all(s['parent_id'] == 'r1' for s in results)
+
+def test_incremental_upsert_and_remove():
+    """Test updates replace old labels and removals hide entries."""
+    index = build_index()
+    index.upsert('menu_item', 'm1', 'r1', 'Smash Burger', 0.0)
+    index.remove('grocery_product', 'g1')
+    assert [s['label'] for s in index.suggest('smash')] == ['Smash Burger']
+    assert index.suggest('classic') == []
+    assert index.suggest('honey') == []
+    assert len(index) == 4
+
+def test_memory_bound_keeps_best_scored():
+    """Test the index keeps only the highest-scored entries when over capacity."""
+    index = AutocompleteIndex(max_entries=2)
+    index.build(list(ROWS))
+    assert {s['id'] for s in index.suggest('b')} | {s['id'] for s in index.suggest('c')} == {'r1', 'r2'}
+
+def test_reconcile_drops_deleted_and_hidden_documents(mock_db):
+    """Test reconciliation removes entries whose documents are gone or no longer live."""
+    from services.autocomplete_service import AutocompleteService
+    mock_db.restaurant_cards.insert_one({'_id': 'r1', 'is_active': True})
+    mock_db.menu_items.insert_many([{'_id': 'm1', 'is_available': True}, {'_id': 'm2', 'is_available': False}])
+    service = AutocompleteService()
+    service.index = build_index()
+
+    assert service.reconcile() == 3
+    assert {s['id'] for s in service.suggest('c')} == {'m1'}
+    assert service.suggest('burger palace') == [{'type': 'restaurant', 'id': 'r1', 'label': 'Burger Palace'}]
@@ -0,0 +1,49 @@
+from datetime import datetime
+import json
+
+import bson
+from bson import ObjectId
+
+from utils.bson_stream import ndjson_from_batch, stream_raw_batches
+
+
+def make_batch(docs):
+    return b''.join(bson.encode(doc) for doc in docs)
+
+
+def test_ndjson_from_batch_one_line_per_document():
+    """Test a BSON batch becomes one NDJSON line per document"""
+    ids = [ObjectId() for _ in range(3)]
+    batch = make_batch([
+        {'_id': oid, 'n': i, 'at': datetime(2024, 1, 1), 'tags': ['a']} for i, oid in enumerate(ids)
+    ])
+
+    lines = ndjson_from_batch(batch).splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {'_id': str(oid), 'n': i, 'at': '2024-01-01T00:00:00+00:00', 'tags': ['a']}
+        for i, oid in enumerate(ids)
+    ]
+
+
+def test_bson_format_passes_batches_through():
+    """Test the bson format passes batch bytes through untouched"""
+    batches = [make_batch([{'n': 1}, {'n': 2}]), make_batch([{'n': 3}])]
+
+    body = b''.join(stream_raw_batches(iter(batches), 'bson'))
+
+    assert body == b''.join(batches)
+    assert [doc['n'] for doc in bson.decode_all(body)] == [1, 2, 3]
+
+
+def test_stream_closes_cursor():
+    """Test streaming closes the underlying cursor"""
+    class Cursor(list):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    cursor = Cursor([make_batch([{'n': 1}])])
+    list(stream_raw_batches(cursor))
+    assert cursor.closed
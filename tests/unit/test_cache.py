@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+from utils.cache import MemoryBackend, TTLCache, TwoTierCache, cached
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    """Test TTLCache expires entries and evicts the least recently used"""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    cache.set('c', 3, ttl=-1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') is None
+
+
+def test_workers_share_backend_and_invalidate_each_other():
+    """Test workers share loaded values and evict each other on invalidate"""
+    backend = MemoryBackend()
+    worker_a = TwoTierCache('menus', backend=backend)
+    worker_b = TwoTierCache('menus', backend=backend)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {'version': len(loads)}
+
+    assert worker_a.get_or_load('r1', loader) == {'version': 1}
+    assert worker_b.get_or_load('r1', loader) == {'version': 1}
+    assert worker_b.stats['shared_hits'] == 1
+
+    worker_a.invalidate('r1')
+    assert len(worker_b.local) == 0
+    assert worker_b.get_or_load('r1', loader) == {'version': 2}
+
+
+def test_concurrent_misses_load_once():
+    """Test concurrent misses for one key run the loader once"""
+    cache = TwoTierCache('slow', backend=MemoryBackend())
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 10
+    assert len(calls) == 1
+    assert cache.metrics()['coalesced'] == 9
+
+
+def test_cached_decorator():
+    """Test the cached decorator memoizes by arguments and invalidates"""
+    calls = []
+
+    @cached('decorated')
+    def load(restaurant_id):
+        calls.append(restaurant_id)
+        return restaurant_id.upper()
+
+    assert load('r1') == 'R1'
+    assert load('r1') == 'R1'
+    load.invalidate('r1')
+    assert load('r1') == 'R1'
+    assert calls == ['r1', 'r1']
+    assert load.cache().metrics()['local_hits'] == 1
+
+
+def test_set_writes_through_and_evicts_other_workers():
+    """Test set writes through to the shared tier and evicts other workers"""
+    backend = MemoryBackend()
+    worker_a = TwoTierCache('likes', backend=backend)
+    worker_b = TwoTierCache('likes', backend=backend)
+    worker_b.get_or_load('u1', lambda: {'r1'})
+
+    worker_a.set('u1', {'r1', 'r2'})
+
+    assert worker_a.local.get('u1') == {'r1', 'r2'}
+    assert worker_b.get_or_load('u1', lambda: set()) == {'r1', 'r2'}
+    assert worker_b.stats['shared_hits'] == 1
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    """Test a load invalidated while in flight is returned but not cached in either tier"""
+    backend = MemoryBackend()
+    worker_a = TwoTierCache('likes', backend=backend)
+    worker_b = TwoTierCache('likes', backend=backend)
+    versions = iter([{'stale'}, {'fresh'}])
+
+    def loader():
+        value = next(versions)
+        if value == {'stale'}:
+            worker_b.invalidate('u1')  # a write lands after the read
+        return value
+
+    assert worker_a.get_or_load('u1', loader) == {'stale'}
+    assert worker_a.stats['stale_loads'] == 1
+    assert worker_a.get_or_load('u1', loader) == {'fresh'}
+    assert worker_b.get_or_load('u1', lambda: set()) == {'fresh'}
+
+
+def test_async_loads_share_both_tiers_and_respect_invalidation():
+    """Test async loads fill the same tiers as sync loads unless invalidated mid-load"""
+    backend = MemoryBackend()
+    worker_a = TwoTierCache('async', backend=backend)
+    worker_b = TwoTierCache('async', backend=backend)
+
+    async def stale():
+        worker_b.invalidate('k')
+        return 'stale'
+
+    async def fresh():
+        return 'fresh'
+
+    assert asyncio.run(worker_a.get_or_load_async('k', stale)) == 'stale'
+    assert asyncio.run(worker_a.get_or_load_async('k', fresh)) == 'fresh'
+    assert worker_b.get_or_load('k', lambda: 'unused') == 'fresh'
+    assert worker_a.metrics()['stale_loads'] == 1
+
+
+def test_clear_drops_every_key_in_every_worker():
+    """Test clear invalidates all keys of a namespace in both tiers across workers"""
+    backend = MemoryBackend()
+    worker_a = TwoTierCache('owners', backend=backend)
+    worker_b = TwoTierCache('owners', backend=backend)
+    other = TwoTierCache('menus', backend=backend)
+    for key in ('u1', 'u2'):
+        worker_a.get_or_load(key, lambda: 'old')
+        worker_b.get_or_load(key, lambda: 'old')
+    other.get_or_load('u1', lambda: 'menu')
+
+    worker_a.clear()
+
+    assert len(worker_b.local) == 0
+    assert worker_b.get_or_load('u1', lambda: 'new') == 'new'
+    assert worker_a.get_or_load('u1', lambda: 'unused') == 'new'
+    assert TwoTierCache('owners', backend=backend).get_or_load('u2', lambda: 'new') == 'new'
+    assert other.get_or_load('u1', lambda: 'unused') == 'menu'
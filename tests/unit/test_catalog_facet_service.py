@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+import controllers.grocery_controller as grocery_controller
+import utils.http_cache as http_cache
+from services.catalog_facet_service import MAX_AGE_SECONDS, CatalogFacetService
+from services.change_watcher import NO_PRE_IMAGE, ChangeWatcher, register_cache_handlers
+from utils.cache import MemoryBackend
+from utils.json_provider import OrjsonProvider
+
+
+@pytest.fixture
+def catalog(mock_db):
+    http_cache._versions.clear()
+    http_cache._bodies.clear()
+    return mock_db
+
+
+def versions(database):
+    return {v['_id']: v['version'] for v in database.collection_versions.find()}
+
+
+def product(category='dairy', price=3.0, **fields):
+    return {'store_id': 's1', 'category': category, 'price': price, **fields}
+
+
+def test_compute_counts_products_without_in_stock_as_in_stock(catalog):
+    """Test computed facets treat a missing in_stock field as in stock"""
+    catalog.grocery_products.insert_many([product(), product(in_stock=False), product('bakery', 12.0, in_stock=True)])
+
+    facets = CatalogFacetService.compute('s1')
+
+    assert (facets['total'], facets['in_stock']) == (3, 2)
+    assert facets['categories'] == {'dairy': {'count': 2, 'in_stock': 1}, 'bakery': {'count': 1, 'in_stock': 1}}
+    assert facets['price_buckets'] == {'2-5': 2, '10-20': 1}
+
+
+def test_deltas_match_compute():
+    """Test a product's deltas count in_stock the way compute does"""
+    assert CatalogFacetService._deltas(product(), 1) == {
+        'total': 1, 'in_stock': 1,
+        'categories.dairy.count': 1, 'categories.dairy.in_stock': 1,
+        'price_buckets.2-5': 1
+    }
+    assert CatalogFacetService._deltas(product(in_stock=False), -1)['in_stock'] == 0
+
+
+def test_applied_changes_agree_with_a_recompute(catalog):
+    """Test inserts, updates and deletes keep materialized facets equal to a fresh compute"""
+    products = catalog.grocery_products
+    products.insert_many([product(), product('bakery', 12.0)])
+    CatalogFacetService.refresh('s1')
+    moved, added = products.find_one({'category': 'bakery'}), product(price=60.0, in_stock=False)
+
+    products.insert_one(added)
+    CatalogFacetService.apply_product_change(None, added)
+    updated = dict(moved, category='dairy', price=4.0)
+    products.replace_one({'_id': moved['_id']}, updated)
+    CatalogFacetService.apply_product_change(moved, updated)
+    products.delete_one({'_id': added['_id']})
+    CatalogFacetService.apply_product_change(added, None)
+
+    stored, fresh = catalog.store_catalog_facets.find_one({'_id': 's1'}), CatalogFacetService.compute('s1')
+    assert (stored['total'], stored['in_stock']) == (fresh['total'], fresh['in_stock'])
+    assert {c: v for c, v in stored['categories'].items() if v['count']} == fresh['categories']
+    assert {b: n for b, n in stored['price_buckets'].items() if n} == fresh['price_buckets']
+    assert versions(catalog)['grocery_products'] == 3
+
+
+def test_watcher_applies_product_writes(catalog):
+    """Test product changes from the change watcher update facets and bump the catalog version"""
+    catalog.grocery_products.insert_one(product())
+    CatalogFacetService.refresh('s1')
+    watcher = register_cache_handlers(ChangeWatcher(backend=MemoryBackend()))
+    added = product('bakery', 1.0)
+    catalog.grocery_products.insert_one(added)
+
+    watcher.dispatch('grocery_products', 2, added, before=None, event_id='insert-2')
+    watcher.dispatch('grocery_products', 2, added, before=None, event_id='insert-2')  # already applied
+
+    facets = catalog.store_catalog_facets.find_one({'_id': 's1'})
+    assert facets['total'] == 2
+    assert facets['categories']['bakery'] == {'count': 1, 'in_stock': 1}
+
+    # Without a pre-image (polling) the store is recounted
+    polled = product()
+    catalog.grocery_products.insert_one(polled)
+    watcher.dispatch('grocery_products', 3, polled, before=NO_PRE_IMAGE, event_id='poll-3')
+
+    assert catalog.store_catalog_facets.find_one({'_id': 's1'})['total'] == 3
+    assert versions(catalog)['grocery_products'] == 3
+
+
+def test_unattributed_deletes_drop_the_materialized_facets(catalog):
+    """Test a product delete without a pre-image drops the facets so they are recounted"""
+    removed = product()
+    catalog.grocery_products.insert_many([removed, product('bakery', 1.0)])
+    CatalogFacetService.refresh('s1')
+    watcher = register_cache_handlers(ChangeWatcher(backend=MemoryBackend()))
+    catalog.grocery_products.delete_one({'_id': removed['_id']})
+
+    watcher.dispatch('grocery_products', removed['_id'], None, before=NO_PRE_IMAGE, event_id='delete-1')
+
+    assert catalog.store_catalog_facets.count_documents({}) == 0
+    assert CatalogFacetService.get('s1')['total'] == 1
+    assert versions(catalog)['grocery_products'] == 2
+
+
+def test_stale_facets_are_recomputed_on_read(catalog):
+    """Test facets older than the maximum age are recomputed, catching deletes polling never sees"""
+    catalog.grocery_products.insert_many([product(), product('bakery', 1.0)])
+    CatalogFacetService.refresh('s1')
+    catalog.grocery_products.delete_one({'category': 'bakery'})
+
+    assert CatalogFacetService.get('s1')['total'] == 2
+
+    catalog.store_catalog_facets.update_one(
+        {'_id': 's1'}, {'$set': {'computed_at': datetime.utcnow() - timedelta(seconds=MAX_AGE_SECONDS + 1)}}
+    )
+    assert CatalogFacetService.get('s1')['total'] == 1
+
+
+def test_catalog_endpoint_serves_facets_with_etag(catalog):
+    """Test the catalog endpoint lists non-empty facets and revalidates with its ETag"""
+    catalog.grocery_products.insert_many([product(), product('bakery', 12.0, in_stock=False)])
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(grocery_controller.grocery, url_prefix='/api/grocery')
+    client = app.test_client()
+
+    response = client.get('/api/grocery/stores/s1/catalog')
+    body = response.get_json()
+
+    assert (body['total'], body['in_stock']) == (2, 1)
+    assert {c['id']: c['count'] for c in body['categories']} == {'dairy': 1, 'bakery': 1}
+    assert body['price_buckets'] == {'2-5': 1, '10-20': 1}
+    assert client.get('/api/grocery/stores/s1/catalog',
+                      headers={'If-None-Match': response.headers['ETag']}).status_code == 304
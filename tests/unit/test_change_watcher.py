@@ -0,0 +1,185 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+import services.change_watcher as change_watcher
+from services.change_watcher import ChangeWatcher
+from utils.cache import MemoryBackend
+
+
+def recorder(calls):
+    def handler(document_id, document):
+        calls.append((document_id, document))
+    return handler
+
+
+def test_updates_only_reach_handlers_of_touched_fields():
+    """Test updates only reach handlers subscribed to a touched field"""
+    watcher, card_calls, any_calls = ChangeWatcher(backend=MemoryBackend()), [], []
+    watcher.subscribe('restaurants', recorder(card_calls), fields=['rating', 'address'])
+    watcher.subscribe('restaurants', recorder(any_calls))
+
+    watcher.dispatch('restaurants', 1, {}, updated_fields=['active_orders'])
+    watcher.dispatch('restaurants', 2, {}, updated_fields=['address.location.coordinates'])
+    watcher.dispatch('restaurants', 3, None)
+
+    assert [call[0] for call in card_calls] == [2, 3]
+    assert [call[0] for call in any_calls] == [1, 2, 3]
+
+
+def test_once_handlers_run_in_one_worker_per_change():
+    """Test once handlers run in a single worker per change"""
+    backend, calls = MemoryBackend(), []
+    workers = [ChangeWatcher(backend=backend) for _ in range(3)]
+    for worker in workers:
+        worker.subscribe('restaurants', recorder(calls), once=True)
+
+    for worker in workers:
+        worker.dispatch('restaurants', 1, {}, event_id='token-1')
+        worker.dispatch('restaurants', 1, {}, event_id='token-2')
+
+    assert len(calls) == 2
+
+
+def test_change_stream_events_are_translated():
+    """Test change stream updates and deletes are dispatched as documents"""
+    watcher, calls = ChangeWatcher(backend=MemoryBackend()), []
+    watcher.subscribe('tax_rules', recorder(calls), keys=['restaurant_id'])
+    rule_id = ObjectId()
+
+    watcher._dispatch_change({
+        '_id': {'_data': 'abc'},
+        'operationType': 'update',
+        'ns': {'db': 'ubereats', 'coll': 'tax_rules'},
+        'documentKey': {'_id': rule_id},
+        'updateDescription': {'updatedFields': {'rate': 8.5}, 'removedFields': []},
+        'fullDocument': {'_id': rule_id, 'restaurant_id': 'r1', 'rate': 8.5}
+    })
+    watcher._dispatch_change({
+        '_id': {'_data': 'abd'},
+        'operationType': 'delete',
+        'ns': {'db': 'ubereats', 'coll': 'tax_rules'},
+        'documentKey': {'_id': rule_id}
+    })
+
+    assert calls == [(rule_id, {'_id': rule_id, 'restaurant_id': 'r1', 'rate': 8.5}), (rule_id, None)]
+
+
+def test_polling_dispatches_documents_updated_since_the_last_poll(mock_db, spy):
+    """Test polling dispatches documents updated since the previous poll"""
+    queries = spy(mock_db.tax_rules, 'find')
+    watcher, calls = ChangeWatcher(backend=MemoryBackend()), []
+    watcher.subscribe('tax_rules', recorder(calls), keys=['restaurant_id'])
+
+    watcher.poll()
+    mock_db.tax_rules.insert_one({'_id': 1, 'restaurant_id': 'r1', 'updated_at': datetime.utcnow()})
+    watcher.poll()
+
+    assert [call[0] for call in calls] == [1]
+    assert queries[0][1] == {'restaurant_id': 1, 'updated_at': 1}
+
+
+def test_pre_image_handlers_get_the_exact_before_and_after():
+    """Test pre-image handlers see each update's own post-image, not the looked-up document"""
+    watcher, calls = ChangeWatcher(backend=MemoryBackend()), []
+    watcher.subscribe('grocery_products', lambda _, after, before: calls.append((before, after)), pre_image=True)
+    before = {'_id': 1, 'store_id': 's1', 'price': 3.0, 'in_stock': True}
+
+    watcher._dispatch_change({
+        '_id': {'_data': 'abc'},
+        'operationType': 'update',
+        'ns': {'db': 'ubereats', 'coll': 'grocery_products'},
+        'documentKey': {'_id': 1},
+        'updateDescription': {'updatedFields': {'price': 4.0, 'nutrition.kcal': 90}, 'removedFields': ['in_stock']},
+        'fullDocument': {'_id': 1, 'store_id': 's1', 'price': 9.0},
+        'fullDocumentBeforeChange': before
+    })
+    watcher._dispatch_change({
+        '_id': {'_data': 'abd'},
+        'operationType': 'delete',
+        'ns': {'db': 'ubereats', 'coll': 'grocery_products'},
+        'documentKey': {'_id': 1}
+    })
+    watcher.dispatch('grocery_products', 1, {'_id': 1, 'store_id': 's1'})
+
+    assert calls == [
+        (before, {'_id': 1, 'store_id': 's1', 'price': 4.0}),
+        (change_watcher.NO_PRE_IMAGE, None),
+        (change_watcher.NO_PRE_IMAGE, {'_id': 1, 'store_id': 's1'})
+    ]
+
+
+def test_lost_history_resets_caches_and_restarts_from_now(monkeypatch):
+    """Test an unresumable stream drops the resume token and runs the reset handlers"""
+    from pymongo.errors import OperationFailure
+
+    watcher, resets, tokens = ChangeWatcher(poll_interval=0, backend=MemoryBackend()), [], []
+    watcher._resume_token = {'_data': 'old'}
+    watcher.on_reset(lambda: resets.append(1))
+
+    def watch():
+        tokens.append(watcher._resume_token)
+        if len(tokens) == 1:
+            raise OperationFailure('Resume of change stream was not possible', code=286)
+        watcher.stop()
+
+    monkeypatch.setattr(watcher, 'watch', watch)
+    watcher.run()
+
+    assert tokens == [{'_data': 'old'}, None]
+    assert resets == [1]
+
+
+def test_like_deletes_invalidate_the_user_from_the_pre_image(monkeypatch):
+    """Test a deleted like invalidates the liked ids of the user in its pre-image"""
+    from services.like_service import LikeService
+
+    invalidated = []
+    monkeypatch.setattr(LikeService, 'invalidate', staticmethod(invalidated.append))
+    watcher = change_watcher.register_cache_handlers(ChangeWatcher(backend=MemoryBackend()))
+    user_id = ObjectId()
+
+    watcher._dispatch_change({
+        '_id': {'_data': 'abc'},
+        'operationType': 'delete',
+        'ns': {'db': 'ubereats', 'coll': 'restaurant_likes'},
+        'documentKey': {'_id': 1},
+        'fullDocumentBeforeChange': {'_id': 1, 'user_id': user_id, 'restaurant_id': ObjectId()}
+    })
+    watcher.dispatch('restaurant_likes', 2, None)
+
+    assert invalidated == [user_id]
+
+
+def test_owner_changes_invalidate_the_previous_and_new_owner(monkeypatch):
+    """Test an owner handover invalidates both owners, and clears all owners without a pre-image"""
+    from services.notification_service import NotificationService
+
+    invalidated, cleared = [], []
+    monkeypatch.setattr(NotificationService.owned_restaurants, 'invalidate', invalidated.append)
+    monkeypatch.setattr(NotificationService.owned_restaurants, 'clear', lambda: cleared.append(1))
+    watcher = change_watcher.register_cache_handlers(ChangeWatcher(backend=MemoryBackend()))
+    previous, new = str(ObjectId()), str(ObjectId())
+
+    watcher._dispatch_change({
+        '_id': {'_data': 'abc'},
+        'operationType': 'update',
+        'ns': {'db': 'ubereats', 'coll': 'restaurants'},
+        'documentKey': {'_id': 1},
+        'updateDescription': {'updatedFields': {'owner_id': new}, 'removedFields': []},
+        'fullDocument': {'_id': 1, 'owner_id': new},
+        'fullDocumentBeforeChange': {'_id': 1, 'owner_id': previous}
+    })
+    assert invalidated == [new, previous]
+    assert cleared == []
+
+    watcher._dispatch_change({
+        '_id': {'_data': 'abd'},
+        'operationType': 'update',
+        'ns': {'db': 'ubereats', 'coll': 'restaurants'},
+        'documentKey': {'_id': 1},
+        'updateDescription': {'updatedFields': {'owner_id': previous}, 'removedFields': []},
+        'fullDocument': {'_id': 1, 'owner_id': previous}
+    })
+    assert invalidated == [new, previous]
+    assert cleared == [1]
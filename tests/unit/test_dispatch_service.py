@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from services.dispatch_service import haversine_km, solve_assignment, MAX_PICKUP_KM
+
+def test_haversine_known_distance():
+    """Test distance between two Manhattan landmarks."""
+    # Times Square -> Union Square is roughly 2.5 km
+    distance = haversine_km(40.7580, -73.9855, 40.7359, -73.9911)
+    assert distance == pytest.approx(2.5, abs=0.1)
+
+def test_assigns_nearest_driver():
+    """Test each order gets the closest free driver."""
+    pickups = np.array([[40.0, -73.0], [40.1, -73.0]])
+    drivers = np.array([[40.1, -73.001], [40.0, -73.001]])
+    result = solve_assignment(pickups, drivers, np.zeros(2), np.zeros(2))
+    assert sorted((o, d) for o, d, _ in result) == [(0, 1), (1, 0)]
+
+def test_no_driver_assigned_twice():
+    """Test more orders than drivers leaves the surplus unassigned."""
+    rng = np.random.default_rng(1)
+    pickups = 40.7 + rng.random((50, 2)) * 0.01
+    drivers = 40.7 + rng.random((10, 2)) * 0.01
+    result = solve_assignment(pickups, drivers, np.zeros(50), np.zeros(50))
+    assert len(result) == 10
+    assert len({d for _, d, _ in result}) == 10
+    assert len({o for o, _, _ in result}) == 10
+
+def test_out_of_range_driver_not_assigned():
+    """Test drivers beyond the pickup radius are ignored."""
+    pickups = np.array([[40.0, -73.0]])
+    far = MAX_PICKUP_KM / 111.0 + 0.1
+    drivers = np.array([[40.0 + far, -73.0]])
+    assert solve_assignment(pickups, drivers, np.zeros(1), np.zeros(1)) == []
+
+def test_pickup_eta_waits_for_food():
+    """Test pickup ETA is never earlier than the food is ready."""
+    pickups = np.array([[40.0, -73.0]])
+    drivers = np.array([[40.0, -73.0]])
+    [(_, _, eta)] = solve_assignment(pickups, drivers, np.array([12.0]), np.zeros(1))
+    assert eta == pytest.approx(12.0)
+
+
+def dispatch_fixture(mock_db, orders, drivers=1):
+    import services.dispatch_service as dispatch_service
+    from bson import ObjectId
+
+    restaurant_id = ObjectId()
+    mock_db.restaurants.insert_one({'_id': restaurant_id, 'address': {'location': {'coordinates': [-73.0, 40.0]}}})
+    driver_ids = mock_db.users.insert_many([
+        {'role': 'delivery_driver', 'is_available': True, 'current_location': {'coordinates': [-73.001, 40.0]}}
+        for _ in range(drivers)
+    ]).inserted_ids
+    for order in orders:
+        order.update({'restaurant_id': str(restaurant_id), 'status': 'ready'})
+    mock_db.orders.insert_many(orders)
+    return dispatch_service.DispatchService, driver_ids
+
+
+def assignment_events(mock_db):
+    """(order_id, driver_id) of the driver_assigned events waiting in the outbox"""
+    return [
+        (order['_id'], event['driver_id'])
+        for order in mock_db.orders.find()
+        for event in order.get('pending_events', [])
+        if event.get('status') == 'driver_assigned'
+    ]
+
+
+def test_malformed_orders_are_skipped(mock_db):
+    """Test orders without a drop-off point or preparation time do not abort the cycle."""
+    orders = [
+        {'delivery_info': {'driver_id': None}, 'estimated_preparation_time': None},
+        {'delivery_info': {'driver_id': None, 'latitude': 40.01, 'longitude': -73.0},
+         'estimated_preparation_time': None},
+    ]
+    service, [driver_id] = dispatch_fixture(mock_db, orders)
+
+    assert service.run_cycle() == 1
+    assert assignment_events(mock_db) == [(orders[1]['_id'], str(driver_id))]
+    assert mock_db.users.find_one({'_id': driver_id})['current_order_id'] == str(orders[1]['_id'])
+
+
+def test_batches_are_written_with_one_bulk_write_per_collection(mock_db, spy):
+    """Test a batch claims its drivers and assigns its orders in one bulk write each."""
+    orders = [{'delivery_info': {'driver_id': None, 'latitude': 40.01, 'longitude': -73.0}} for _ in range(3)]
+    service, driver_ids = dispatch_fixture(mock_db, orders, drivers=3)
+    driver_writes, order_writes = spy(mock_db.users, 'bulk_write'), spy(mock_db.orders, 'bulk_write')
+
+    assert service.run_cycle() == 3
+    assert [len(ops) for ops, in driver_writes] == [3]
+    assert [len(ops) for ops, in order_writes] == [3]
+    assert {driver for _, driver in assignment_events(mock_db)} == {str(d) for d in driver_ids}
+
+
+def test_concurrently_assigned_order_releases_the_driver(mock_db, monkeypatch):
+    """Test a lost order claim leaves the driver available and un-notified."""
+    orders = [{'delivery_info': {'driver_id': None, 'latitude': 40.01, 'longitude': -73.0}}]
+    service, [driver_id] = dispatch_fixture(mock_db, orders)
+    batch = service.load_batch()
+    mock_db.orders.update_one({'_id': orders[0]['_id']}, {'$set': {'delivery_info.driver_id': 'someone-else'}})
+    monkeypatch.setattr(service, 'load_batch', staticmethod(lambda now=None: batch))
+
+    assert service.run_cycle() == 0
+    assert assignment_events(mock_db) == []
+    driver = mock_db.users.find_one({'_id': driver_id})
+    assert driver['is_available'] is True
+    assert 'current_order_id' not in driver
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from utils.fanout import fan_out
+
+
+def slow(value, delay=0.1):
+    def call():
+        time.sleep(delay)
+        return value
+    return call
+
+
+def test_results_are_returned_by_name():
+    """Test fan-out results are keyed by call name"""
+    assert fan_out({'a': slow(1, 0), 'b': slow(2, 0)}) == {'a': 1, 'b': 2}
+
+
+def test_calls_run_concurrently():
+    """Test fan-out runs every call at once, so latency is the slowest call's, not the sum"""
+    # Each call waits for all the others: run one after another, the first
+    # would break the barrier instead of returning
+    barrier = threading.Barrier(4, timeout=5)
+
+    def call(name):
+        barrier.wait()
+        return name
+
+    assert fan_out({name: (lambda name=name: call(name)) for name in 'abcd'}) == {name: name for name in 'abcd'}
+
+
+def test_failures_are_raised():
+    """Test a failing call raises from fan_out"""
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        fan_out({'ok': slow(1, 0), 'bad': fail})
+
+
+def test_timeout():
+    """Test fan_out raises TimeoutError when calls exceed the timeout"""
+    with pytest.raises(TimeoutError):
+        fan_out({'slow': slow(1, 0.5)}, timeout=0.05)
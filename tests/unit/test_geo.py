@@ -0,0 +1,13 @@
+from utils.geo import geohash_encode, geohash_bounds, geohash_center
+
+def test_geohash_encode_known_value():
+    """Test encoding against the reference geohash example."""
+    assert geohash_encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+
+def test_geohash_center_inside_bounds():
+    """Test a point's cell contains both the point and the cell centre."""
+    cell = geohash_encode(40.7580, -73.9855, 6)
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(cell)
+    assert min_lat <= 40.7580 <= max_lat
+    assert min_lng <= -73.9855 <= max_lng
+    assert geohash_encode(*geohash_center(cell), 6) == cell
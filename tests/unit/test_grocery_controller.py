@@ -0,0 +1,129 @@
+import bson
+import orjson
+from bson import ObjectId
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+import controllers.grocery_controller as grocery_controller
+import utils.http_cache as http_cache
+from utils.json_provider import OrjsonProvider
+
+
+def client(mock_db):
+    http_cache._versions.clear()
+    http_cache._bodies.clear()
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(grocery_controller.grocery, url_prefix='/api/grocery')
+    return app.test_client()
+
+
+def list_stores(mock_db, monkeypatch):
+    """Record store finds; mongomock cannot evaluate the listing's ``$_id``
+    projection or ``$text``, so both are dropped and sorts are recorded"""
+    find, queries, sorts = mock_db.grocery_stores.find, [], []
+
+    def list_without_projection(query, projection):
+        queries.append((dict(query), projection))
+        query.pop('$text', None)
+        cursor = find(query)
+        cursor.sort = lambda spec: sorts.append(spec) or cursor
+        return cursor
+
+    monkeypatch.setattr(mock_db.grocery_stores, 'find', list_without_projection)
+    return queries, sorts
+
+
+def test_store_listing_returns_every_store(mock_db, monkeypatch):
+    """Test plain store listings are not cut to the search limit"""
+    mock_db.grocery_stores.insert_many([{'name': f'Store {i}'} for i in range(grocery_controller.DEFAULT_SEARCH_LIMIT + 10)])
+    queries, sorts = list_stores(mock_db, monkeypatch)
+
+    response = client(mock_db).get('/api/grocery/stores')
+
+    assert len(response.get_json()) == grocery_controller.DEFAULT_SEARCH_LIMIT + 10
+    assert queries == [({}, grocery_controller.STORE_LIST_PROJECTION)]
+    assert sorts == []
+
+
+def test_store_search_is_ranked_and_limited(mock_db, monkeypatch):
+    """Test searches sort by relevance and apply the search limit"""
+    mock_db.grocery_stores.insert_many([{'name': f'Store {i}'} for i in range(5)])
+    queries, sorts = list_stores(mock_db, monkeypatch)
+
+    response = client(mock_db).get('/api/grocery/stores?search=fresh&limit=3')
+
+    assert len(response.get_json()) == 3
+    assert queries[0][0] == {'$text': {'$search': 'fresh'}}
+    assert queries[0][1]['score'] == {'$meta': 'textScore'}
+    assert sorts == [[('score', {'$meta': 'textScore'})]]
+
+
+def test_products_pipeline_pages_by_id():
+    """Test product listings page on _id after the cursor and stop at the page limit"""
+    cursor = ObjectId()
+    pipeline = grocery_controller.products_pipeline('s1', MultiDict({'category': 'dairy', 'cursor': str(cursor), 'limit': '20'}))
+
+    assert pipeline[:3] == [
+        {'$match': {'store_id': 's1', 'category': 'dairy', '_id': {'$gt': cursor}}},
+        {'$sort': {'_id': 1}},
+        {'$limit': 20}
+    ]
+    assert pipeline[3:] == grocery_controller.ID_AS_FIELD
+
+
+def test_products_pipeline_streams_unbounded_unless_limited():
+    """Test streamed listings drop the default page limit but keep an explicit one"""
+    unbounded = grocery_controller.products_pipeline('s1', MultiDict(), stream=True)
+    limited = grocery_controller.products_pipeline('s1', MultiDict({'limit': '5000'}), stream=True)
+
+    assert not any('$limit' in stage for stage in unbounded)
+    assert {'$limit': grocery_controller.MAX_PAGE_LIMIT} in limited
+
+
+def test_products_pipeline_ranks_searches():
+    """Test searches sort by text score with the search limit instead of paging"""
+    pipeline = grocery_controller.products_pipeline('s1', MultiDict({'search': 'milk', 'cursor': str(ObjectId())}))
+
+    assert pipeline[0] == {'$match': {'store_id': 's1', '$text': {'$search': 'milk'}}}
+    assert pipeline[1:3] == [
+        {'$sort': {'score': {'$meta': 'textScore'}}},
+        {'$limit': grocery_controller.DEFAULT_SEARCH_LIMIT}
+    ]
+
+
+def test_next_products_cursor_only_on_full_pages():
+    """Test a cursor is returned for a full page, not for short pages or searches"""
+    products = [{'id': ObjectId()} for _ in range(3)]
+
+    assert grocery_controller.next_products_cursor(MultiDict({'limit': '3'}), products) == str(products[-1]['id'])
+    assert grocery_controller.next_products_cursor(MultiDict({'limit': '4'}), products) is None
+    assert grocery_controller.next_products_cursor(MultiDict({'limit': '3', 'search': 'milk'}), products) is None
+
+
+def test_product_listing_sets_next_cursor_header(mock_db):
+    """Test a full JSON page carries the X-Next-Cursor header"""
+    products = [{'_id': ObjectId(), 'name': f'P{i}', 'store_id': 's1'} for i in range(3)]
+    mock_db.grocery_products.insert_many(products)
+
+    response = client(mock_db).get('/api/grocery/stores/s1/products?limit=2')
+
+    assert [p['name'] for p in response.get_json()] == ['P0', 'P1']
+    assert response.headers['X-Next-Cursor'] == str(products[1]['_id'])
+
+
+def test_product_listing_streams_ndjson_and_bson(mock_db):
+    """Test the ndjson and bson formats stream every product from raw batches"""
+    products = [{'_id': ObjectId(), 'name': f'P{i}', 'price': 1.5} for i in range(3)]
+    mock_db.grocery_products.insert_many([dict(p, store_id='s1') for p in products])
+    test_client = client(mock_db)
+
+    ndjson = test_client.get('/api/grocery/stores/s1/products?format=ndjson')
+    assert ndjson.mimetype == 'application/x-ndjson'
+    assert [orjson.loads(line) for line in ndjson.data.splitlines()] == [
+        {'name': p['name'], 'price': 1.5, 'store_id': 's1', 'id': str(p['_id'])} for p in products
+    ]
+
+    raw = test_client.get('/api/grocery/stores/s1/products?format=bson')
+    assert raw.mimetype == 'application/bson'
+    assert [d['id'] for d in bson.decode_all(raw.data)] == [p['_id'] for p in products]
@@ -0,0 +1,104 @@
+from flask import Flask, jsonify
+
+import utils.http_cache as http_cache
+from services.change_watcher import ChangeWatcher, register_cache_handlers
+from utils.cache import MemoryBackend
+from utils.http_cache import bump_version, cached_response, collection_versions
+
+
+def versions(database):
+    return {v['_id']: v['version'] for v in database.collection_versions.find()}
+
+
+def make_app(mock_db, spy):
+    reads = spy(mock_db.collection_versions, 'find')
+    http_cache._versions.clear()
+    http_cache._bodies.clear()
+    renders = []
+    app = Flask(__name__)
+
+    @app.route('/stores')
+    @cached_response(['grocery_stores'], max_age=30)
+    def stores():
+        renders.append(1)
+        return jsonify({'renders': len(renders)})
+
+    @app.route('/missing')
+    @cached_response(['grocery_stores'])
+    def missing():
+        renders.append(1)
+        return jsonify({'message': 'Store not found'}), 404
+
+    return app.test_client(), reads, renders
+
+
+def test_versions_default_to_zero_and_are_cached(mock_db, spy):
+    """Test unknown collections are at version 0 and versions are read once per TTL"""
+    _, reads, _ = make_app(mock_db, spy)
+
+    assert collection_versions(['grocery_stores', 'grocery_products']) == (0, 0)
+    assert collection_versions(['grocery_products', 'grocery_stores']) == (0, 0)
+    assert len(reads) == 1
+
+
+def test_responses_are_served_from_the_body_cache(mock_db, spy):
+    """Test repeated requests reuse the rendered body with the same ETag"""
+    client, _, renders = make_app(mock_db, spy)
+
+    first, second = client.get('/stores'), client.get('/stores')
+
+    assert first.get_json() == second.get_json() == {'renders': 1}
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert first.headers['Cache-Control'] == 'public, max-age=30'
+    assert client.get('/stores?page=2').headers['ETag'] != first.headers['ETag']
+    assert len(renders) == 2
+
+
+def test_matching_etag_returns_not_modified(mock_db, spy):
+    """Test If-None-Match with the current ETag gets a 304 without running the view"""
+    client, _, renders = make_app(mock_db, spy)
+    etag = client.get('/stores').headers['ETag']
+
+    response = client.get('/stores', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert len(renders) == 1
+
+
+def test_bump_version_changes_the_etag(mock_db, spy):
+    """Test a bumped collection invalidates revalidation and the cached body"""
+    client, _, renders = make_app(mock_db, spy)
+    etag = client.get('/stores').headers['ETag']
+
+    bump_version('grocery_stores')
+    response = client.get('/stores', headers={'If-None-Match': etag})
+
+    assert versions(mock_db) == {'grocery_stores': 1}
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json() == {'renders': 2}
+
+
+def test_errors_are_not_cached(mock_db, spy):
+    """Test non-200 responses are rendered every time and carry no ETag"""
+    client, _, renders = make_app(mock_db, spy)
+
+    assert client.get('/missing').status_code == 404
+    assert client.get('/missing').status_code == 404
+    assert 'ETag' not in client.get('/missing').headers
+    assert len(renders) == 3
+
+
+def test_watched_grocery_writes_bump_versions(mock_db, spy):
+    """Test the change watcher bumps a grocery collection once per change"""
+    make_app(mock_db, spy)
+    backend = MemoryBackend()
+    workers = [register_cache_handlers(ChangeWatcher(backend=backend)) for _ in range(2)]
+
+    for worker in workers:
+        worker.dispatch('grocery_categories', 1, {'_id': 1, 'name': 'Dairy'}, event_id='e1')
+        worker.dispatch('grocery_stores', 2, None, event_id='e2')
+
+    assert versions(mock_db) == {'grocery_categories': 1, 'grocery_stores': 1}
@@ -0,0 +1,71 @@
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from config.indexes import _enable_pre_images
+
+PRE_IMAGES = {'changeStreamPreAndPostImages': {'enabled': True}}
+
+
+class RecordingDb:
+    """Records create/collMod calls against a fixed set of existing collections"""
+
+    def __init__(self, existing=(), fail=None, racing=()):
+        self.existing = set(existing)
+        self.fail = fail
+        self.racing = set(racing)
+        self.calls = []
+
+    def create_collection(self, name, **options):
+        if name in self.existing:
+            raise CollectionInvalid(f"collection {name} already exists")
+        if name in self.racing:
+            # Another worker creates it after the existence check
+            self.existing.add(name)
+            raise OperationFailure('Collection already exists', code=48)
+        if self.fail:
+            raise self.fail
+        self.calls.append(('create', name, options))
+        self.existing.add(name)
+
+    def command(self, command, name, **options):
+        self.calls.append((command, name, options))
+
+
+def test_missing_collections_are_created_with_pre_images():
+    """Test a fresh database gets its collections created with pre-images on"""
+    db = RecordingDb()
+
+    _enable_pre_images(db, 'grocery_products', 'restaurant_likes')
+
+    assert db.calls == [
+        ('create', 'grocery_products', PRE_IMAGES),
+        ('create', 'restaurant_likes', PRE_IMAGES),
+    ]
+
+
+def test_existing_collections_are_modified():
+    """Test collections that already exist get pre-images through collMod"""
+    db = RecordingDb(existing=['grocery_products'])
+
+    _enable_pre_images(db, 'grocery_products')
+
+    assert db.calls == [('collMod', 'grocery_products', PRE_IMAGES)]
+
+
+def test_concurrently_created_collection_is_modified():
+    """Test losing the create race to another worker falls back to collMod"""
+    db = RecordingDb(racing=['restaurants'])
+
+    _enable_pre_images(db, 'restaurants')
+
+    assert db.calls == [('collMod', 'restaurants', PRE_IMAGES)]
+
+
+def test_unsupported_server_is_logged(caplog):
+    """Test servers without pre-image support log a warning on the app logger"""
+    db = RecordingDb(fail=OperationFailure('unknown option', code=72))
+
+    with caplog.at_level('WARNING', logger='app'):
+        _enable_pre_images(db, 'grocery_products')
+
+    assert db.calls == []
+    assert 'Change stream pre-images unavailable for grocery_products' in caplog.text
@@ -0,0 +1,58 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask import Flask, jsonify, request
+
+from models.order import OrderStatus, OrderItem
+from utils.json_provider import OrjsonProvider
+
+
+def make_app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+def test_encodes_mongo_types():
+    """Test ObjectId, datetime, Decimal and enum values are encoded"""
+    app = make_app()
+    oid = ObjectId()
+    with app.app_context():
+        body = jsonify({
+            '_id': oid,
+            'created_at': datetime(2024, 1, 2, 3, 4, 5),
+            'rate': Decimal('8.875'),
+            'total': Decimal128('12.50'),
+            'status': OrderStatus.READY
+        }).get_data()
+    assert json.loads(body) == {
+        '_id': str(oid),
+        'created_at': '2024-01-02T03:04:05+00:00',
+        'rate': 8.875,
+        'total': 12.5,
+        'status': 'ready'
+    }
+
+
+def test_encodes_pydantic_models():
+    """Test pydantic models are encoded as their dumps"""
+    app = make_app()
+    item = OrderItem(menu_item_id='1', name='Pad Thai', quantity=2, unit_price=10.0,
+                     special_instructions=None, subtotal=20.0)
+    with app.app_context():
+        assert app.json.loads(app.json.dumps([item]))[0]['name'] == 'Pad Thai'
+
+
+def test_request_json_round_trip():
+    """Test request JSON is parsed and responses are encoded by the provider"""
+    app = make_app()
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify({**request.get_json(), 'id': ObjectId('0' * 24)})
+
+    response = app.test_client().post('/echo', json={'a': 1})
+    assert response.get_json() == {'a': 1, 'id': '0' * 24}
@@ -0,0 +1,37 @@
+from bson import ObjectId
+
+from models.read_models import RestaurantCard
+from services.like_service import LikeService
+
+
+def card(restaurant_id):
+    return RestaurantCard.convert({'_id': restaurant_id, 'name': 'R'})
+
+
+def test_decorate_marks_liked_cards_with_one_load(mock_db, spy):
+    """Test decorate marks liked cards from one cached liked-id load"""
+    user_id, liked, other = ObjectId(), ObjectId(), ObjectId()
+    mock_db.restaurant_likes.insert_one({'user_id': user_id, 'restaurant_id': liked})
+    queries = spy(mock_db.restaurant_likes, 'find')
+    LikeService.liked_ids.invalidate(str(user_id))
+
+    for _ in range(3):
+        cards = LikeService.decorate([card(liked), card(other)], str(user_id))
+
+    assert [c['isLiked'] for c in cards] == [True, False]
+    assert [c['isLiked'] for c in LikeService.decorate([card(liked)])] == [False]
+    assert len(queries) == 1
+
+
+def test_invalidate_reloads_after_a_write(mock_db, spy):
+    """Test a like written after the set was cached shows once the user is invalidated"""
+    user_id, restaurant_id = ObjectId(), ObjectId()
+    queries = spy(mock_db.restaurant_likes, 'find')
+    LikeService.liked_ids.invalidate(str(user_id))
+
+    assert not LikeService.is_liked(user_id, str(restaurant_id))
+    mock_db.restaurant_likes.insert_one({'user_id': user_id, 'restaurant_id': restaurant_id})
+    LikeService.invalidate(user_id)
+
+    assert LikeService.is_liked(user_id, str(restaurant_id))
+    assert len(queries) == 2
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from werkzeug.datastructures import MultiDict
+
+from controllers.restaurant_controller import liked_page, liked_request
+
+
+def run_pipeline(pipeline, likes):
+    """Evaluate the liked keyset pipeline over likes already joined with their card"""
+    match = pipeline[0]['$match']
+    docs = [like for like in likes if like['user_id'] == match['user_id']]
+    if '$or' in match:
+        before, tied = match['$or']
+        docs = [
+            like for like in docs
+            if like['created_at'] < before['created_at']['$lt']
+            or (like['created_at'] == tied['created_at'] and like['_id'] < tied['_id']['$lt'])
+        ]
+    docs.sort(key=lambda like: (like['created_at'], like['_id']), reverse=True)
+    return [
+        {'_id': like['_id'], 'created_at': like['created_at'], 'restaurant': like['restaurant']}
+        for like in docs[:pipeline[2]['$limit']]
+    ]
+
+
+def like(user_id, created_at, name):
+    restaurant_id = ObjectId()
+    return {
+        '_id': ObjectId(), 'user_id': user_id, 'restaurant_id': restaurant_id, 'created_at': created_at,
+        'restaurant': {'_id': restaurant_id, 'name': name, 'cuisine_types': ['Thai'], 'price_range': '$$',
+                       'rating': 4.2, 'total_ratings': 8, 'delivery_fee': 1.99,
+                       'estimated_delivery_time': 25, 'image_url': None}
+    }
+
+
+def test_liked_request_uses_the_keyset_index_order():
+    """Test the liked pipeline matches one user and sorts by (created_at, _id) descending"""
+    user_id = ObjectId()
+    pipeline, limit = liked_request(user_id, MultiDict({'limit': '500'}))
+
+    assert limit == 50
+    assert pipeline[:3] == [
+        {'$match': {'user_id': user_id}},
+        {'$sort': {'created_at': -1, '_id': -1}},
+        {'$limit': 51}
+    ]
+
+
+def test_liked_page_shape():
+    """Test liked pages are liked cards and skip likes of deleted restaurants"""
+    user_id, now = ObjectId(), datetime(2024, 5, 1, 12)
+    likes = [like(user_id, now, 'Thai Place'), dict(like(user_id, now, 'Gone'), restaurant=None)]
+
+    cards, cursor = liked_page(likes, 5)
+
+    assert cursor is None
+    assert cards == [{
+        'id': str(likes[0]['restaurant_id']), 'name': 'Thai Place', 'cuisine_types': ('Thai',),
+        'price_range': '$$', 'rating': 4.2, 'total_ratings': 8, 'delivery_fee': 1.99,
+        'estimated_delivery_time': 25, 'image_url': None, 'distance': None, 'isLiked': True
+    }]
+
+
+def test_pages_cover_every_like_once_across_equal_timestamps():
+    """Test cursors walk all likes newest first without skipping or repeating ties"""
+    user_id, now = ObjectId(), datetime(2024, 5, 1, 12)
+    offsets = [0, 0, 0, 5, 5, 9, 30]
+    likes = [like(user_id, now - timedelta(minutes=m), f'R{i}') for i, m in enumerate(offsets)]
+    likes.append(like(ObjectId(), now, 'Someone else'))
+    args = MultiDict({'limit': '2'})
+    seen, pages = [], 0
+
+    while True:
+        pipeline, limit = liked_request(user_id, args)
+        cards, cursor = liked_page(run_pipeline(pipeline, likes), limit)
+        seen += [card['name'] for card in cards]
+        pages += 1
+        if cursor is None:
+            break
+        args['cursor'] = cursor
+
+    expected = sorted(likes[:-1], key=lambda l: (l['created_at'], l['_id']), reverse=True)
+    assert pages == 4
+    assert seen == [l['restaurant']['name'] for l in expected]
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from models.menu_item import MenuItem
+from models.read_models import MenuItemView
+from services.menu_service import MenuService, MenuSnapshot
+
+
+def view(item_id, name, category, price, options=()):
+    return MenuItemView.convert({
+        '_id': item_id, 'restaurant_id': 'r1', 'name': name, 'category': category, 'price': price,
+        'customizations': [{'name': 'Extras', 'options': [
+            {'name': option, 'price': option_price} for option, option_price in options
+        ]}] if options else []
+    })
+
+
+def snapshot():
+    return MenuSnapshot('r1', 3, [
+        view('2', 'Fries', 'Sides', 3.0),
+        view('1', 'Burger', 'Burgers', 9.5, [('Bacon', 2.0), ('Cheese', 1.0)]),
+        view('3', 'Cheeseburger', 'Burgers', 10.5)
+    ])
+
+
+def test_snapshot_groups_items_by_category():
+    """Test a menu snapshot groups items by category in order"""
+    menu = snapshot().to_dict()
+
+    assert menu['version'] == 3
+    assert [(c['name'], [i.name for i in c['items']]) for c in menu['categories']] == [
+        ('Burgers', ['Burger', 'Cheeseburger']),
+        ('Sides', ['Fries'])
+    ]
+
+
+def test_unit_price_includes_selected_options():
+    """Test unit prices add the prices of selected options"""
+    menu = snapshot()
+
+    assert menu.unit_price('1') == 9.5
+    assert menu.unit_price('1', [{'name': 'Extras', 'options': ['Bacon', 'Cheese']}]) == 12.5
+    assert menu.unit_price('1', [{'name': 'Extras', 'options': ['Avocado']}]) == 9.5
+    assert menu.unit_price('missing') is None
+
+
+def menu_versions(database):
+    return {str(r['_id']): r.get('menu_version', 0) for r in database.restaurants.find()}
+
+
+def menu_item(restaurant_id, **fields):
+    return MenuItem.model_validate({
+        'restaurant_id': restaurant_id, 'name': 'Burger', 'description': '', 'price': 9.5,
+        'category': 'Burgers', 'image_url': None, 'preparation_time': 10, 'nutritional_info': None, **fields
+    })
+
+
+def test_items_are_created_and_updated_within_their_restaurant(mock_db):
+    """Test updates keep created_at and bump only the owning restaurant's menu"""
+    restaurant_id, other = (str(r) for r in mock_db.restaurants.insert_many([{}, {}]).inserted_ids)
+    item_id = MenuService.create_item(menu_item(restaurant_id, created_at=datetime(2024, 1, 1)))
+
+    assert MenuService.update_item(menu_item(restaurant_id, _id=item_id, price=11.0))
+    stored = mock_db.menu_items.find_one({'_id': ObjectId(item_id)})
+    assert (stored['price'], stored['created_at']) == (11.0, datetime(2024, 1, 1))
+    assert menu_versions(mock_db) == {restaurant_id: 2, other: 0}
+
+
+def test_updates_do_not_cross_restaurants_or_create_items(mock_db):
+    """Test updating another restaurant's item or an unknown id changes nothing"""
+    owner, other = (str(r) for r in mock_db.restaurants.insert_many([{}, {}]).inserted_ids)
+    item_id = MenuService.create_item(menu_item(owner))
+
+    assert not MenuService.update_item(menu_item(other, _id=item_id, price=0.5))
+    assert not MenuService.update_item(menu_item(owner, _id=str(ObjectId())))
+    assert mock_db.menu_items.find_one({'_id': ObjectId(item_id)})['price'] == 9.5
+    assert mock_db.menu_items.count_documents({}) == 1
+    assert menu_versions(mock_db) == {owner: 1, other: 0}
@@ -0,0 +1,102 @@
+from bson import ObjectId
+from werkzeug.datastructures import MultiDict
+
+from controllers.restaurant_controller import nearby_page, nearby_request, nearby_results
+from utils.geo import distance_m
+
+
+def run_pipeline(pipeline, restaurants):
+    """Evaluate the $geoNear keyset pipeline over documents carrying a precomputed distance"""
+    geo_near = pipeline[0]['$geoNear']
+    docs = [
+        doc for doc in restaurants
+        if geo_near.get('minDistance', 0) <= doc['distance'] <= geo_near['maxDistance']
+    ]
+    for stage in pipeline[1:]:
+        if '$match' in stage:
+            by_distance, by_id = stage['$match']['$or']
+            docs = [
+                doc for doc in docs
+                if doc['distance'] > by_distance['distance']['$gt'] or doc['_id'] > by_id['_id']['$gt']
+            ]
+        elif '$limit' in stage:
+            docs = sorted(docs, key=lambda doc: (doc['distance'], doc['_id']))[:stage['$limit']]
+    return [
+        {
+            'id': str(doc['_id']), 'name': doc['name'], 'distance': doc['distance'],
+            'cursor_distance': doc['distance'], 'coordinates': [-73.9, 40.7]
+        }
+        for doc in docs
+    ]
+
+
+def test_cursor_resumes_after_the_last_card():
+    """Test a cursor starts the next $geoNear at the last distance and breaks ties by id"""
+    args = MultiDict({'lat': '40.7', 'lng': '-73.9', 'limit': '2'})
+    _, first_pipeline, limit, _ = nearby_request(args)
+    last = {'id': str(ObjectId()), 'name': 'A', 'cursor_distance': 150.0, 'coordinates': [-73.9, 40.7]}
+    _, cursor, _ = nearby_page([last, last, last], limit)
+
+    args['cursor'] = cursor
+    _, pipeline, _, _ = nearby_request(args)
+
+    assert 'minDistance' not in first_pipeline[0]['$geoNear']
+    assert pipeline[0]['$geoNear']['minDistance'] == 150.0
+    assert pipeline[1] == {'$match': {'$or': [
+        {'distance': {'$gt': 150.0}},
+        {'_id': {'$gt': ObjectId(last['id'])}}
+    ]}}
+
+
+def test_pages_cover_every_restaurant_once_across_ties():
+    """Test paging through equal distances neither skips nor repeats restaurants"""
+    restaurants = [
+        {'_id': ObjectId(), 'name': f'R{i}', 'distance': distance}
+        for i, distance in enumerate([10.0, 20.0, 20.0, 20.0, 35.0, 35.0, 90.0])
+    ]
+    args = MultiDict({'lat': '40.7', 'lng': '-73.9', 'limit': '2'})
+    seen, pages = [], 0
+
+    while True:
+        _, pipeline, limit, _ = nearby_request(args)
+        cards, cursor, _ = nearby_page(run_pipeline(pipeline, restaurants), limit)
+        seen += [card.id for card in cards]
+        pages += 1
+        if cursor is None:
+            break
+        args['cursor'] = cursor
+
+    assert pages == 4
+    assert seen == [str(r['_id']) for r in sorted(restaurants, key=lambda r: (r['distance'], r['_id']))]
+
+
+def test_last_page_has_no_cursor():
+    """Test a page shorter than the limit ends pagination"""
+    cards, cursor, _ = nearby_page(
+        [{'id': str(ObjectId()), 'name': 'A', 'cursor_distance': 5.0, 'coordinates': [-73.9, 40.7]}], 2
+    )
+
+    assert len(cards) == 1
+    assert cursor is None
+
+
+def test_distances_are_measured_from_the_caller_not_the_cell_centre():
+    """Test cached cell results are re-measured from each caller and cut at their radius"""
+    args = MultiDict({'lat': '40.7', 'lng': '-73.9', 'radius': '1000'})
+    cache_key, pipeline, limit, origin = nearby_request(args)
+    geo_near = pipeline[0]['$geoNear']
+    center_lng, center_lat = geo_near['near']['coordinates']
+    # Due east of the caller: just inside, and just outside their radius
+    inside, outside = [-73.9 + metres / 84300 for metres in (900, 1100)]
+    restaurants = [
+        {'id': str(ObjectId()), 'name': name, 'distance': distance_m(center_lat, center_lng, 40.7, lng),
+         'cursor_distance': 0.0, 'coordinates': [lng, 40.7]}
+        for name, lng in (('far', outside), ('near', inside))
+    ]
+
+    cards, cursor = nearby_results(nearby_page(restaurants, limit), origin)
+
+    assert geo_near['maxDistance'] > 1000
+    assert [card.name for card in cards] == ['near']
+    assert abs(cards[0].distance - 900) < 5
+    assert cursor is None
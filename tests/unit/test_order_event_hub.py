@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from services.order_event_hub import OrderEventHub, replay_after
+from services.order_event_service import OrderEventService
+from utils.cache import MemoryBackend
+
+
+def history():
+    return [
+        OrderEventService.event('new_order', datetime(2024, 3, 1, 12), total=10.0),
+        OrderEventService.status_event('confirmed', datetime(2024, 3, 1, 12, 1)),
+        OrderEventService.status_event('preparing', datetime(2024, 3, 1, 12, 2)),
+        OrderEventService.event('delivery_update', datetime(2024, 3, 1, 12, 3), status='driver_assigned'),
+    ]
+
+
+def frame_ids(frames):
+    return [line.split(b' ', 1)[1].decode() for frame in frames for line in frame.split(b'\n')
+            if line.startswith(b'id: ')]
+
+
+def test_replay_resumes_after_last_event_id():
+    """Test replay skips events the client has seen and non-streamed types"""
+    events = history()
+
+    assert replay_after(events, None) == events[1:]
+    assert replay_after(events, str(events[1]['id'])) == events[2:]
+    assert replay_after(events, 'trimmed-long-ago') == events[1:]
+
+
+def test_stream_replays_then_follows_live_events_without_repeats():
+    """Test a stream sends the stored history, then published events once"""
+    hub, events = OrderEventHub(backend=MemoryBackend()), history()
+    stream = hub.connect('o1')
+    frames = hub.stream('o1', stream, events, last_event_id=str(events[2]['id']), heartbeat=0.01)
+
+    assert next(frames).startswith(b'retry:')
+    assert frame_ids([next(frames)]) == [str(events[3]['id'])]
+
+    hub.publish('o1', events[3])  # delivered again by the outbox
+    live = OrderEventService.status_event('ready')
+    hub.publish('o1', live)
+    hub.publish('o2', OrderEventService.status_event('ready'))
+
+    assert frame_ids([next(frames)]) == [str(live['id'])]
+    assert next(frames) == b': heartbeat\n\n'
+
+    frames.close()
+    assert hub.connections == 0
+
+
+def test_connections_are_capped_per_worker():
+    """Test connect refuses streams beyond the cap until one closes"""
+    hub = OrderEventHub(max_connections=2, backend=MemoryBackend())
+    first = hub.connect('o1')
+    hub.connect('o2')
+
+    assert hub.connect('o3') is None
+    hub.disconnect('o1', first)
+    assert hub.connect('o3') is not None
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+import services.order_event_service as order_event_service
+from services.notification_service import NotificationService
+from services.order_event_service import OrderEventService, _hold_lease
+from utils.cache import MemoryBackend
+
+
+def test_events_normalize_status_spelling():
+    """Test status events carry the enum value whichever spelling was written"""
+    assert OrderEventService.status_event('PREPARING')['status'] == 'preparing'
+    assert OrderEventService.status_event('ready')['status'] == 'ready'
+    assert OrderEventService.payment_event('REFUNDED')['status'] == 'refunded'
+
+
+def test_push_keeps_bounded_history_and_outbox():
+    """Test the $push clause appends to both the history and the outbox"""
+    event = OrderEventService.event('order_status', status='ready')
+    push = OrderEventService.push(event)
+
+    assert push['events'] == {'$each': [event], '$slice': -order_event_service.ORDER_EVENT_HISTORY}
+    assert push['pending_events'] == {'$each': [event]}
+
+
+def test_analytics_batches_one_upsert_per_restaurant_day():
+    """Test events are folded into a single increment per restaurant and day"""
+    day = datetime(2024, 3, 1, 12)
+    order = {'restaurant_id': 'r1'}
+    batch = [
+        (order, OrderEventService.event('new_order', day, total=20.0)),
+        (order, OrderEventService.event('new_order', day, total=5.5)),
+        (order, OrderEventService.status_event('delivered', day)),
+        (order, OrderEventService.payment_event('completed', day)),
+    ]
+
+    ops = OrderEventService.analytics_ops(batch)
+
+    assert len(ops) == 1
+    assert ops[0]._filter == {'restaurant_id': 'r1', 'date': '2024-03-01'}
+    assert ops[0]._doc['$inc'] == {'orders': 2, 'revenue': 25.5, 'status_counts.delivered': 1}
+
+
+def test_dispatch_emits_in_order_and_drains_the_outbox(mock_db, monkeypatch):
+    """Test pending events are emitted oldest first and pulled afterwards"""
+    events = [
+        OrderEventService.event('order_status', datetime(2024, 3, 1, 12, 5), status='ready'),
+        OrderEventService.event('new_order', datetime(2024, 3, 1, 12), total=10.0),
+    ]
+    order_id, emitted = ObjectId(), []
+    mock_db.orders.insert_one({'_id': order_id, 'user_id': 'u1', 'restaurant_id': 'r1', 'pending_events': events})
+    monkeypatch.setattr(OrderEventService, 'emit', staticmethod(lambda o, e: emitted.append(e['type'])))
+
+    assert OrderEventService.dispatch_pending() == 2
+    assert emitted == ['new_order', 'order_status']
+    assert mock_db.orders.find_one({'_id': order_id})['pending_events'] == []
+    assert mock_db.restaurant_analytics.find_one({'restaurant_id': 'r1'})['orders'] == 1
+    assert OrderEventService.dispatch_pending() == 0
+
+
+def test_driver_assignments_notify_the_driver(monkeypatch):
+    """Test a driver_assigned delivery update also reaches the assigned driver"""
+    eta, sent = datetime(2024, 3, 1, 12, 30), []
+    event = OrderEventService.event('delivery_update', status='driver_assigned', driver_id='d1',
+                                    pickup_eta_minutes=4.5, estimated_delivery_time=eta)
+    monkeypatch.setattr(NotificationService, 'notify_delivery_update', staticmethod(lambda *args: None))
+    monkeypatch.setattr(NotificationService, 'notify_order_assigned',
+                        staticmethod(lambda driver_id, data: sent.append((driver_id, data))))
+
+    OrderEventService.emit({'_id': 'o1', 'restaurant_id': 'r1'}, event)
+
+    assert sent == [('d1', {'order_id': 'o1', 'restaurant_id': 'r1', 'pickup_eta_minutes': 4.5,
+                            'estimated_delivery_time': eta.isoformat(), 'event_id': str(event['id'])})]
+
+
+def test_only_one_worker_holds_the_lease():
+    """Test the dispatcher lease is exclusive and renewable by its holder"""
+    backend = MemoryBackend()
+
+    assert _hold_lease(backend, b'worker-1')
+    assert not _hold_lease(backend, b'worker-2')
+    assert _hold_lease(backend, b'worker-1')
@@ -0,0 +1,79 @@
+import orjson
+from flask import Flask
+
+from routes.order import order
+from services.order_event_hub import order_event_hub
+from services.order_event_service import OrderEventService
+from utils.json_provider import OrjsonProvider
+
+
+def client():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(order)
+    return app.test_client()
+
+
+def test_event_stream_replays_the_order_history(mock_db, bearer):
+    """Test the order's customer subscribes to its event stream with a token issued at login"""
+    user_id, headers = bearer()
+    events = [OrderEventService.event('new_order', total=10.0), OrderEventService.status_event('confirmed')]
+    order_id = mock_db.orders.insert_one({'user_id': user_id, 'restaurant_id': 'r1', 'events': events}).inserted_id
+
+    response = client().get(f'/api/orders/{order_id}/events', headers=headers, buffered=False)
+    frames = iter(response.response)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert next(frames).startswith(b'retry:')
+    assert f"id: {events[1]['id']}".encode() in next(frames)
+    response.close()
+    assert order_event_hub.connections == 0
+
+
+def test_event_stream_refuses_other_customers(mock_db, bearer):
+    """Test customers cannot subscribe to another customer's order"""
+    owner_id, _ = bearer()
+    _, headers = bearer()
+    order_id = mock_db.orders.insert_one({'user_id': owner_id, 'restaurant_id': 'r1', 'events': []}).inserted_id
+
+    assert client().get(f'/api/orders/{order_id}/events', headers=headers).status_code == 403
+    assert order_event_hub.connections == 0
+
+
+def test_export_streams_the_callers_orders(mock_db, bearer):
+    """Test customers export their own orders and owners the orders of their restaurants"""
+    customer_id, customer = bearer()
+    owner_id, owner = bearer('restaurant_owner')
+    owned = str(mock_db.restaurants.insert_one({'owner_id': owner_id}).inserted_id)
+    mock_db.orders.insert_many([
+        {'user_id': customer_id, 'restaurant_id': owned, 'total': 1.0},
+        {'user_id': customer_id, 'restaurant_id': 'elsewhere', 'total': 2.0},
+        {'user_id': 'someone-else', 'restaurant_id': owned, 'total': 3.0},
+    ])
+
+    def export(headers):
+        response = client().get('/api/orders/export', headers=headers)
+        assert response.mimetype == 'application/x-ndjson'
+        return sorted(orjson.loads(line)['total'] for line in response.data.splitlines())
+
+    assert export(customer) == [1.0, 2.0]
+    assert export(owner) == [1.0, 3.0]
+
+
+def test_order_reads_leave_out_the_event_history_and_outbox(mock_db, bearer):
+    """Test order details, listings and exports do not expose events or pending_events"""
+    user_id, headers = bearer()
+    event = OrderEventService.event('new_order', total=1.0)
+    order_id = mock_db.orders.insert_one({
+        'user_id': user_id, 'restaurant_id': 'r1', 'total': 1.0, **OrderEventService.initial(event)
+    }).inserted_id
+    test_client = client()
+
+    detail = test_client.get(f'/api/orders/{order_id}', headers=headers).get_json()
+    [listed] = test_client.get('/api/orders', headers=headers).get_json()
+    [exported] = test_client.get('/api/orders/export', headers=headers).data.splitlines()
+
+    for order in (detail, listed, orjson.loads(exported)):
+        assert order['total'] == 1.0
+        assert 'events' not in order and 'pending_events' not in order
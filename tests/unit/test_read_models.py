@@ -0,0 +1,63 @@
+from decimal import Decimal
+import json
+
+from bson import ObjectId
+from flask import Flask
+
+from models.menu_item import MenuItem
+from models.read_models import MenuItemView, RestaurantCard, TaxRuleView
+from models.tax_rule import TaxRule
+from utils.json_provider import OrjsonProvider
+
+
+def menu_item_document():
+    return {
+        '_id': ObjectId(), 'restaurant_id': 'r1', 'name': 'Classic Burger', 'description': 'Beef',
+        'price': 9.99, 'category': 'Burgers', 'image_url': None, 'preparation_time': 10,
+        'nutritional_info': {'calories': 650, 'protein': 35, 'carbohydrates': 28, 'fat': 45,
+                             'allergens': ['dairy']},
+        'customizations': [{'name': 'Cheese', 'options': [
+            {'name': 'American', 'price': 1.0}, {'name': 'Cheddar', 'price': 1.5}
+        ]}]
+    }
+
+
+def test_menu_item_view_from_model_and_document_agree():
+    """Test MenuItemView converts models and raw documents alike"""
+    doc = menu_item_document()
+    model = MenuItem.model_validate({**doc, '_id': str(doc['_id'])})
+
+    assert MenuItemView.convert(model) == MenuItemView.convert(doc)
+
+
+def test_menu_item_view_option_price():
+    """Test MenuItemView looks up option prices"""
+    view = MenuItemView.convert(menu_item_document())
+
+    assert view.allergens == ('dairy',)
+    assert view.option_price('Cheese', 'Cheddar') == 1.5
+    assert view.option_price('Cheese', 'Swiss') == 0.0
+
+
+def test_tax_rule_view_matches_model():
+    """Test TaxRuleView computes the same tax as TaxRule"""
+    rule = TaxRule(restaurant_id='r1', name='Sales Tax', description=None, rate=Decimal('8.88'),
+                   minimum_order_amount=10.0)
+    view = TaxRuleView.convert(rule)
+
+    for subtotal in (5.0, 10.0, 123.45):
+        assert view.calculate_tax(subtotal) == rule.calculate_tax(subtotal)
+
+
+def test_restaurant_card_picks_primary_image_and_serializes():
+    """Test RestaurantCard uses the primary image and serializes"""
+    card = RestaurantCard.convert({
+        '_id': ObjectId(), 'name': 'Burger Palace', 'cuisine_types': ['American'], 'price_range': '$$',
+        'rating': 4.5, 'total_ratings': 10, 'delivery_fee': 2.99, 'estimated_delivery_time': 30,
+        'images': [{'url': 'a.jpg', 'is_primary': False}, {'url': 'b.jpg', 'is_primary': True}]
+    })
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+
+    assert card.image_url == 'b.jpg'
+    assert json.loads(app.json.dumps([card]))[0]['cuisine_types'] == ['American']
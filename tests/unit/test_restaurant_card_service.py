@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from services.restaurant_card_service import RestaurantCardService
+from utils.cache import MemoryBackend
+
+
+def test_card_document_keeps_listing_and_filter_fields_only():
+    """Test card documents keep only listing and filter fields"""
+    restaurant_id = ObjectId()
+    now = datetime(2024, 1, 1)
+    card = RestaurantCardService.card_document({
+        '_id': restaurant_id,
+        'name': 'Burger Palace',
+        'cuisine_types': ['American'],
+        'price_range': '$$',
+        'rating': 4.5,
+        'total_ratings': 12,
+        'delivery_fee': 2.99,
+        'estimated_delivery_time': 30,
+        'images': [{'url': 'a.jpg', 'is_primary': False}, {'url': 'b.jpg', 'is_primary': True}],
+        'address': {'city': 'New York', 'location': {'type': 'Point', 'coordinates': [-73.9, 40.7]}},
+        'open_intervals': [{'start': 0, 'end': 60}]
+    }, now)
+
+    assert card == {
+        '_id': restaurant_id,
+        'name': 'Burger Palace',
+        'cuisine_types': ['American'],
+        'price_range': '$$',
+        'rating': 4.5,
+        'total_ratings': 12,
+        'delivery_fee': 2.99,
+        'estimated_delivery_time': 30,
+        'image_url': 'b.jpg',
+        'is_active': True,
+        'location': {'type': 'Point', 'coordinates': [-73.9, 40.7]},
+        'open_intervals': [{'start': 0, 'end': 60}],
+        'updated_at': now
+    }
+
+
+def test_rebuild_sweeps_only_cards_of_deleted_restaurants(mock_db, monkeypatch):
+    """Test rebuild keeps cards synced meanwhile for new restaurants and drops deleted ones"""
+    live, deleted, created = ObjectId(), ObjectId(), ObjectId()
+    mock_db.restaurants.insert_one({'_id': live, 'name': 'Live'})
+    mock_db.restaurant_cards.insert_many([{'_id': live}, {'_id': deleted}])
+    find = mock_db.restaurants.find
+
+    def restaurant_created_during_rebuild(query, projection):
+        restaurants = list(find(query, projection))
+        if not query:
+            mock_db.restaurants.insert_one({'_id': created, 'name': 'New'})
+            mock_db.restaurant_cards.insert_one({'_id': created, 'name': 'New'})
+        return restaurants
+
+    monkeypatch.setattr(mock_db.restaurants, 'find', restaurant_created_during_rebuild)
+
+    assert RestaurantCardService.rebuild(backend=MemoryBackend()) == 1
+    assert {card['_id'] for card in mock_db.restaurant_cards.find()} == {live, created}
+    assert mock_db.restaurant_cards.find_one({'_id': live})['name'] == 'Live'
+
+
+def test_rebuild_runs_once_across_workers(mock_db):
+    """Test workers sharing a backend rebuild the cards only once"""
+    backend = MemoryBackend()
+    mock_db.restaurants.insert_one({'_id': ObjectId(), 'name': 'R'})
+
+    assert [RestaurantCardService.rebuild(backend=backend) for _ in range(3)] == [1, 0, 0]
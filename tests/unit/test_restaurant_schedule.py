@@ -0,0 +1,63 @@
+from datetime import datetime
+from models.restaurant import (
+    compile_opening_hours, minute_of_week, utc_offset_minutes, Restaurant, MINUTES_PER_WEEK
+)
+
+# 2024-01-07 is a Sunday, outside daylight saving time in New York
+SUNDAY = datetime(2024, 1, 7)
+
+def is_open_at(intervals, at):
+    minute = minute_of_week(at)
+    return any(i['start'] <= minute < i['end'] for i in intervals)
+
+def test_compile_simple_day():
+    """Test a same-day range maps to its minute-of-week interval."""
+    intervals = compile_opening_hours([{'day': 1, 'open': '09:00', 'close': '17:00'}])
+    assert intervals == [{'start': 1440 + 540, 'end': 1440 + 1020}]
+
+def test_compile_overnight_hours():
+    """Test closing after midnight spills into the next day."""
+    intervals = compile_opening_hours([{'day': 5, 'open': '18:00', 'close': '02:00'}])
+    assert is_open_at(intervals, SUNDAY.replace(day=12, hour=23))  # Friday 23:00
+    assert is_open_at(intervals, SUNDAY.replace(day=13, hour=1))  # Saturday 01:00
+    assert not is_open_at(intervals, SUNDAY.replace(day=13, hour=3))
+
+def test_compile_wraps_end_of_week():
+    """Test Saturday-night hours wrap around to Sunday morning."""
+    intervals = compile_opening_hours([{'day': 6, 'open': '22:00', 'close': '03:00'}])
+    assert {'start': 0, 'end': 180} in intervals
+    assert intervals[-1]['end'] == MINUTES_PER_WEEK
+
+def test_compile_applies_timezone():
+    """Test local hours are shifted to UTC using the zone offset."""
+    intervals = compile_opening_hours(
+        [{'day': 0, 'open': '11:00', 'close': '22:00'}], 'America/New_York', at=SUNDAY
+    )
+    # 11:00-22:00 EST is 16:00-03:00 UTC
+    assert intervals == [{'start': 960, 'end': 1440 + 180}]
+    assert is_open_at(intervals, SUNDAY.replace(hour=16))
+    assert not is_open_at(intervals, SUNDAY.replace(hour=15, minute=59))
+
+def test_minute_of_week_starts_sunday():
+    """Test minute numbering starts on Sunday at midnight."""
+    assert minute_of_week(SUNDAY) == 0
+    assert minute_of_week(SUNDAY.replace(day=8, hour=1)) == 1440 + 60
+
+
+def test_refresh_recompiles_schedules_after_an_offset_change(mock_db):
+    """Test only schedules compiled with an outdated offset are recompiled."""
+    hours = [{'day': 0, 'open': '11:00', 'close': '22:00'}]
+    current = utc_offset_minutes('America/New_York')
+    docs = [
+        {'_id': 1, 'timezone': 'America/New_York', 'opening_hours': hours,
+         'open_intervals': [], 'schedule_utc_offset': current},
+        {'_id': 2, 'timezone': 'America/New_York', 'opening_hours': hours,
+         'open_intervals': [], 'schedule_utc_offset': current + 60},
+    ]
+    mock_db.restaurants.insert_many(docs)
+
+    assert Restaurant.refresh_schedules() == [2]
+    recompiled = mock_db.restaurants.find_one({'_id': 2})
+    assert recompiled['schedule_utc_offset'] == current
+    assert recompiled['open_intervals'] == compile_opening_hours(hours, 'America/New_York')
+    assert Restaurant.refresh_schedules() == []
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import eventlet
+
+from utils.cache import MemoryBackend
+from utils.single_flight import SingleFlight
+
+
+def slow_query(calls, value='result', delay=0.05, sleep=time.sleep):
+    def run():
+        calls.append(1)
+        sleep(delay)
+        return value
+    return run
+
+
+def test_threads_share_one_call():
+    """Test concurrent threads share one call per key"""
+    flight = SingleFlight('test')
+    calls, results = [], []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do('store:1', slow_query(calls))))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['result'] * 20
+    assert flight.stats['coalesced'] == 19
+
+
+def test_green_threads_share_one_call():
+    """Test concurrent green threads share one call per key"""
+    flight = SingleFlight('test')
+    calls = []
+    pool = eventlet.GreenPool()
+    results = list(pool.imap(
+        lambda _: flight.do('store:1', slow_query(calls, sleep=eventlet.sleep)), range(20)
+    ))
+
+    assert len(calls) == 1
+    assert results == ['result'] * 20
+
+
+def test_errors_are_shared_and_not_remembered():
+    """Test errors reach every waiter and are not cached"""
+    flight = SingleFlight('test')
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('k', fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ['boom'] * 5
+    assert flight.do('k', lambda: 'ok') == 'ok'
+
+
+def test_workers_sharing_a_backend_run_once():
+    """Test workers sharing a backend run a call once"""
+    backend = MemoryBackend()
+    worker_a = SingleFlight('test', backend=backend)
+    worker_b = SingleFlight('test', backend=backend)
+    calls, results = [], []
+    threads = [
+        threading.Thread(target=lambda w=w: results.append(w.do('k', slow_query(calls))))
+        for w in (worker_a, worker_b) * 5
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['result'] * 10
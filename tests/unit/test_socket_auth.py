@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+
+from services.auth_service import auth_service
+from services.notification_service import NotificationService, socketio
+
+
+@pytest.fixture
+def users(monkeypatch):
+    """Tokens are the user ids; verify_token counts its calls"""
+    known, calls = {}, []
+
+    def verify_token(token):
+        calls.append(token)
+        return known.get(token)
+
+    monkeypatch.setattr(auth_service, 'verify_token', verify_token)
+    return known, calls
+
+
+def connect(token=None):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    socketio.init_app(app)
+    return socketio.test_client(app, auth={'token': token} if token else None)
+
+
+def add_user(users, role):
+    user_id = str(ObjectId())
+    users[0][user_id] = SimpleNamespace(_id=user_id, role=role)
+    return user_id
+
+
+def test_connect_requires_a_valid_token(users):
+    """Test sockets without a valid token are refused"""
+    assert not connect().is_connected()
+    assert not connect('unknown').is_connected()
+
+
+def test_joins_use_the_session_principal(users, mock_db):
+    """Test joins are authorized from the connect-time principal without re-decoding"""
+    user_id = add_user(users, 'customer')
+    client = connect(user_id)
+
+    assert client.is_connected()
+    assert client.emit('join', {'type': 'user', 'id': user_id}, callback=True) == {'joined': True}
+    assert client.emit('join', {'type': 'user', 'id': 'someone-else'}, callback=True)['joined'] is False
+    assert client.emit('join', {'type': 'driver', 'id': user_id}, callback=True)['joined'] is False
+    assert users[1] == [user_id]
+    client.disconnect()
+
+
+def test_restaurant_rooms_check_the_cached_owner_index(users, mock_db, spy):
+    """Test only owners join restaurant rooms, with one owner lookup per user"""
+    owner_id = add_user(users, 'restaurant_owner')
+    owned, other = str(ObjectId()), str(ObjectId())
+    mock_db.restaurants.insert_one({'_id': ObjectId(owned), 'owner_id': owner_id})
+    queries = spy(mock_db.restaurants, 'find')
+    client = connect(owner_id)
+
+    for _ in range(3):
+        assert client.emit('join', {'type': 'restaurant', 'id': owned}, callback=True) == {'joined': True}
+    assert client.emit('join', {'type': 'restaurant', 'id': other}, callback=True)['joined'] is False
+    assert len(queries) == 1
+    assert NotificationService.restaurant_connections[owned]
+
+    client.disconnect()
+    assert owned not in NotificationService.restaurant_connections
+
+
+def test_order_rooms_admit_the_orders_parties(users, mock_db):
+    """Test order rooms admit the customer and a newly assigned driver, not strangers"""
+    customer_id = add_user(users, 'customer')
+    driver_id = add_user(users, 'delivery_driver')
+    stranger_id = add_user(users, 'customer')
+    order = {'_id': ObjectId(), 'user_id': customer_id, 'restaurant_id': str(ObjectId()),
+             'delivery_info': {'driver_id': None}}
+    mock_db.orders.insert_one(order)
+    room = {'type': 'order', 'id': str(order['_id'])}
+
+    assert connect(customer_id).emit('join', room, callback=True) == {'joined': True}
+    mock_db.orders.update_one({'_id': order['_id']}, {'$set': {'delivery_info.driver_id': driver_id}})
+    assert connect(driver_id).emit('join', room, callback=True) == {'joined': True}
+    assert connect(stranger_id).emit('join', room, callback=True)['joined'] is False
+    assert connect(stranger_id).emit('join', {'type': 'order', 'id': 'bad'}, callback=True)['joined'] is False
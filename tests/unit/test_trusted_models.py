@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from models.menu_item import MenuItem, NutritionalInfo
+from models.order import Order, OrderItem, PaymentInfo, OrderStatus
+from models.trusted import from_db
+from models.user import User
+
+
+def order_document():
+    return {
+        '_id': ObjectId(),
+        'user_id': 'u1',
+        'restaurant_id': 'r1',
+        'items': [{
+            'menu_item_id': 'm1', 'name': 'Burger', 'quantity': 2, 'unit_price': 9.5,
+            'customizations': [{'name': 'Cheese', 'options': ['Cheddar']}],
+            'special_instructions': None, 'subtotal': 19.0
+        }],
+        'status': 'ready',
+        'delivery_info': {
+            'address': '1 Main St', 'city': 'NYC', 'state': 'NY', 'zip_code': '10001',
+            'latitude': 40.7, 'longitude': -74.0, 'instructions': None, 'driver_id': None,
+            'estimated_delivery_time': None, 'actual_delivery_time': None
+        },
+        'payment_info': {
+            'method': 'cash', 'subtotal': 19.0, 'tax': 1.0, 'delivery_fee': 2.0,
+            'service_fee': 1.0, 'tip': 0.0, 'total': 23.0, 'status': 'pending', 'transaction_id': None
+        },
+        'is_scheduled': False,
+        'scheduled_for': None,
+        'created_at': datetime(2024, 1, 1),
+        'updated_at': datetime(2024, 1, 1),
+        'estimated_preparation_time': 15,
+        'special_instructions': None
+    }
+
+
+def test_from_db_builds_nested_models():
+    """Test from_db builds nested models from a stored order"""
+    doc = order_document()
+    order = from_db(Order, doc)
+
+    assert order.id == str(doc['_id'])
+    assert isinstance(order.items[0], OrderItem)
+    assert order.items[0].customizations[0].options == ['Cheddar']
+    assert isinstance(order.payment_info, PaymentInfo)
+    assert order.calculate_total() == 23.0
+    assert order.status == OrderStatus.READY
+
+
+def test_from_db_matches_validated_dump():
+    """Test from_db gives the same dump as model_validate"""
+    doc = order_document()
+    validated = Order.model_validate({**doc, '_id': str(doc['_id'])})
+    assert from_db(Order, doc).model_dump() == validated.model_dump()
+
+
+def test_from_db_fills_defaults_and_optional_models():
+    """Test from_db fills defaults and builds optional nested models"""
+    item = from_db(MenuItem, {
+        'restaurant_id': 'r1', 'name': 'Fries', 'description': '', 'price': 3.0,
+        'category': 'Sides', 'image_url': None, 'preparation_time': 5,
+        'nutritional_info': {'calories': 300, 'protein': 4, 'carbohydrates': 40, 'fat': 15}
+    })
+
+    assert item.is_available is True
+    assert item.customizations == []
+    assert isinstance(item.nutritional_info, NutritionalInfo)
+    assert item.nutritional_info.allergens == []
+
+
+def test_user_from_dict_keeps_stored_hash():
+    """Test User.from_dict keeps the stored password hash"""
+    oid = ObjectId()
+    user = User.from_dict({
+        '_id': oid, 'email': 'a@example.com', 'password': 'pbkdf2:hash',
+        'first_name': 'A', 'last_name': 'B', 'role': 'customer'
+    })
+
+    assert user._id == oid
+    assert user.id == str(oid)
+    assert user.password == ''
+    assert user.password_hash == 'pbkdf2:hash'
+    assert user.preferences['language'] == 'en'
+
+
+def test_from_db_tolerates_legacy_nested_values():
+    """Test from_db accepts stored values the API would reject"""
+    doc = order_document()
+    doc['items'][0]['quantity'] = 0  # rejected by the API model, but already stored
+    order = from_db(Order, doc)
+
+    assert isinstance(order.items[0], OrderItem)
+    assert order.items[0].quantity == 0